@@ -0,0 +1,82 @@
+"""
+抽出処理の並列スケーリングのベンチマーク
+
+benchmarks/fixtures/ のページを、取得スレッド内での抽出（PARSE_EXECUTOR="thread"）と
+常駐プロセスプール（PARSE_EXECUTOR="process"）で並列数を変えて抽出し、ページ/秒を比較する。
+threadはGILで頭打ちになり、processはコア数まで伸びるのが期待される結果。
+
+    python benchmarks/bench_parse_scaling.py
+    python benchmarks/bench_parse_scaling.py --workers 1 2 4 8 --pages 2000
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parsers import SCRAPERS, load_fixtures  # noqa: E402
+from src.scrapers import parse_pool  # noqa: E402
+
+
+def run(workers: int, pages: List[tuple], mode: str) -> float:
+    """
+    取得スレッドworkers本から抽出を行い、ページ/秒を返す
+
+    実際の取得と同じく、各スレッドがBaseScraper.extract_page()を呼ぶ
+    """
+    parse_pool.configure_parse_executor(mode)
+    scrapers = {name: scraper_class() for name, scraper_class in SCRAPERS.items()}
+
+    def extract(item):
+        scraper_name, html = item
+        return scrapers[scraper_name].extract_page(html)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for _ in executor.map(extract, pages):
+            pass
+    return len(pages) / (time.perf_counter() - started)
+
+
+def default_workers() -> List[int]:
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="抽出処理の並列スケーリングのベンチマーク")
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="並列数（デフォルト: 1からCPUコア数まで倍々）")
+    parser.add_argument("--pages", type=int, default=1000, help="抽出するページ数（デフォルト: 1000）")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    items = [(entry["scraper"], entry["html"]) for entry in fixtures.values()]
+    pages = [items[i % len(items)] for i in range(args.pages)]
+    workers = args.workers or default_workers()
+
+    print(f"CPUコア数: {os.cpu_count()}, ページ数: {len(pages)}")
+    print(f"\n{'workers':>8}{'thread p/s':>13}{'process p/s':>13}{'speedup':>9}")
+    for n in workers:
+        thread_rate = run(n, pages, "thread")
+        # プロセスプールはワーカー数を合わせて作り直し、起動時間を除くためウォームアップしてから測る
+        parse_pool.PARSE_PROCESSES = n
+        parse_pool.configure_parse_executor("process")
+        parse_pool.warm_up()
+        run(n, pages[:n * 4], "process")
+        process_rate = run(n, pages, "process")
+        parse_pool.shutdown()
+        print(f"{n:>8}{thread_rate:>13.0f}{process_rate:>13.0f}{process_rate / thread_rate:>8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+パーサーのオフラインベンチマーク
+
+benchmarks/fixtures/ のランキングページを使い、ネットワークなしで
+各スクレイパーの抽出処理（extract: 銘柄コード・更新日）の正しさと速度を測定する。
+フィクスチャはgenerate_fixtures.pyで生成した合成ページと、record_fixtures.pyで保存した実ページ。
+
+速度はマシンによって異なるため、ベースラインには同じ実行で測った較正用の処理
+（リポジトリのコードを使わないlxmlのパースとPythonのループ）の速度も保存し、
+比較時は較正値の比でベースラインを換算する。
+
+    python benchmarks/bench_parsers.py                    # 測定してベースラインと比較
+    python benchmarks/bench_parsers.py --update-baseline  # 現在の結果をベースラインとして保存
+
+抽出結果がexpected.jsonと異なる場合、またはベースラインから許容範囲を超えて
+遅くなった・メモリが増えた場合は終了コード1を返す。
+"""
+
+from typing import Dict, List
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from lxml import etree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scrapers.kabutan import KabutanScraper  # noqa: E402
+from src.scrapers.matsui import MatsuiScraper  # noqa: E402
+from src.scrapers.stockweather import StockWeatherScraper  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+SCRAPERS = {
+    "kabutan": KabutanScraper,
+    "stockweather": StockWeatherScraper,
+    "matsui": MatsuiScraper,
+}
+
+
+def load_fixtures() -> Dict[str, Dict]:
+    """フィクスチャと期待値を読み込む"""
+    with open(os.path.join(FIXTURES_DIR, "expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+    for name, entry in expected.items():
+        with open(os.path.join(FIXTURES_DIR, f"{name}.html"), encoding="utf-8") as f:
+            entry["html"] = f.read()
+    return expected
+
+
+def check_correctness(fixtures: Dict[str, Dict]) -> List[str]:
+    """抽出結果を期待値と比較し、不一致の内容を返す"""
+    errors = []
+    for name, entry in fixtures.items():
+        page = SCRAPERS[entry["scraper"]]().extract(entry["html"])
+        if page.codes != entry["codes"]:
+            errors.append(f"{name}: codes mismatch (got {len(page.codes)}, expected {len(entry['codes'])})")
+        if page.update_date != entry["update_date"]:
+            errors.append(f"{name}: update_date {page.update_date!r} != {entry['update_date']!r}")
+    return errors
+
+
+# 較正用の文書（パーサーのコードに依存しない固定の表）
+_CALIBRATION_HTML = (
+    "<html><body><table>"
+    + "".join(f'<tr><td><a href="/stock/?code={1000 + i}">{1000 + i}</a></td><td>{i * 37 % 9000:,}</td></tr>' for i in range(300))
+    + "</table></body></html>"
+).encode("utf-8")
+
+
+class _CountingTarget:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def start(self, tag, attrib) -> None:
+        self.count += len(attrib.get("href", ""))
+
+    def end(self, tag) -> None:
+        pass
+
+    def data(self, text) -> None:
+        self.count += text.count(",")
+
+    def close(self) -> int:
+        return self.count
+
+
+def calibrate(rounds: int, iterations: int = 200) -> float:
+    """このマシンでの較正用の処理の速度（回/秒、複数ラウンドの最良値）"""
+    best = 0.0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            parser = etree.HTMLParser(target=_CountingTarget())
+            etree.fromstring(_CALIBRATION_HTML, parser)
+        best = max(best, iterations / (time.perf_counter() - started))
+    return best
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(fixtures: Dict[str, Dict], iterations: int, rounds: int) -> Dict[str, Dict[str, float]]:
+    """スクレイパーごとにページ/秒・レイテンシのパーセンタイル・ピークメモリを測定"""
+    results = {}
+    for scraper_name, scraper_class in SCRAPERS.items():
+        scraper = scraper_class()
+        pages = [entry["html"] for entry in fixtures.values() if entry["scraper"] == scraper_name]
+
+        # ウォームアップ
+        for html in pages:
+            scraper.extract(html)
+
+        # 負荷の揺らぎを避けるため、複数ラウンドのうち最も良いラウンドを採用
+        best = None
+        for _ in range(rounds):
+            latencies = []
+            started = time.perf_counter()
+            for _ in range(iterations):
+                for html in pages:
+                    t0 = time.perf_counter()
+                    scraper.extract(html)
+                    latencies.append(time.perf_counter() - t0)
+            elapsed = time.perf_counter() - started
+            if best is None or elapsed < best[0]:
+                best = (elapsed, latencies)
+        elapsed, latencies = best
+
+        tracemalloc.start()
+        for html in pages:
+            scraper.extract(html)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        latencies.sort()
+        results[scraper_name] = {
+            "pages_per_sec": len(latencies) / elapsed,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "mean_ms": statistics.fmean(latencies) * 1000,
+            "peak_kib": peak / 1024,
+        }
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    calibration: float,
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+) -> List[str]:
+    """
+    ベースラインと比較し、許容範囲を超えた劣化を返す
+
+    速度・レイテンシは較正値の比（このマシン / ベースラインのマシン）で換算してから比較し、
+    メモリはそのまま比較する
+    """
+    speed = calibration / baseline["calibration"]["ops_per_sec"]
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get("parsers", {}).get(name)
+        if not base:
+            continue
+        expected_pps = base["pages_per_sec"] * speed
+        if current["pages_per_sec"] < expected_pps * (1 - tolerance):
+            regressions.append(f"{name}: pages/sec {current['pages_per_sec']:.0f} < baseline {expected_pps:.0f} (calibrated)")
+        expected_p95 = base["p95_ms"] / speed
+        if current["p95_ms"] > expected_p95 * (1 + tolerance):
+            regressions.append(f"{name}: p95_ms {current['p95_ms']:.2f} > baseline {expected_p95:.2f} (calibrated)")
+        if current["peak_kib"] > base["peak_kib"] * (1 + tolerance):
+            regressions.append(f"{name}: peak_kib {current['peak_kib']:.2f} > baseline {base['peak_kib']:.2f}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="パーサーのオフラインベンチマーク")
+    parser.add_argument("--iterations", type=int, default=100, help="1ラウンドあたりの各ページの測定回数（デフォルト: 100）")
+    parser.add_argument("--rounds", type=int, default=5, help="測定ラウンド数（デフォルト: 5）")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="ベースラインからの許容劣化率（デフォルト: 0.3）")
+    parser.add_argument("--update-baseline", action="store_true", help="結果をベースラインとして保存")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+
+    errors = check_correctness(fixtures)
+    for error in errors:
+        print(f"NG {error}")
+    if errors:
+        return 1
+    print(f"OK {len(fixtures)} fixtures")
+
+    calibration = calibrate(args.rounds)
+    results = measure(fixtures, args.iterations, args.rounds)
+    print(f"\ncalibration {calibration:.0f} ops/s")
+    print(f"\n{'parser':<14}{'pages/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'peak KiB':>10}")
+    for name, r in results.items():
+        print(f"{name:<14}{r['pages_per_sec']:>10.0f}{r['p50_ms']:>9.3f}{r['p95_ms']:>9.3f}{r['p99_ms']:>9.3f}{r['peak_kib']:>10.1f}")
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump({"calibration": {"ops_per_sec": calibration}, "parsers": results}, f, indent=2)
+        print(f"\nベースラインを更新しました: {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("\nベースラインがありません（--update-baseline で作成）")
+        return 0
+
+    with open(BASELINE_PATH, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if "calibration" not in baseline:
+        print("\nベースラインに較正値がありません（--update-baseline で作り直してください）")
+        return 1
+    regressions = compare(results, calibration, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+CLI起動時間のベンチマーク
+
+`python -X importtime -c "import src.main"` の累積import時間と `--help` の実行時間を測定し、
+予算を超えた場合、または重い依存（requests・lxml・Playwright）が起動時に読み込まれた場合は
+終了コード1を返す。
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-ms 80
+"""
+
+from typing import Dict, List
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 起動時に読み込まれてはいけないモジュール（ランキング取得時にだけ必要）
+HEAVY_MODULES = ["requests", "urllib3", "lxml", "playwright", "bs4", "src.scrapers.base"]
+
+
+def import_times() -> Dict[str, int]:
+    """-X importtime の出力から、モジュールごとの累積import時間（マイクロ秒）を取得"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)", line)
+        if match:
+            times[match.group(2)] = int(match.group(1))
+    return times
+
+
+def loaded_heavy_modules() -> List[str]:
+    """src.main のimport後に読み込まれている重いモジュール"""
+    code = (
+        "import sys, src.main; "
+        f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def help_wall_ms(runs: int) -> float:
+    """`python -m src.main --help` の実行時間の中央値（ミリ秒）"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "src.main", "--help"], cwd=ROOT_DIR, capture_output=True, check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="CLI起動時間のベンチマーク")
+    parser.add_argument("--budget-ms", type=float, default=100, help="src.mainの累積import時間の上限（デフォルト: 100ms）")
+    parser.add_argument("--runs", type=int, default=5, help="測定回数（デフォルト: 5）")
+    args = parser.parse_args()
+
+    # 揺らぎを避けるため最小値を採用
+    import_ms = min(import_times()["src.main"] for _ in range(args.runs)) / 1000
+    heavy = loaded_heavy_modules()
+    help_ms = help_wall_ms(args.runs)
+
+    print(f"import src.main : {import_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"--help          : {help_ms:.1f} ms (wall clock, median)")
+    print(f"heavy modules   : {', '.join(heavy) if heavy else 'none'}")
+
+    failed = False
+    if import_ms > args.budget_ms:
+        print("NG import time over budget")
+        failed = True
+    if heavy:
+        print("NG heavy modules imported at startup")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
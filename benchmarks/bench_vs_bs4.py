@@ -0,0 +1,160 @@
+"""
+BeautifulSoupによる以前の抽出処理と、現在の1パスのlxml抽出（extract）の比較
+
+以前の処理はベースラインのコミット（40f0734）の各スクレイパーのparse・parse_update_dateを
+そのまま写したもの（カブタンは銘柄コードと更新日で2回パースしていた）。
+benchmarks/fixtures/ の各ページについて、両方の1ページあたりの抽出時間と結果の一致を確認する。
+
+    pip install beautifulsoup4   # 比較用（アプリケーションの依存関係には含めない）
+    python benchmarks/bench_vs_bs4.py
+    python benchmarks/bench_vs_bs4.py --iterations 50 --rounds 3
+
+銘柄コード・更新日が一致しない場合は終了コード1を返す。
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parsers import SCRAPERS, load_fixtures  # noqa: E402
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+
+# ここから40f0734のparse・parse_update_date（self以外は変更なし）
+
+def kabutan_parse(html: str) -> List[str]:
+    soup = BeautifulSoup(html, "lxml")
+    codes = []
+    links = soup.find_all("a", href=re.compile(r"/stock/\?code="))
+    for link in links:
+        if link.parent and link.parent.name == "td":
+            match = re.search(r"code=(\d{3,4}[A-Z]?)", link["href"])
+            if match:
+                code = match.group(1)
+                if len(code) >= 4 and code not in codes:
+                    codes.append(code)
+    return codes
+
+
+def kabutan_parse_update_date(html: str) -> Optional[str]:
+    if not html:
+        return None
+    soup = BeautifulSoup(html, "lxml")
+    time_tag = soup.find("time")
+    if time_tag and time_tag.get("datetime"):
+        datetime_str = time_tag["datetime"]
+        try:
+            dt = datetime.fromisoformat(datetime_str.replace("+09:00", "+09:00"))
+            return dt.strftime("%Y%m%d")
+        except ValueError:
+            match = re.search(r"(\d{4})-(\d{2})-(\d{2})", datetime_str)
+            if match:
+                return f"{match.group(1)}{match.group(2)}{match.group(3)}"
+    return None
+
+
+def stockweather_parse(html: str) -> List[str]:
+    soup = BeautifulSoup(html, "lxml")
+    codes = []
+    links = soup.find_all("a", href=re.compile(r"stockdetail\.aspx.*stkcode="))
+    for link in links:
+        match = re.search(r"stkcode=(\d{3,4}[A-Z]?)", link["href"])
+        if match:
+            code = match.group(1)
+            if code not in codes:
+                codes.append(code)
+    return codes
+
+
+def matsui_parse(html: str) -> List[str]:
+    soup = BeautifulSoup(html, "lxml")
+    codes = []
+    tables = soup.find_all("table")
+    if len(tables) >= 2:
+        table = tables[1]
+        rows = table.find_all("tr")
+        for row in rows[1:]:
+            cells = row.find_all("td")
+            if len(cells) >= 2:
+                text = cells[1].get_text(strip=True)
+                match = re.search(r"(\d{3,4}[A-Z]?)(?:\s|東)", text)
+                if match:
+                    code = match.group(1)
+                    if len(code) >= 4 and code not in codes:
+                        codes.append(code)
+    return codes
+
+# ここまで40f0734
+
+
+def _kabutan(html: str) -> Tuple[List[str], Optional[str]]:
+    # 以前は1ページ目の更新日のために同じHTMLをもう一度パースしていた
+    return kabutan_parse(html), kabutan_parse_update_date(html)
+
+
+BS4_EXTRACTORS: Dict[str, Callable[[str], Tuple[List[str], Optional[str]]]] = {
+    "kabutan": _kabutan,
+    "stockweather": lambda html: (stockweather_parse(html), None),
+    "matsui": lambda html: (matsui_parse(html), None),
+}
+
+
+def time_per_page(extract: Callable[[str], object], pages: List[str], iterations: int, rounds: int) -> float:
+    """1ページあたりの抽出秒数（複数ラウンドの最良値）"""
+    for html in pages:
+        extract(html)
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for html in pages:
+                extract(html)
+        best = min(best, (time.perf_counter() - started) / (iterations * len(pages)))
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="BeautifulSoupによる以前の抽出処理とlxml抽出の比較")
+    parser.add_argument("--iterations", type=int, default=20, help="1ラウンドあたりの各ページの測定回数（デフォルト: 20）")
+    parser.add_argument("--rounds", type=int, default=3, help="測定ラウンド数（デフォルト: 3）")
+    args = parser.parse_args()
+
+    if BeautifulSoup is None:
+        print("beautifulsoup4がインストールされていません（pip install beautifulsoup4）")
+        return 2
+
+    fixtures = load_fixtures()
+
+    mismatches = []
+    for name, entry in fixtures.items():
+        before = BS4_EXTRACTORS[entry["scraper"]](entry["html"])
+        page = SCRAPERS[entry["scraper"]]().extract(entry["html"])
+        # 以前の処理は更新日を取らないスクレイパーがあるため、取っていたものだけ比較
+        if before[0] != page.codes or (before[1] is not None and before[1] != page.update_date):
+            mismatches.append(name)
+    for name in mismatches:
+        print(f"NG {name}: 抽出結果が以前の処理と異なります")
+
+    print(f"{'parser':<14}{'bs4 ms':>10}{'lxml ms':>10}{'speedup':>10}")
+    for scraper_name, scraper_class in SCRAPERS.items():
+        pages = [entry["html"] for entry in fixtures.values() if entry["scraper"] == scraper_name]
+        scraper = scraper_class()
+        before = time_per_page(BS4_EXTRACTORS[scraper_name], pages, args.iterations, args.rounds)
+        after = time_per_page(scraper.extract, pages, args.iterations, args.rounds)
+        print(f"{scraper_name:<14}{before * 1000:>10.3f}{after * 1000:>10.3f}{before / after:>9.1f}x")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+ベンチマーク用の合成フィクスチャの生成
+
+benchmarks/fixtures/ の *.html は、このスクリプトで生成した合成ページ（実サイトの保存ではない）。
+各サイトのランキング表の構造（コードの置き場所・更新日の表記）と、抽出で問題になりやすい
+ケース（英字付きコード、ヘッダーのナビゲーションリンク、3桁コード、重複リンク、最終ページの先、
+未描画のページ）を再現したもので、銘柄名・見出し・数値はすべて架空。
+カブタンの売買代金ランキングだけは売買代金（百万円）の列を加え、見出しから列の位置を求める
+処理を確認できるようにしているが、各ランキングの列の並びは実サイトで確認したものではなく、
+実サイトの表の変更は検出できない。
+実ページでの確認には record_fixtures.py で保存したページを使う。
+
+    python benchmarks/generate_fixtures.py
+
+乱数のシードは固定のため、何度実行しても同じファイルになる。
+"""
+
+from typing import Dict, List, Sequence, Tuple
+import json
+import os
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+SEED = 20260109
+UPDATE_DATE = "20260109"
+
+
+def sample_codes(rng: random.Random, n: int, alphanumeric: Sequence[str] = ()) -> List[str]:
+    """架空の4桁コードn件（英字付きコードを4件目から7件おきに差し込む）"""
+    codes = [str(c) for c in rng.sample(range(1301, 9998), n)]
+    for i, code in enumerate(alphanumeric):
+        codes[3 + i * 7] = code
+    return codes
+
+
+def sample_name(rng: random.Random) -> str:
+    # 数字を含めない（松井証券のセルでは銘柄名の直後にコードが続くため）
+    return "サンプル銘柄" + "".join(rng.choice("アイウエオカキクケコ") for _ in range(2))
+
+
+def header_nav() -> str:
+    """ランキング外の銘柄リンクを含むヘッダー（抽出対象外）"""
+    links = "".join(f'<li><a href="/stock/?code={c}">{c} 注目</a></li>' for c in ("7203", "6758", "9984"))
+    return f'<div id="header"><ul class="nav">{links}</ul><form action="/stock/"><input name="code"></form></div>'
+
+
+# ページの大きさを実サイトに近づけるための本文以外の要素
+FILLER = "".join(
+    f'<div class="news"><a href="/news/?b=n{i}">（合成データ）見出し{i}</a><span>2026/01/09 15:{i % 60:02d}</span></div>'
+    for i in range(60)
+)
+
+
+def kabutan_page(
+    rng: random.Random, rows: int, alphanumeric: Sequence[str] = (), trading_value: bool = False
+) -> Tuple[str, List[str]]:
+    codes = sample_codes(rng, rows, alphanumeric)
+    body = []
+    for code in codes:
+        # 売買代金（百万円）の列
+        traded = f"<td>{rng.randint(100, 999999):,}</td>" if trading_value else ""
+        body.append(
+            f'<tr><td class="tac"><a href="/stock/?code={code}">{code}</a></td>'
+            f'<th scope="row" class="tal">{sample_name(rng)}</th><td class="tac">東Ｐ</td>'
+            f'<td class="gaiyou_icon"><a href="/stock/chart?code={code}"><img src="/images/cmn/gaiyou_icon.gif"></a></td>'
+            f'<td>{rng.randint(100, 90000):,}</td><td class="w61"><span class="up">+{rng.randint(1, 999)}</span></td>'
+            f'<td class="w50"><span class="up">+{rng.uniform(0, 30):.2f}%</span></td><td>{rng.randint(1000, 9999999):,}</td>'
+            f"{traded}<td>{rng.uniform(1, 99):.2f}</td><td>{rng.uniform(0.1, 9):.2f}</td></tr>"
+        )
+    # 3桁コードのリンク（除外対象）
+    body.insert(5, '<tr><td class="tac"><a href="/stock/?code=130">130</a></td><th>指数</th></tr>')
+    html = (
+        '<!DOCTYPE html><html lang="ja"><head><meta charset="utf-8"><title>株探</title><script src="/js/app.js"></script></head><body>'
+        + header_nav()
+        + FILLER
+        + '<div class="meigara_count"><time datetime="2026-01-09T15:30+09:00">2026年01月09日 15:30</time>現在</div>'
+        '<table class="stock_table st_market"><thead><tr><th>コード</th><th>銘柄名</th><th>市場</th><th></th><th>株価</th>'
+        '<th colspan="2">前日比</th><th>出来高</th>'
+        + ("<th>売買代金<br>(百万円)</th>" if trading_value else "")
+        + "<th>PER</th><th>PBR</th></tr></thead><tbody>"
+        + "".join(body)
+        + "</tbody></table>"
+        + FILLER
+        + "</body></html>"
+    )
+    return html, codes
+
+
+def kabutan_empty_page() -> str:
+    """最終ページの先（ランキングの行がない）"""
+    return (
+        '<!DOCTYPE html><html lang="ja"><head><meta charset="utf-8"></head><body>'
+        + header_nav()
+        + '<div class="meigara_count"><time datetime="2026-01-09T15:30+09:00"></time></div>'
+        '<table class="stock_table st_market"><thead><tr><th>コード</th></tr></thead><tbody></tbody></table></body></html>'
+    )
+
+
+def stockweather_page(rng: random.Random) -> Tuple[str, List[str]]:
+    codes = sample_codes(rng, 50, ("485A",))
+    rows = "".join(
+        f'<tr><td class="rank">{i}</td><td class="name"><a href="stockdetail.aspx?cntcode=JP&amp;skubun=1&amp;stkcode={code}">'
+        f"{sample_name(rng)}</a><br>{code}</td><td>{rng.randint(100, 90000):,}</td><td>+{rng.uniform(0, 20):.2f}%</td>"
+        f"<td>{rng.randint(1000, 9999999):,}</td></tr>"
+        for i, code in enumerate(codes, 1)
+    )
+    # 同じ銘柄へのリンクがもう1回出る行（重複は除外される）
+    duplicate = f'<tr><td>-</td><td><a href="stockdetail.aspx?cntcode=JP&amp;skubun=1&amp;stkcode={codes[0]}">重複</a></td></tr>'
+    html = (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>StockWeather</title></head><body><form id="form1" action="ranking.aspx">'
+        '<div class="menu"><a href="ranking.aspx?type=1">値上がり率</a><a href="ranking.aspx?type=2">寄付からの値上がり率</a></div>'
+        + FILLER
+        + '<table class="rankingTable"><tr><th>順位</th><th>銘柄</th><th>株価</th><th>騰落率</th><th>出来高</th></tr>'
+        + rows
+        + duplicate
+        + "</table>"
+        + FILLER
+        + "</form></body></html>"
+    )
+    return html, codes
+
+
+def matsui_page(rng: random.Random) -> Tuple[str, List[str]]:
+    codes = sample_codes(rng, 50, ("285A",))
+    rows = "".join(
+        f'<tr><td class="rank">{i}</td><td class="name"><a href="/stock/{code}/index">{sample_name(rng)}</a><br>'
+        f"<span>{code}</span> <span>東証P</span></td><td>{rng.randint(1000, 99999):,}</td><td>{rng.randint(100, 90000):,}</td></tr>"
+        for i, code in enumerate(codes, 1)
+    )
+    html = (
+        '<!DOCTYPE html><html lang="ja"><head><meta charset="utf-8"><title>ティック回数ランキング</title></head><body>'
+        # 1つ目のテーブル（検索条件）にもコードに見える文字列がある
+        '<table class="search"><tr><td>市場</td><td>1301 東証 検索条件</td></tr><tr><td>x</td><td>7203 東証</td></tr></table>'
+        + FILLER
+        + '<table class="ranking"><tr><td>順位</td><td>銘柄名/コード</td><td>ティック回数</td><td>株価</td></tr>'
+        + rows
+        + "</table>"
+        + FILLER
+        + "</body></html>"
+    )
+    return html, codes
+
+
+MATSUI_NOT_RENDERED = "<!DOCTYPE html><html><body><table><tr><td>読み込み中...</td></tr></table></body></html>"
+
+
+def generate() -> Dict[str, Dict]:
+    """フィクスチャ名 → {"scraper", "codes", "update_date", "html"}"""
+    rng = random.Random(SEED)
+    fixtures: Dict[str, Dict] = {}
+
+    def add(name: str, scraper: str, html: str, codes: List[str], update_date) -> None:
+        fixtures[name] = {"scraper": scraper, "synthetic": True, "codes": codes, "update_date": update_date, "html": html}
+
+    for ranking in ("up", "down", "volume", "trading_value", "active"):
+        html, codes = kabutan_page(rng, 15, ("285A", "130A") if ranking == "up" else (), ranking == "trading_value")
+        add(f"kabutan_{ranking}", "kabutan", html, codes, UPDATE_DATE)
+    html, codes = kabutan_page(rng, 15)
+    add("kabutan_up_page2", "kabutan", html, codes, UPDATE_DATE)
+    add("kabutan_empty", "kabutan", kabutan_empty_page(), [], UPDATE_DATE)
+
+    for ranking in ("up_from_open", "down_from_open"):
+        html, codes = stockweather_page(rng)
+        add(f"stockweather_{ranking}", "stockweather", html, codes, None)
+
+    html, codes = matsui_page(rng)
+    add("matsui_tick", "matsui", html, codes, None)
+    add("matsui_not_rendered", "matsui", MATSUI_NOT_RENDERED, [], None)
+    return fixtures
+
+
+def write_fixtures(fixtures: Dict[str, Dict], directory: str = FIXTURES_DIR) -> None:
+    """HTMLとexpected.jsonを書き出す（expected.jsonの既存の項目は残す）"""
+    os.makedirs(directory, exist_ok=True)
+    expected_path = os.path.join(directory, "expected.json")
+    try:
+        with open(expected_path, encoding="utf-8") as f:
+            expected = json.load(f)
+    except FileNotFoundError:
+        expected = {}
+
+    for name, entry in fixtures.items():
+        with open(os.path.join(directory, f"{name}.html"), "w", encoding="utf-8") as f:
+            f.write(entry["html"])
+        expected[name] = {key: value for key, value in entry.items() if key != "html"}
+
+    with open(expected_path, "w", encoding="utf-8") as f:
+        json.dump(expected, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    fixtures = generate()
+    write_fixtures(fixtures)
+    print(f"{len(fixtures)}件の合成フィクスチャを書き出しました: {FIXTURES_DIR}")
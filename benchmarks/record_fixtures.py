@@ -0,0 +1,69 @@
+"""
+実サイトのランキングページをフィクスチャとして保存
+
+各ランキングの1ページ目を取得して benchmarks/fixtures/recorded_<ランキング種類>.html に保存し、
+現在のパーサーの抽出結果をexpected.jsonに記録する（"synthetic": false）。
+記録した銘柄コードはブラウザで見たランキングと照合してからコミットすること
+（パーサーが壊れた状態で記録すると、その誤りを期待値として固定してしまう）。
+
+    python benchmarks/record_fixtures.py                  # 全ランキング
+    python benchmarks/record_fixtures.py up tick          # 指定したランキングのみ
+
+通信にはHTTPキャッシュを使わず、松井証券はブラウザ（Playwright）で描画する。
+"""
+
+from typing import List
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_fixtures import FIXTURES_DIR, write_fixtures  # noqa: E402
+from src.scrapers import SCRAPER_REGISTRY, get_scraper_class  # noqa: E402
+from src.scrapers.archive import configure_archive  # noqa: E402
+from src.scrapers.cache import configure_http_cache  # noqa: E402
+
+
+def record(rankings: List[str]) -> int:
+    configure_http_cache(False)
+    configure_archive(False)
+
+    fixtures = {}
+    for ranking_type in rankings:
+        source, _ = SCRAPER_REGISTRY[ranking_type]
+        scraper = get_scraper_class(ranking_type)()
+        url = scraper.get_url(ranking_type)
+        try:
+            html = scraper.fetch(url)
+        except Exception as e:
+            print(f"NG {ranking_type}: {e}")
+            continue
+        page = scraper.extract(html)
+        fixtures[f"recorded_{ranking_type}"] = {
+            "scraper": source,
+            "synthetic": False,
+            "url": url,
+            "codes": page.codes,
+            "update_date": page.update_date,
+            "html": html,
+        }
+        print(f"OK {ranking_type}: {len(page.codes)}件 {', '.join(page.codes[:5])} ... 更新日={page.update_date}")
+
+    write_fixtures(fixtures)
+    print(f"\n{len(fixtures)}件を保存しました: {FIXTURES_DIR}（銘柄コードを実際のランキングと照合してください）")
+    return 0 if len(fixtures) == len(rankings) else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="実サイトのランキングページをフィクスチャとして保存")
+    parser.add_argument("rankings", nargs="*", help=f"ランキング種類（省略時は全て: {', '.join(SCRAPER_REGISTRY)}）")
+    args = parser.parse_args()
+    unknown = [r for r in args.rankings if r not in SCRAPER_REGISTRY]
+    if unknown:
+        parser.error(f"不明なランキング種類: {', '.join(unknown)}")
+    return record(args.rankings or list(SCRAPER_REGISTRY))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,10 @@
 """設定ファイル - URL定義とランキング種類"""
 
+import os
+
+# プロジェクトのルート（src/の親ディレクトリ、データベース・キャッシュは実行時のカレントディレクトリによらずこの下に置く）
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 # カブタン
 KABUTAN_URLS = {
     "up": "https://kabutan.jp/warning/?mode=2_1",  # 値上がり率
@@ -9,16 +14,160 @@ KABUTAN_URLS = {
     "active": "https://kabutan.jp/warning/?mode=2_9",  # 活況銘柄
 }
 
+# カブタンの1ページあたりの行数（初回のページ数見積もりに使用、以降は実測値を使用）
+KABUTAN_ROWS_PER_PAGE = 15
+
+# カブタンで取得するページ数の上限（15行×40ページで600位まで）
+KABUTAN_MAX_PAGES = 40
+
 # ストックウェザー
 STOCKWEATHER_URLS = {
     "up_from_open": "https://finance.stockweather.co.jp/contents/ranking.aspx?type=2&mkt=0&cat=0000",  # 寄付からの値上がり率
     "down_from_open": "https://finance.stockweather.co.jp/contents/ranking.aspx?type=3&mkt=0&cat=0000",  # 寄付からの値下がり率
 }
 
+# ストックウェザーのページ送り（2ページ目以降はURLに「&page=N」を付ける）
+# サイトがパラメータを無視した場合は2ページ目が1ページ目の繰り返しになり、そこで打ち切る
+# パラメータ名を実サイトで確認するまでは1ページ目のみ取得する（確認後にMAX_PAGESを戻す）
+STOCKWEATHER_PAGE_PARAM = "page"
+STOCKWEATHER_ROWS_PER_PAGE = 50
+STOCKWEATHER_MAX_PAGES = 1
+
 # 松井証券
 MATSUI_URLS = {
     "tick": "https://finance.matsui.co.jp/ranking-tick/index",  # ティック回数
 }
 
+# 松井証券のページ送り（ストックウェザーと同様、繰り返しのページで打ち切る）
+# ストックウェザーと同様、パラメータ名を実サイトで確認するまでは1ページ目のみ取得する
+MATSUI_PAGE_PARAM = "page"
+MATSUI_ROWS_PER_PAGE = 50
+MATSUI_MAX_PAGES = 1
+
+# 松井証券のブラウザ設定
+MATSUI_HEADLESS = False  # ボット対策のため既定ではヘッドレスモードを無効化
+MATSUI_WAIT_SELECTOR = "table >> nth=1 >> tr >> nth=1"  # ランキングテーブルのデータ行が描画されるまで待つ
+MATSUI_PAGE_TIMEOUT = 60000  # ページ読み込みのタイムアウト（ミリ秒）
+
+# 松井証券の高速経路（ブラウザが読み込むJSONのエンドポイントを学習し、以降は直接取得）
+MATSUI_FAST_PATH = True
+MATSUI_ENDPOINT_FILE = os.path.join(PROJECT_ROOT, ".cache", "matsui_endpoints.json")  # 学習したエンドポイントの保存先
+
+# ブラウザで読み込まないリソース（Playwrightのresource_type）
+BROWSER_BLOCKED_RESOURCE_TYPES = {"image", "font", "stylesheet", "media"}
+
+# ブラウザで読み込まないURL（アクセス解析・広告など、部分一致）
+BROWSER_BLOCKED_URL_PATTERNS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "facebook.net",
+    "yahoo.co.jp/ads",
+    "ads-twitter.com",
+]
+
+# 東証の立会時間（前場・後場、日本時間）
+MARKET_SESSIONS = [("09:00", "11:30"), ("12:30", "15:30")]
+
+# 休場日カレンダー（1行1日、YYYY-MM-DD形式、#以降はコメント）
+# 土日と年末年始（12/31〜1/3）は自動で休場扱い（実行時のカレントディレクトリによらずプロジェクトのルートから読む）
+MARKET_HOLIDAYS_FILE = os.path.join(PROJECT_ROOT, "market_holidays.txt")
+
+# ランキング履歴のデータベース（--history指定時に保存）
+HISTORY_DB_PATH = os.path.join(PROJECT_ROOT, "data", "history.sqlite3")
+
+# 複数ランキングの統合（--fusion）: 統合するランキング種類とその重み
+FUSION_WEIGHTS = {
+    "up": 1.0,
+    "volume": 1.0,
+    "trading_value": 1.0,
+    "active": 1.0,
+    "tick": 1.0,
+}
+
+# Reciprocal Rank Fusionの定数k（大きいほど下位の順位差を重視しない）
+FUSION_RRF_K = 60
+
+# 重複ウォッチリストに入れる条件（いくつのランキングに入っているか）
+FUSION_MIN_RANKINGS = 2
+
+# 取得エンジン
+#   "thread": ランキングごと・ページごとのスレッドで取得（requests、PlaywrightのSync API）
+#   "async": 1つのイベントループで全ランキング・全ページを並行に取得（httpx、PlaywrightのAsync API）
+ENGINE = "thread"
+
+# HTMLの抽出を行う場所
+#   "thread": ページを取得したワーカースレッドでそのまま抽出（GILで直列化される）
+#   "process": 常駐のプロセスプールにHTMLを送り、銘柄コードだけを受け取る（多数のページを並列取得する場合向け）
+PARSE_EXECUTOR = "thread"
+
+# プロセスプールのワーカー数（Noneの場合はCPUコア数）
+PARSE_PROCESSES = None
+
+# 取得したページの生データのアーカイブ（--archive指定時に保存、--replay DATEで通信せずに再実行できる）
+# ウォッチモードでは更新ごとに増え、ARCHIVE_MAX_BYTESまでディスクを使うため既定では無効
+ARCHIVE_ENABLED = False
+ARCHIVE_PATH = os.path.join(PROJECT_ROOT, "data", "archive.sqlite3")
+ARCHIVE_MAX_BYTES = 200 * 1024 * 1024  # 圧縮後の合計サイズの上限（超えたら古い取得から削除）
+
+# 銘柄マスター（JPXの上場銘柄一覧から「symbols build」で作成、あれば出力時に銘柄コードを検証）
+SYMBOLS_INDEX_PATH = os.path.join(PROJECT_ROOT, "data", "symbols.idx")
+
+# 銘柄マスターにないコードをウォッチリストから除外するか
+# （新規上場銘柄が落ちないよう、JPXの一覧が更新されたら作り直すこと）
+SYMBOLS_DROP_UNKNOWN = True
+
+# 市場・商品区分に含まれる文字列 → TradingViewの取引所プレフィックス
+# JPXの上場銘柄一覧は東証の銘柄のみのため、該当しなければSYMBOL_DEFAULT_PREFIXを使う
+SYMBOL_PREFIXES = {}
+SYMBOL_DEFAULT_PREFIX = "TSE"
+
+# インタラクティブモードの先読み（メニューの表示中に、よく選ぶランキングを取得し始める）
+INTERACTIVE_STATS_FILE = os.path.join(PROJECT_ROOT, ".cache", "interactive_stats.json")  # 過去の選択の集計
+PREFETCH_RANKINGS = 3  # 先読みするランキングの最大数
+PREFETCH_MIN_RATIO = 0.5  # 過去の起動のうちこの割合以上で選ばれたランキングだけ先読みする
+
+# ローカルHTTPサーバー（serveサブコマンド、取得結果をメモリに保持して複数のクライアントに配信）
+SERVE_HOST = "127.0.0.1"  # 他の端末から読む場合は"0.0.0.0"
+SERVE_PORT = 8765
+SERVE_REFRESH_INTERVAL = 60  # 立会時間中にランキングを取り直す間隔（秒）
+SERVE_READY_TIMEOUT = 60  # 起動直後、最初の取得が終わるまでリクエストを待たせる最大秒数
+
 # User-Agent
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# ホストごとのレート制限（トークンバケット）
+# rate: 1秒あたりに補充されるリクエスト数, burst: バケット容量, concurrency: 同時リクエスト数の上限
+HOST_RATE_LIMITS = {
+    "kabutan.jp": {"rate": 2.0, "burst": 4, "concurrency": 4},
+    "finance.stockweather.co.jp": {"rate": 1.0, "burst": 2, "concurrency": 2},
+    "finance.matsui.co.jp": {"rate": 0.5, "burst": 1, "concurrency": 1},
+}
+
+# 上記に含まれないホストに適用するレート制限
+DEFAULT_HOST_RATE_LIMIT = {"rate": 1.0, "burst": 1, "concurrency": 1}
+
+# HTTPリクエストのタイムアウト（秒、(接続, 読み込み)）
+# 失敗時は下記のリトライ・ヘッジで補うため、1回あたりは短めにする
+HTTP_TIMEOUT = (5, 10)
+
+# リトライ（5xx・429・タイムアウト・接続エラー時に指数バックオフで再試行）
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BACKOFF_BASE = 0.5  # 1回目の待機秒数（以降2倍ずつ、ジッターあり）
+RETRY_BACKOFF_MAX = 4.0
+
+# ヘッジリクエスト（観測したp95レイテンシを超えたら同じリクエストをもう1本送る）
+HEDGE_ENABLED = True
+HEDGE_MIN_SAMPLES = 20  # p95を使い始めるまでに必要な観測数
+HEDGE_MIN_DELAY = 0.2  # ヘッジを送るまでの最短待機秒数
+
+# サーキットブレーカー（連続で失敗したホストへのリクエストを一定時間即座に失敗させる）
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30  # 遮断を続ける秒数（経過後に1本だけ試行）
+
+# HTTPキャッシュ（ETag/Last-Modifiedで再検証するディスクキャッシュ）
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_PATH = os.path.join(PROJECT_ROOT, ".cache", "http_cache.sqlite3")
+HTTP_CACHE_TTL = 60  # この秒数以内のキャッシュは再検証せずにそのまま使用
+HTTP_CACHE_MAX_BYTES = 50 * 1024 * 1024  # 圧縮後の合計サイズの上限（超えたら最終利用が古い順に削除）
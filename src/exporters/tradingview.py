@@ -1,6 +1,13 @@
-from typing import List
-from datetime import datetime
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import os
+import tempfile
+
+from ..config import SYMBOL_DEFAULT_PREFIX, SYMBOLS_DROP_UNKNOWN
+from ..fileutil import replace_file
+from ..market import now_jst
+from ..metrics import metrics
+from ..symbols import SymbolMaster
 
 
 # ランキング種類の日本語ファイル名
@@ -13,46 +20,179 @@ RANKING_FILENAMES = {
     "up_from_open": "寄りからの上昇",
     "down_from_open": "寄りからの下落",
     "tick": "ティック回数",
+    "fusion_intersection": "複合_重複",
+    "fusion_union": "複合_いずれか",
+    "fusion_rrf": "複合_RRF",
+    "fusion_weighted": "複合_加重",
 }
 
+# 全ランキングをセクションごとにまとめたウォッチリストのファイル名
+COMBINED_FILENAME = "ウォッチリスト"
+
+
+def tradingview_symbols(codes: Iterable[str], symbols: Optional[SymbolMaster] = None) -> List[str]:
+    """
+    銘柄コードをTradingViewのシンボルに変換
+
+    銘柄マスターがある場合は取引所プレフィックスを解決し、
+    config.SYMBOLS_DROP_UNKNOWNなら一覧にないコードを除外する
+    """
+    if symbols is None:
+        return [f"{SYMBOL_DEFAULT_PREFIX}:{code}" for code in codes]
+
+    result = []
+    for code in codes:
+        symbol = symbols.get(code)
+        if symbol:
+            result.append(symbol.tradingview)
+            continue
+        metrics.count("unknown_symbols_total")
+        if not SYMBOLS_DROP_UNKNOWN:
+            result.append(f"{SYMBOL_DEFAULT_PREFIX}:{code}")
+    return result
+
+
+def format_section(ranking_type: str, symbols: List[str]) -> str:
+    """まとめたウォッチリストの1セクション（###セクション名,TSE:XXXX,...）"""
+    section_name = RANKING_FILENAMES.get(ranking_type, ranking_type)
+    return ",".join([f"###{section_name}"] + symbols)
+
 
 class TradingViewExporter:
     """TradingView形式でウォッチリストを出力"""
 
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output", combined: bool = False, symbols: Optional[SymbolMaster] = None):
         """
         Args:
             output_dir: 出力ディレクトリ
+            combined: Trueの場合、batch()の終了時に全ランキングを###セクションで
+                まとめたウォッチリストも出力する
+            symbols: 銘柄マスター（指定した場合、コードを検証して取引所プレフィックスを解決する）
         """
         self.output_dir = output_dir
+        self.combined = combined
+        self.symbols = symbols
         os.makedirs(output_dir, exist_ok=True)
+        # まとめ出力用の、ランキングごとの最後に出力したシンボル（ランキング種類 → (日付, シンボル)）
+        # ウォッチモードでは変化したランキングしかexport()されないため、他のセクションはここから補う
+        self._sections: Dict[str, Tuple[str, List[str]]] = {}
+        # batch()中に溜めている出力（ファイルパス → (ランキング種類, 日付, 銘柄コード)）
+        self._pending: Optional[Dict[str, Tuple[str, str, List[str]]]] = None
 
-    def export(self, codes: List[str], ranking_type: str, update_date: str = None) -> str:
+    def format_codes(self, codes: Iterable[str]) -> str:
+        """銘柄コードリストを TSE:XXXX,TSE:YYYY,... 形式に変換"""
+        return ",".join(self.tradingview_symbols(codes))
+
+    def tradingview_symbols(self, codes: Iterable[str]) -> List[str]:
+        """銘柄コードをTradingViewのシンボルに変換（銘柄マスターがあれば検証する）"""
+        return tradingview_symbols(codes, self.symbols)
+
+    def get_filepath(self, name: str, date_str: str) -> str:
+        """ファイル名生成: [日本語ランキング名]_[日付].txt"""
+        japanese_name = RANKING_FILENAMES.get(name, name)
+        return os.path.join(self.output_dir, f"{japanese_name}_{date_str}.txt")
+
+    def export(self, codes: Iterable[str], ranking_type: str, update_date: str = None) -> str:
         """
         銘柄コードリストをTradingView形式で出力
 
+        batch()の中で呼ばれた場合は、batch()の終了時にまとめて書き込む
+
         Args:
-            codes: 銘柄コードのリスト（例: ['7203', '6758', ...]）
+            codes: 銘柄コードのリスト（例: ['7203', '6758', ...]）、取得しながら順に返すイテレーターも可
             ranking_type: ランキング種類（ファイル名に使用）
-            update_date: サイトの更新日（YYYYMMDD形式、Noneの場合は現在日付を使用）
+            update_date: サイトの更新日（YYYYMMDD形式、Noneの場合は日本時間の現在日付を使用）
 
         Returns:
             出力ファイルパス
         """
-        # TSE:XXXX,TSE:YYYY,... 形式に変換
-        tse_codes = [f"TSE:{code}" for code in codes]
-        watchlist = ",".join(tse_codes)
+        # 更新日が指定されていない場合は現在日付（日本時間）を使用
+        date_str = update_date if update_date else now_jst().strftime("%Y%m%d")
+        filepath = self.get_filepath(ranking_type, date_str)
 
-        # ファイル名生成: [日本語ランキング名]_[日付].txt
-        # 更新日が指定されていない場合は現在日付を使用
-        date_str = update_date if update_date else datetime.now().strftime("%Y%m%d")
-        japanese_name = RANKING_FILENAMES.get(ranking_type, ranking_type)
-        filename = f"{japanese_name}_{date_str}.txt"
-        filepath = os.path.join(self.output_dir, filename)
-
-        # ファイルに書き込み
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(watchlist)
+        if self._pending is not None:
+            self._pending[filepath] = (ranking_type, date_str, list(codes))
+        else:
+            self.write(filepath, self.format_codes(codes))
 
         return filepath
 
+    @contextmanager
+    def batch(self) -> Iterator[List[str]]:
+        """
+        実行中のexport()をまとめ、終了時に一括で書き込むコンテキストマネージャ
+
+        Yields:
+            終了時に書き込んだ（または内容が同じため省略した）ファイルパスのリスト
+        """
+        self._pending = {}
+        written: List[str] = []
+        try:
+            yield written
+        finally:
+            pending, self._pending = self._pending, None
+            written.extend(self._flush(pending))
+
+    def _flush(self, pending: Dict[str, Tuple[str, str, List[str]]]) -> List[str]:
+        paths = []
+        for filepath, (ranking_type, date_str, codes) in pending.items():
+            symbols = self.tradingview_symbols(codes)
+            self.write(filepath, ",".join(symbols))
+            paths.append(filepath)
+            self._sections[ranking_type] = (date_str, symbols)
+
+        if self.combined and pending:
+            # ###セクション名,TSE:XXXX,... をランキングごとに並べた1ファイル
+            # （このバッチで出力しなかったランキングも、同じ日付の最後の内容を含める）
+            date_str = next(iter(pending.values()))[1]
+            sections = [
+                format_section(ranking_type, symbols)
+                for ranking_type, (section_date, symbols) in self._sections.items()
+                if section_date == date_str
+            ]
+            filepath = self.get_filepath(COMBINED_FILENAME, date_str)
+            self.write(filepath, ",".join(sections))
+            paths.append(filepath)
+
+        return paths
+
+    def write(self, filepath: str, content: str) -> bool:
+        """
+        ファイルをアトミックに書き込む（一時ファイルに書いてからリネーム）
+
+        読み込み中のプロセスが書きかけのファイルを見ることはない。
+        ディスク上のファイルと内容が同じ場合は書き込まない（削除・編集されていれば書き直す）。
+
+        Args:
+            filepath: 出力ファイルパス
+            content: 書き込む内容
+
+        Returns:
+            書き込んだ場合True、内容が同じため省略した場合False
+        """
+        with metrics.stage("export"):
+            return self._write(filepath, content)
+
+    def _write(self, filepath: str, content: str) -> bool:
+        data = content.encode("utf-8")
+
+        try:
+            with open(filepath, "rb") as f:
+                if f.read(len(data) + 1) == data:
+                    return False
+        except FileNotFoundError:
+            pass
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filepath) or ".", prefix=".tmp_", suffix=".txt")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            replace_file(tmp_path, filepath)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return True
@@ -0,0 +1,33 @@
+"""一時ファイルからのアトミックな置き換え"""
+
+import os
+import threading
+
+_umask = None
+_umask_lock = threading.Lock()
+
+
+def _default_mode() -> int:
+    """新規ファイルの通常のパーミッション（0o666からumaskを除いたもの）"""
+    global _umask
+    with _umask_lock:
+        if _umask is None:
+            # umaskは設定しないと読めないため、一度だけ読み取って戻す
+            _umask = os.umask(0)
+            os.umask(_umask)
+    return 0o666 & ~_umask
+
+
+def replace_file(tmp_path: str, path: str) -> None:
+    """
+    一時ファイルをpathにリネームする
+
+    mkstempの一時ファイルは0600で作られるため、既存ファイルのパーミッション
+    （なければ通常の新規ファイルと同じパーミッション）にしてから置き換える
+    """
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = _default_mode()
+    os.chmod(tmp_path, mode)
+    os.replace(tmp_path, path)
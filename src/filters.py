@@ -0,0 +1,125 @@
+"""行データ（株価・騰落率・出来高・売買代金）によるランキングの絞り込みと並べ替え（NumPyで一括計算）"""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import operator
+import re
+
+import numpy as np
+
+from .scrapers.columns import FIELDS, RowColumns
+
+# 比較演算子（長いものから照合する）
+OPERATORS = {
+    "<=": operator.le,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+}
+
+# 数値の末尾に付けられる単位
+UNITS = {"": 1.0, "万": 1e4, "億": 1e8, "兆": 1e12}
+
+_FILTER_PATTERN = re.compile(
+    r"^\s*(?P<field>\w+)\s*(?P<op><=|>=|==|!=|<|>)\s*(?P<value>[-+]?\d+(?:\.\d+)?(?:e[-+]?\d+)?)\s*(?P<unit>万|億|兆)?\s*$",
+    re.IGNORECASE,
+)
+
+
+class RowFilter(NamedTuple):
+    """列と値の比較（例: price<3000）"""
+
+    field: str
+    op: str
+    value: float
+
+
+def parse_filter(expr: str) -> RowFilter:
+    """
+    「列 演算子 値」の形式の条件を解釈
+
+    例: "price<3000"、"trading_value>=10億"、"change_pct>5"
+
+    Raises:
+        ValueError: 形式が正しくない、または列名が不明な場合
+    """
+    match = _FILTER_PATTERN.match(expr)
+    if not match:
+        raise ValueError(f"条件の形式が正しくありません: {expr}（例: price<3000, trading_value>=10億）")
+    field = match.group("field")
+    if field not in FIELDS:
+        raise ValueError(f"不明な列です: {field}（{', '.join(FIELDS)}）")
+    value = float(match.group("value")) * UNITS[match.group("unit") or ""]
+    return RowFilter(field, match.group("op"), value)
+
+
+def parse_sort(expr: str) -> Tuple[str, bool]:
+    """
+    並べ替えの指定を解釈（先頭に「-」を付けると降順）
+
+    Returns:
+        タプル（列名, 降順か）
+
+    Raises:
+        ValueError: 列名が不明な場合
+    """
+    descending = expr.startswith("-")
+    field = expr.lstrip("-+")
+    if field not in FIELDS:
+        raise ValueError(f"不明な列です: {field}（{', '.join(FIELDS)}）")
+    return field, descending
+
+
+def column_arrays(columns: RowColumns) -> Dict[str, np.ndarray]:
+    """
+    行データをNumPyの配列にする（コピーしない）
+
+    売買代金の列がないソースは株価×出来高で概算する
+    """
+    arrays = {field: np.frombuffer(values, dtype=np.float64) for field, values in columns.columns.items()}
+    traded = arrays["trading_value"]
+    estimate = arrays["price"] * arrays["volume"]
+    arrays["trading_value"] = np.where(np.isnan(traded), estimate, traded)
+    return arrays
+
+
+def select_codes(
+    codes: Sequence[str],
+    columns: Optional[RowColumns],
+    filters: Sequence[RowFilter] = (),
+    sort: Optional[Tuple[str, bool]] = None,
+) -> List[str]:
+    """
+    条件をすべて満たす銘柄を、指定の列の順（省略時は順位順）で返す
+
+    値のない銘柄（NaN）はその列の条件を満たさず、並べ替えでは末尾になる
+
+    Args:
+        codes: 銘柄コード（順位順）
+        columns: codesの順の行データ（Noneの場合は何もしない）
+        filters: 条件のリスト
+        sort: (列名, 降順か)
+
+    Returns:
+        銘柄コードのリスト
+    """
+    if columns is None or not (filters or sort):
+        return list(codes)
+
+    arrays = column_arrays(columns)
+    mask = np.ones(len(codes), dtype=bool)
+    for row_filter in filters:
+        values = arrays[row_filter.field]
+        # NaNとの比較は != だけTrueになるため、値のない行は明示的に除く
+        mask &= OPERATORS[row_filter.op](values, row_filter.value) & ~np.isnan(values)
+    indices = np.flatnonzero(mask)
+
+    if sort:
+        field, descending = sort
+        keys = arrays[field][indices]
+        # NaNは昇順・降順とも末尾（同じ値は順位順）
+        order = np.argsort(-keys if descending else keys, kind="stable")
+        indices = indices[order]
+
+    return [codes[i] for i in indices.tolist()]
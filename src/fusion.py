@@ -0,0 +1,119 @@
+"""複数ランキングの統合（銘柄×ランキングの順位行列をNumPyで一括計算）"""
+
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from .config import FUSION_MIN_RANKINGS, FUSION_RRF_K, FUSION_WEIGHTS
+
+# 統合ウォッチリストの種類（TradingViewExporterのランキング種類として出力）
+FUSION_INTERSECTION = "fusion_intersection"
+FUSION_UNION = "fusion_union"
+FUSION_RRF = "fusion_rrf"
+FUSION_WEIGHTED = "fusion_weighted"
+
+
+class RankMatrix(NamedTuple):
+    """銘柄×ランキングの順位行列（0は圏外）"""
+
+    codes: np.ndarray  # 銘柄コード（昇順）
+    columns: List[str]  # 列名（ランキング種類、またはスナップショット）
+    ranks: np.ndarray  # shape=(銘柄数, 列数)
+    lengths: np.ndarray  # 列ごとのランキングの長さ
+
+
+def build_rank_matrix(columns: Mapping[str, Sequence[str]]) -> RankMatrix:
+    """
+    順位順の銘柄コードリストから順位行列を作る
+
+    Args:
+        columns: 列名 → 銘柄コードのリスト（順位順、重複なし）
+
+    Returns:
+        RankMatrix
+    """
+    names = list(columns)
+    lengths = np.array([len(columns[name]) for name in names], dtype=np.int64)
+    flat = np.array([code for name in names for code in columns[name]], dtype=str)
+
+    codes, rows = np.unique(flat, return_inverse=True)
+    cols = np.repeat(np.arange(len(names)), lengths)
+    # 列ごとの先頭位置を引いて1始まりの順位にする
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    ranks = np.zeros((len(codes), len(names)), dtype=np.float64)
+    ranks[rows, cols] = np.arange(len(flat)) - starts + 1
+    return RankMatrix(codes, names, ranks, lengths)
+
+
+def fuse(
+    columns: Mapping[str, Sequence[str]],
+    weights: Optional[Mapping[str, float]] = None,
+    top: Optional[int] = None,
+    k: float = FUSION_RRF_K,
+    min_rankings: int = FUSION_MIN_RANKINGS,
+) -> Dict[str, List[str]]:
+    """
+    複数ランキングを統合したウォッチリストを計算
+
+    - fusion_intersection: min_rankings個以上のランキングに入った銘柄（入った数、RRFの順）
+    - fusion_union: いずれかのランキングに入った銘柄（最高順位、RRFの順）
+    - fusion_rrf: Reciprocal Rank Fusion（Σ w / (k + 順位)）の順
+    - fusion_weighted: 各ランキング内の相対順位（1位=1、最下位≒0）の加重平均の順
+
+    Args:
+        columns: 列名 → 銘柄コードのリスト（順位順）
+        weights: 列名 → 重み（省略時はすべて1）
+        top: 各ウォッチリストの最大件数
+        k: RRFの定数
+        min_rankings: fusion_intersectionに必要なランキング数
+
+    Returns:
+        統合ウォッチリストの種類 → 銘柄コードのリスト
+    """
+    matrix = build_rank_matrix(columns)
+    if not len(matrix.codes):
+        return {FUSION_INTERSECTION: [], FUSION_UNION: [], FUSION_RRF: [], FUSION_WEIGHTED: []}
+
+    w = np.array([(weights or {}).get(name, 1.0) for name in matrix.columns], dtype=np.float64)
+    ranks = matrix.ranks
+    present = ranks > 0
+
+    hits = present.sum(axis=1)
+    rrf = np.where(present, w / (k + ranks), 0.0).sum(axis=1)
+    relative = np.where(present, 1.0 - (ranks - 1) / np.maximum(matrix.lengths, 1), 0.0)
+    weighted = (relative * w).sum(axis=1) / w.sum()
+    best_rank = np.where(present, ranks, np.inf).min(axis=1)
+
+    # lexsortは最後のキーが第1キー（同点は銘柄コード順）
+    by_hits = np.lexsort((-rrf, -hits))
+    by_hits = by_hits[hits[by_hits] >= min_rankings]
+    by_best = np.lexsort((-rrf, best_rank))
+    by_rrf = np.argsort(-rrf, kind="stable")
+    by_weighted = np.argsort(-weighted, kind="stable")
+
+    def codes_of(order: np.ndarray) -> List[str]:
+        return matrix.codes[order[:top]].tolist()
+
+    return {
+        FUSION_INTERSECTION: codes_of(by_hits),
+        FUSION_UNION: codes_of(by_best),
+        FUSION_RRF: codes_of(by_rrf),
+        FUSION_WEIGHTED: codes_of(by_weighted),
+    }
+
+
+def fuse_rankings(results: Mapping[str, Sequence[str]], top: Optional[int] = None) -> Dict[str, List[str]]:
+    """
+    取得したランキングのうちconfig.FUSION_WEIGHTSに含まれるものを統合
+
+    Args:
+        results: ランキング種類 → 銘柄コードのリスト
+        top: 各ウォッチリストの最大件数
+
+    Returns:
+        統合ウォッチリストの種類 → 銘柄コードのリスト（対象のランキングが2つ未満なら空）
+    """
+    columns = {name: codes for name, codes in results.items() if name in FUSION_WEIGHTS and codes}
+    if len(columns) < 2:
+        return {}
+    return fuse(columns, FUSION_WEIGHTS, top)
@@ -0,0 +1,136 @@
+"""ランキング履歴の保存と集計（SQLite）"""
+
+from datetime import datetime
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+import os
+import sqlite3
+
+from .market import JST
+
+
+class HistoryStore:
+    """
+    取得したランキングのスナップショットを1行1銘柄で保存する
+
+    同じ日に複数回取得した場合（ウォッチモードなど）、集計には各日の最後のスナップショットを使う
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLiteファイルのパス
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    ranking_type TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    fetched_at TEXT NOT NULL,
+                    rank INTEGER NOT NULL,
+                    code TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS snapshots_code_date ON snapshots (code, date)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS snapshots_ranking_date ON snapshots (ranking_type, date, fetched_at)"
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def record(self, ranking_type: str, date: str, codes: List[str], fetched_at: Optional[str] = None) -> None:
+        """
+        スナップショットを保存（1回のバルクインサート）
+
+        Args:
+            ranking_type: ランキング種類
+            date: サイトの更新日（YYYYMMDD形式）
+            codes: 銘柄コードのリスト（順位順）
+            fetched_at: 取得時刻（ISO形式、省略時は日本時間の現在時刻）
+        """
+        fetched_at = fetched_at or datetime.now(JST).isoformat(timespec="seconds")
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO snapshots (ranking_type, date, fetched_at, rank, code) VALUES (?, ?, ?, ?, ?)",
+                [(ranking_type, date, fetched_at, rank, code) for rank, code in enumerate(codes, 1)],
+            )
+
+    def iter_sessions(self, ranking_type: str) -> Iterator[Tuple[str, str]]:
+        """
+        新しい順に立会日と、その日の最後のスナップショットの取得時刻を返す
+
+        インデックスを日付ごとに飛び越えて辿るため、蓄積量によらず日数分の探索で済む
+
+        Args:
+            ranking_type: ランキング種類
+
+        Yields:
+            (日付, 取得時刻)
+        """
+        date = self._conn.execute(
+            "SELECT MAX(date) FROM snapshots WHERE ranking_type = ?", (ranking_type,)
+        ).fetchone()[0]
+        while date is not None:
+            fetched_at = self._conn.execute(
+                "SELECT MAX(fetched_at) FROM snapshots WHERE ranking_type = ? AND date = ?", (ranking_type, date)
+            ).fetchone()[0]
+            yield date, fetched_at
+            date = self._conn.execute(
+                "SELECT MAX(date) FROM snapshots WHERE ranking_type = ? AND date < ?", (ranking_type, date)
+            ).fetchone()[0]
+
+    def rank_on(self, code: str, ranking_type: str, date: str, fetched_at: str) -> Optional[int]:
+        """指定スナップショットでの順位（ランク外ならNone）"""
+        row = self._conn.execute(
+            "SELECT rank FROM snapshots WHERE code = ? AND date = ? AND ranking_type = ? AND fetched_at = ?",
+            (code, date, ranking_type, fetched_at),
+        ).fetchone()
+        return row[0] if row else None
+
+    def frequency(self, code: str, ranking_type: str, top: int, last: int) -> Tuple[int, int]:
+        """
+        直近last日のうち、何日top位以内に入っていたか
+
+        Args:
+            code: 銘柄コード
+            ranking_type: ランキング種類
+            top: 順位の閾値
+            last: 対象とする直近の日数
+
+        Returns:
+            タプル（top位以内だった日数, 対象日数）
+        """
+        sessions = list(islice(self.iter_sessions(ranking_type), last))
+        hits = 0
+        for date, fetched_at in sessions:
+            rank = self.rank_on(code, ranking_type, date, fetched_at)
+            if rank is not None and rank <= top:
+                hits += 1
+        return hits, len(sessions)
+
+    def streak(self, code: str, ranking_type: str, top: int) -> int:
+        """
+        最新の日から連続してtop位以内に入っている日数
+
+        Args:
+            code: 銘柄コード
+            ranking_type: ランキング種類
+            top: 順位の閾値
+
+        Returns:
+            連続日数
+        """
+        count = 0
+        for date, fetched_at in self.iter_sessions(ranking_type):
+            rank = self.rank_on(code, ranking_type, date, fetched_at)
+            if rank is None or rank > top:
+                break
+            count += 1
+        return count
@@ -0,0 +1,332 @@
+"""ジョブ定義ファイル（TOML/YAML）による複数ウォッチリストの一括生成：ページは1回だけ取得して各ジョブに配る"""
+
+from contextlib import ExitStack, contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Type
+
+from .exporters.tradingview import TradingViewExporter
+from .history import HistoryStore
+from .market import now_jst
+from .runner import RankingResult, fetch_rankings
+from .scrapers import SCRAPER_REGISTRY
+from .scrapers.columns import configure_columns
+from .symbols import get_symbol_master
+
+if TYPE_CHECKING:
+    from .scrapers.base import BaseScraper
+
+
+class Job(NamedTuple):
+    """1つのウォッチリスト生成（CLIの1回の実行に相当）"""
+
+    name: str
+    rankings: List[str]
+    count: int
+    output: str
+    combined: bool = False
+    fusion: bool = False
+    filters: Tuple[str, ...] = ()
+    sort: Optional[str] = None
+
+
+# ジョブの既定値（ファイルの[defaults]で上書きできる）
+JOB_DEFAULTS: Dict[str, Any] = {
+    "count": 50,
+    "output": "output",
+    "combined": False,
+    "fusion": False,
+    "filters": [],
+    "sort": None,
+}
+
+
+def _read_manifest(path: str) -> Dict[str, Any]:
+    if path.lower().endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("YAMLの読み込みにはPyYAMLが必要です（pip install pyyaml）。TOMLで書くこともできます")
+        with open(path, encoding="utf-8") as f:
+            try:
+                return yaml.safe_load(f) or {}
+            except yaml.YAMLError as e:
+                raise ValueError(f"{path}: YAMLの形式が正しくありません: {e}")
+
+    try:
+        import tomllib
+    except ImportError:
+        # Python 3.10以前
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ImportError("Python 3.10以前でTOMLを読み込むにはtomliが必要です（pip install tomli）")
+    with open(path, "rb") as f:
+        try:
+            return tomllib.load(f)
+        except tomllib.TOMLDecodeError as e:
+            raise ValueError(f"{path}: TOMLの形式が正しくありません: {e}")
+
+
+def load_manifest(path: str) -> List[Job]:
+    """
+    ジョブ定義ファイルを読み込む
+
+    [defaults] に共通の設定、[[jobs]] に各ジョブを書く（YAMLでも同じ構造）。
+    rankingsは "all" で全ランキング。
+
+        [defaults]
+        count = 50
+
+        [[jobs]]
+        name = "desk-a"
+        rankings = ["up", "volume"]
+        count = 100
+        output = "output/desk-a"
+        filters = ["price<3000"]
+        sort = "-trading_value"
+
+    Args:
+        path: ファイルパス（.toml、.yaml/.yml）
+
+    Returns:
+        Jobのリスト
+
+    Raises:
+        ValueError: 内容が正しくない場合（TOML/YAMLの構文エラーを含む）
+        ImportError: YAMLを読むのにPyYAMLがない場合
+    """
+    data = _read_manifest(path)
+    if not isinstance(data, dict) or not isinstance(data.get("jobs"), list) or not data["jobs"]:
+        raise ValueError(f"{path}: [[jobs]] がありません")
+
+    defaults = {**JOB_DEFAULTS, **(data.get("defaults") or {})}
+    jobs = []
+    names = set()
+    for i, entry in enumerate(data["jobs"], 1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"{path}: {i}番目のジョブの形式が正しくありません")
+        settings = {**defaults, **entry}
+        name = str(settings.get("name") or f"job{i}")
+        if name in names:
+            raise ValueError(f"{path}: ジョブ名が重複しています: {name}")
+        names.add(name)
+
+        rankings = settings.get("rankings")
+        if rankings == "all":
+            rankings = list(SCRAPER_REGISTRY)
+        if isinstance(rankings, str):
+            rankings = [rankings]
+        if not rankings:
+            raise ValueError(f"{path}: {name}: rankingsを指定してください")
+        unknown = [r for r in rankings if r not in SCRAPER_REGISTRY]
+        if unknown:
+            raise ValueError(f"{path}: {name}: 不明なランキング種類: {', '.join(unknown)}")
+
+        count = settings["count"]
+        if not isinstance(count, int) or count < 1:
+            raise ValueError(f"{path}: {name}: countは1以上の整数で指定してください")
+
+        filters = settings.get("filters") or []
+        if isinstance(filters, str):
+            filters = [filters]
+        jobs.append(
+            Job(
+                name,
+                list(dict.fromkeys(rankings)),
+                count,
+                str(settings["output"]),
+                bool(settings["combined"]),
+                bool(settings["fusion"]),
+                tuple(filters),
+                settings.get("sort"),
+            )
+        )
+
+    for job in jobs:
+        if job.filters or job.sort:
+            # 条件の書き間違いは取得を始める前に知らせる
+            try:
+                _selector(job)
+            except ValueError as e:
+                raise ValueError(f"{path}: {e}")
+    return jobs
+
+
+def plan_fetches(jobs: List[Job]) -> Dict[str, int]:
+    """
+    取得するランキングと、いずれかのジョブが必要とする最大の件数
+
+    各ランキングはこの件数で1回だけ取得し、件数の少ないジョブには上位を切り出して渡す
+
+    Returns:
+        ランキング種類 → 銘柄数（ジョブに現れた順）
+    """
+    plan: Dict[str, int] = {}
+    for job in jobs:
+        for ranking_type in job.rankings:
+            plan[ranking_type] = max(plan.get(ranking_type, 0), job.count)
+    return plan
+
+
+def _selector(job: Job) -> Optional[Callable[[List[str], Any], List[str]]]:
+    """ジョブの--filter/--sort相当の指定から、(銘柄コード, 行データ) → 出力する銘柄コード の関数を作る"""
+    if not job.filters and not job.sort:
+        return None
+    # NumPyは絞り込むジョブがあるときだけ読み込む
+    from .filters import parse_filter, parse_sort, select_codes
+
+    try:
+        filters = [parse_filter(expr) for expr in job.filters]
+        sort = parse_sort(job.sort) if job.sort else None
+    except ValueError as e:
+        raise ValueError(f"{job.name}: {e}")
+    return lambda codes, columns: select_codes(codes, columns, filters, sort)
+
+
+@contextmanager
+def _job_batch(
+    job: Job, exporter: TradingViewExporter, echo: Callable[..., None], failed: Dict[str, Exception]
+) -> Iterator[List[str]]:
+    """exporter.batch()の終了時の書き込みに失敗した場合、エラーを記録して他のジョブの書き込みを続ける"""
+    body_done = False
+    try:
+        with exporter.batch() as written:
+            yield written
+            body_done = True
+    except Exception as e:
+        # 取得中の例外（with文の本体）はそのまま送出する
+        if not body_done:
+            raise
+        failed.setdefault(job.name, e)
+        echo(f"[{job.name}] 書き込みエラー: {e}", err=True)
+
+
+def run_jobs(
+    jobs: List[Job],
+    scraper_map: "Mapping[str, Tuple[str, Type[BaseScraper]]]",
+    echo: Callable[..., None],
+    history: Optional[HistoryStore] = None,
+) -> Dict[str, List[str]]:
+    """
+    全ジョブのランキングをまとめて取得し、各ジョブのウォッチリストを出力
+
+    ジョブの絞り込み・出力に失敗した場合はそのジョブのエラーとして表示し、他のジョブは続ける
+
+    Args:
+        jobs: ジョブのリスト
+        scraper_map: ランキング種類 → (ソース名, スクレイパークラス) のマッピング
+        echo: ログ出力関数（click.echo互換）
+        history: 指定した場合、取得結果（最大の件数）を履歴データベースに保存する
+
+    Returns:
+        ジョブ名 → 出力したファイルパスのリスト
+    """
+    all_jobs = jobs
+    # ジョブ名 → 最初に起きた絞り込み・出力のエラー
+    failed: Dict[str, Exception] = {}
+    written: Dict[str, List[str]] = {job.name: [] for job in jobs}
+
+    symbols = get_symbol_master()
+    selectors = {}
+    exporters = {}
+    for job in jobs:
+        try:
+            selectors[job.name] = _selector(job)
+            exporters[job.name] = TradingViewExporter(job.output, combined=job.combined, symbols=symbols)
+        except Exception as e:
+            failed[job.name] = e
+            echo(f"[{job.name}] エラー: {e}", err=True)
+    # 準備に失敗したジョブは取得の対象にも含めない
+    jobs = [job for job in jobs if job.name in exporters]
+    if any(selectors.get(job.name) for job in jobs):
+        configure_columns(True)
+
+    plan = plan_fetches(jobs)
+    # 統合用に、ジョブごとに出力したランキングを保持
+    fetched: Dict[str, Dict[str, List[str]]] = {job.name: {} for job in jobs}
+
+    shared_update_date = None
+    with ExitStack() as stack:
+        for job in jobs:
+            written[job.name] = stack.enter_context(_job_batch(job, exporters[job.name], echo, failed))
+
+        echo(f"{len(plan)}件のランキングを取得中（{len(jobs)}ジョブ）...")
+        for result in fetch_rankings(list(plan), plan, scraper_map):
+            ranking_type = result.ranking_type
+            if result.error:
+                echo(f"[{ranking_type}] エラー: {result.error}", err=True)
+                continue
+            if not result.codes:
+                echo(f"[{ranking_type}] 銘柄が取得できませんでした")
+                continue
+
+            echo(f"[{ranking_type}] {len(result.codes)}件の銘柄を取得しました")
+            if result.columns is not None and not result.columns.has_values():
+                echo(f"[{ranking_type}] 警告: 行データ（株価・出来高など）を取得できなかったため、絞り込み・並べ替えできません", err=True)
+            if len(result.codes) < plan[ranking_type] and result.exhausted:
+                if result.failed_page:
+                    reason = f"{result.failed_page}ページ目の取得に失敗した"
+                elif result.max_pages_reached:
+                    reason = "最大ページ数（config）に達した"
+                else:
+                    reason = "ランキングの末尾に達した"
+                echo(f"[{ranking_type}] {reason}ため{len(result.codes)}件で打ち切りました")
+            if result.update_date and not shared_update_date:
+                shared_update_date = result.update_date
+            date_to_use = result.update_date or shared_update_date
+
+            if history:
+                history.record(ranking_type, date_to_use or now_jst().strftime("%Y%m%d"), result.codes)
+
+            for job in jobs:
+                if ranking_type not in job.rankings:
+                    continue
+                try:
+                    codes = _job_codes(job, result, selectors[job.name])
+                    exporters[job.name].export(codes, ranking_type, date_to_use)
+                except Exception as e:
+                    failed.setdefault(job.name, e)
+                    echo(f"  [{job.name}] {ranking_type}: エラー: {e}", err=True)
+                    continue
+                fetched[job.name][ranking_type] = codes
+                echo(f"  [{job.name}] {ranking_type}: {len(codes)}件")
+
+        for job in jobs:
+            if job.fusion:
+                try:
+                    _export_fusion(job, exporters[job.name], fetched[job.name], shared_update_date, echo)
+                except Exception as e:
+                    failed.setdefault(job.name, e)
+                    echo(f"  [{job.name}] fusion: エラー: {e}", err=True)
+
+    for job in all_jobs:
+        echo(f"[{job.name}] {len(written[job.name])}ファイル → {job.output}")
+        if job.name in failed:
+            echo(f"[{job.name}] エラーのため一部のウォッチリストを出力できませんでした: {failed[job.name]}", err=True)
+    return written
+
+
+def _job_codes(job: Job, result: RankingResult, select: Optional[Callable[[List[str], Any], List[str]]]) -> List[str]:
+    """最大の件数で取得した結果から、ジョブの件数分を切り出して絞り込む"""
+    codes = result.codes[:job.count]
+    if select is None:
+        return codes
+    columns = result.columns.head(job.count) if result.columns is not None else None
+    return select(codes, columns)
+
+
+def _export_fusion(
+    job: Job,
+    exporter: TradingViewExporter,
+    fetched: Dict[str, List[str]],
+    update_date: Optional[str],
+    echo: Callable[..., None],
+) -> None:
+    from .fusion import fuse_rankings
+
+    composites = fuse_rankings(fetched, top=job.count)
+    if not composites:
+        echo(f"  [{job.name}] fusion: 統合対象のランキングが2つ以上取得できなかったため省略しました")
+        return
+    for name, codes in composites.items():
+        exporter.export(codes, name, update_date)
+        echo(f"  [{job.name}] {name}: {len(codes)}件")
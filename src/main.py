@@ -1,24 +1,26 @@
 import click
-from .scrapers.kabutan import KabutanScraper
-from .scrapers.stockweather import StockWeatherScraper
-from .scrapers.matsui import MatsuiScraper
+import math
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from .config import ARCHIVE_PATH, HISTORY_DB_PATH, SERVE_HOST, SERVE_PORT, SERVE_REFRESH_INTERVAL, SYMBOLS_INDEX_PATH
 from .exporters.tradingview import TradingViewExporter
-
-
-# ランキング種類とスクレイパーのマッピング
-SCRAPER_MAP = {
-    # カブタン
-    "up": ("kabutan", KabutanScraper),
-    "down": ("kabutan", KabutanScraper),
-    "volume": ("kabutan", KabutanScraper),
-    "trading_value": ("kabutan", KabutanScraper),
-    "active": ("kabutan", KabutanScraper),
-    # ストックウェザー
-    "up_from_open": ("stockweather", StockWeatherScraper),
-    "down_from_open": ("stockweather", StockWeatherScraper),
-    # 松井証券
-    "tick": ("matsui", MatsuiScraper),
-}
+from .history import HistoryStore
+from .market import JST, now_jst
+from .metrics import metrics
+from .prefetch import Prefetcher, SelectionStats
+from .runner import ENGINES, RankingResult, configure_engine, fetch_rankings
+from .scrapers import LazyScraperMap
+from .scrapers.archive import PageArchive, configure_archive, configure_replay
+from .scrapers.cache import configure_http_cache
+from .scrapers.columns import configure_columns
+from .scrapers.parse_pool import PARSE_EXECUTORS, configure_parse_executor, warm_up
+from .symbols import SymbolMaster, build_index, get_symbol_master, read_jpx_listing
+from .watch import watch
+
+
+# ランキング種類とスクレイパーのマッピング（スクレイパーは使うときに読み込む）
+SCRAPER_MAP = LazyScraperMap()
 
 # ランキング種類の日本語名
 RANKING_NAMES = {
@@ -96,14 +98,29 @@ def select_rankings():
     return selected if selected else None
 
 
-def interactive_mode():
-    """インタラクティブモード"""
+def interactive_mode(select: Optional[Callable[[RankingResult], List[str]]] = None):
+    """インタラクティブモード（selectは--filter/--sortの指定）"""
+    # メニューの入力を待つ間に、接続・ブラウザの準備とよく選ぶランキングの取得を始めておく
+    stats = SelectionStats()
+    prefetcher = Prefetcher(SCRAPER_MAP, stats)
+    prefetcher.start()
+    try:
+        run_interactive(stats, prefetcher, select)
+    finally:
+        prefetcher.close()
+
+
+def run_interactive(
+    stats: SelectionStats, prefetcher: Prefetcher, select: Optional[Callable[[RankingResult], List[str]]] = None
+):
+    """ランキング・件数を選択して取得（先読みした結果があれば使う）"""
     # ランキング選択
     rankings_to_fetch = select_rankings()
 
     if not rankings_to_fetch:
         click.echo("終了します")
         return
+    prefetcher.select(rankings_to_fetch)
 
     # 選択されたランキングを表示
     click.echo("\n【選択されたランキング】")
@@ -112,57 +129,73 @@ def interactive_mode():
 
     # 取得件数を入力（Enterでデフォルト50件）
     count = click.prompt("\n取得する銘柄数を入力してください", type=int, default=50)
+    stats.record(rankings_to_fetch, count)
 
     # エクスポーター初期化
-    exporter = TradingViewExporter(output_dir="output")
+    exporter = TradingViewExporter(output_dir="output", symbols=get_symbol_master())
 
     # 各ランキングを取得
     click.echo("\n" + "=" * 60)
     click.echo("  取得開始")
     click.echo("=" * 60)
+    click.echo(f"\n{len(rankings_to_fetch)}件のランキングを取得中...")
 
     # 共有の更新日（最初に取得した日付を他のランキングでも使用）
     shared_update_date = None
 
-    for ranking_type in rankings_to_fetch:
-        try:
-            click.echo(f"\n[{RANKING_NAMES[ranking_type]}] 取得中...")
+    # 出力は全ランキングの取得後にまとめて書き込む
+    with exporter.batch():
+        # 全ランキングを同時に取得し（先読み済みのものはその結果を使い）、選択順に結果を処理
+        for result in prefetcher.results(rankings_to_fetch, count):
+            ranking_type = result.ranking_type
+            click.echo(f"\n[{RANKING_NAMES[ranking_type]}]")
 
-            # スクレイパーを取得
-            source, scraper_class = SCRAPER_MAP[ranking_type]
-            scraper = scraper_class(count=count)
+            if result.error:
+                click.echo(f"  → エラー: {result.error}", err=True)
+                continue
 
-            # ランキング取得（コードと更新日を取得）
-            codes, update_date = scraper.get_ranking(ranking_type)
+            try:
+                codes, update_date = result.codes, result.update_date
 
-            if not codes:
-                click.echo(f"  → 銘柄が取得できませんでした")
-                continue
+                if not codes:
+                    click.echo(f"  → 銘柄が取得できませんでした")
+                    continue
 
-            click.echo(f"  → {len(codes)}件の銘柄を取得しました")
+                click.echo(f"  → {len(codes)}件の銘柄を取得しました")
+                if len(codes) < count and result.exhausted:
+                    click.echo(f"  → {depth_message(result)}")
+                unknown = unknown_codes(codes)
+                if unknown:
+                    click.echo(f"  → 銘柄マスターにないコード: {', '.join(unknown)}")
             
-            # 更新日を共有（最初に取得した日付を保持）
-            if update_date and not shared_update_date:
-                shared_update_date = update_date
+                # 更新日を共有（最初に取得した日付を保持）
+                if update_date and not shared_update_date:
+                    shared_update_date = update_date
             
-            # 使用する日付（個別の更新日がなければ共有日付を使用）
-            date_to_use = update_date or shared_update_date
-            if date_to_use:
-                click.echo(f"  → データ更新日: {date_to_use[:4]}/{date_to_use[4:6]}/{date_to_use[6:]}")
+                # 使用する日付（個別の更新日がなければ共有日付を使用）
+                date_to_use = update_date or shared_update_date
+                if date_to_use:
+                    click.echo(f"  → データ更新日: {date_to_use[:4]}/{date_to_use[4:6]}/{date_to_use[6:]}")
+
+                if select:
+                    if not has_row_values(result):
+                        click.echo("  → 警告: 行データ（株価・出来高など）を取得できなかったため、絞り込み・並べ替えできません", err=True)
+                    codes = select(result)
+                    click.echo(f"  → 絞り込み・並べ替え: {len(result.codes)}件 → {len(codes)}件")
 
-            # TradingView形式で出力（サイトの更新日を使用）
-            filepath = exporter.export(codes, ranking_type, date_to_use)
-            click.echo(f"  → 出力: {filepath}")
+                # TradingView形式で出力（サイトの更新日を使用）
+                filepath = exporter.export(codes, ranking_type, date_to_use)
+                click.echo(f"  → 出力: {filepath}")
 
-        except Exception as e:
-            click.echo(f"  → エラー: {e}", err=True)
+            except Exception as e:
+                click.echo(f"  → エラー: {e}", err=True)
 
     click.echo("\n" + "=" * 60)
     click.echo("  完了しました")
     click.echo("=" * 60)
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option(
     "--ranking",
     "-r",
@@ -195,12 +228,120 @@ def interactive_mode():
     is_flag=True,
     help="インタラクティブモードで起動",
 )
-def main(ranking, count, all, output, interactive):
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="HTTPキャッシュを使わずに毎回取得",
+)
+@click.option(
+    "--archive",
+    "save_archive",
+    is_flag=True,
+    help=f"取得したページをアーカイブに保存（{ARCHIVE_PATH}、--replayで再実行できる）",
+)
+@click.option(
+    "--replay",
+    "replay_date",
+    default=None,
+    metavar="DATE",
+    help="通信せず、DATE（YYYYMMDD）の最後の取得をアーカイブから抽出し直して出力",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(ENGINES),
+    default=None,
+    help="取得エンジン（thread: スレッド、async: 1つのイベントループ。デフォルトはconfig.ENGINE）",
+)
+@click.option(
+    "--parse-executor",
+    type=click.Choice(PARSE_EXECUTORS),
+    default=None,
+    help="HTMLの抽出先（thread: 取得スレッド内、process: 常駐プロセスプール。デフォルトはconfig.PARSE_EXECUTOR）",
+)
+@click.option(
+    "--watch",
+    "watch_interval",
+    type=click.FloatRange(min=1),
+    default=None,
+    metavar="INTERVAL",
+    help="立会時間中にINTERVAL秒ごとに更新し続ける（Ctrl+Cで終了）",
+)
+@click.option(
+    "--combined",
+    is_flag=True,
+    help="全ランキングを###セクションでまとめたウォッチリストも出力",
+)
+@click.option(
+    "--history",
+    "record_history",
+    is_flag=True,
+    help=f"取得結果を履歴データベースに保存（{HISTORY_DB_PATH}）",
+)
+@click.option(
+    "--fusion",
+    is_flag=True,
+    help="取得したランキングを統合したウォッチリスト（重複・いずれか・RRF・加重）も出力",
+)
+@click.option(
+    "--filter",
+    "filter_exprs",
+    multiple=True,
+    metavar="EXPR",
+    help="行データで絞り込んで出力（例: \"price<3000\" \"trading_value>=10億\"、複数指定はすべて満たすもの）",
+)
+@click.option(
+    "--sort",
+    "sort_expr",
+    default=None,
+    metavar="FIELD",
+    help="行データの列で並べ替えて出力（-を付けると降順、例: -trading_value）",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="銘柄コードが確定するたびに「ランキング種類<TAB>順位<TAB>コード」を出力",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="段階ごとの所要時間・通信量の集計を表示",
+)
+@click.option(
+    "--metrics-out",
+    default=None,
+    metavar="PATH",
+    help="計測結果を書き出す（.jsonならJSON、それ以外はPrometheusのtextfile形式）",
+)
+@click.pass_context
+def main(ctx, ranking, count, all, output, interactive, no_cache, save_archive, replay_date, engine, parse_executor,
+         watch_interval, combined, record_history, fusion, filter_exprs, sort_expr, stream, profile, metrics_out):
     """株式ランキング取得 → TradingViewウォッチリスト生成ツール"""
 
+    # サブコマンド（history など）が指定された場合はそちらを実行
+    if ctx.invoked_subcommand:
+        return
+
+    if no_cache:
+        configure_http_cache(False)
+    if save_archive:
+        configure_archive(True)
+    if replay_date:
+        if not (len(replay_date) == 8 and replay_date.isdigit()):
+            raise click.BadParameter("YYYYMMDD形式で指定してください", param_hint="--replay")
+        if watch_interval:
+            raise click.UsageError("--replay と --watch は同時に指定できません")
+        configure_replay(replay_date)
+    if engine:
+        configure_engine(engine)
+    if parse_executor:
+        configure_parse_executor(parse_executor)
+    select = build_selector(filter_exprs, sort_expr)
+    # プロセスプールを使う場合は、ランキング選択や通信と並行してワーカーを起動しておく
+    warm_up()
+
     # インタラクティブモード
     if interactive or (not ranking and not all):
-        interactive_mode()
+        interactive_mode(select)
         return
 
     # 取得するランキングを決定
@@ -214,45 +355,321 @@ def main(ranking, count, all, output, interactive):
         return
 
     # エクスポーター初期化
-    exporter = TradingViewExporter(output_dir=output)
+    exporter = TradingViewExporter(output_dir=output, combined=combined, symbols=get_symbol_master())
+
+    # 履歴データベース（--history指定時のみ）
+    history_store = HistoryStore(HISTORY_DB_PATH) if record_history else None
+
+    # ウォッチモード
+    if watch_interval:
+        click.echo(f"ウォッチモード: {watch_interval:g}秒ごとに更新します（Ctrl+Cで終了）")
+        watch(rankings_to_fetch, count, SCRAPER_MAP, exporter, watch_interval, click.echo, history_store, select)
+        report_metrics(profile, metrics_out)
+        return
 
     # 共有の更新日（最初に取得した日付を他のランキングでも使用）
     shared_update_date = None
 
-    # 各ランキングを取得
-    for ranking_type in rankings_to_fetch:
-        try:
-            click.echo(f"\n[{ranking_type}] ランキングを取得中...")
+    # 統合用に取得できたランキングを保持
+    fetched = {}
 
-            # スクレイパーを取得
-            source, scraper_class = SCRAPER_MAP[ranking_type]
-            scraper = scraper_class(count=count)
+    # 出力は全ランキングの取得後にまとめて書き込む
+    with exporter.batch() as written:
+        # 全ランキングを同時に取得し、指定順に結果を処理
+        click.echo(f"\n{len(rankings_to_fetch)}件のランキングを取得中...")
+        on_code = echo_code if stream else None
+        for result in fetch_rankings(rankings_to_fetch, count, SCRAPER_MAP, on_code=on_code):
+            ranking_type = result.ranking_type
 
-            # ランキング取得（コードと更新日を取得）
-            codes, update_date = scraper.get_ranking(ranking_type)
-
-            if not codes:
-                click.echo(f"[{ranking_type}] 銘柄が取得できませんでした")
+            if result.error:
+                click.echo(f"[{ranking_type}] エラー: {result.error}", err=True)
                 continue
 
-            click.echo(f"[{ranking_type}] {len(codes)}件の銘柄を取得しました")
+            try:
+                codes, update_date = result.codes, result.update_date
+
+                if not codes:
+                    click.echo(f"[{ranking_type}] 銘柄が取得できませんでした")
+                    continue
+
+                click.echo(f"[{ranking_type}] {len(codes)}件の銘柄を取得しました")
+                if len(codes) < count and result.exhausted:
+                    click.echo(f"[{ranking_type}] {depth_message(result)}")
+                unknown = unknown_codes(codes)
+                if unknown:
+                    click.echo(f"[{ranking_type}] 銘柄マスターにないコード: {', '.join(unknown)}")
             
-            # 更新日を共有（最初に取得した日付を保持）
-            if update_date and not shared_update_date:
-                shared_update_date = update_date
+                # 更新日を共有（最初に取得した日付を保持）
+                if update_date and not shared_update_date:
+                    shared_update_date = update_date
             
-            # 使用する日付（個別の更新日がなければ共有日付を使用）
-            date_to_use = update_date or shared_update_date
-            if date_to_use:
-                click.echo(f"[{ranking_type}] データ更新日: {date_to_use[:4]}/{date_to_use[4:6]}/{date_to_use[6:]}")
+                # 使用する日付（個別の更新日がなければ共有日付を使用）
+                date_to_use = update_date or shared_update_date
+                if date_to_use:
+                    click.echo(f"[{ranking_type}] データ更新日: {date_to_use[:4]}/{date_to_use[4:6]}/{date_to_use[6:]}")
+
+                # 履歴には絞り込む前のランキングを保存
+                if history_store:
+                    history_store.record(ranking_type, date_to_use or now_jst().strftime("%Y%m%d"), codes)
+
+                if select:
+                    if not has_row_values(result):
+                        click.echo(f"[{ranking_type}] 警告: 行データ（株価・出来高など）を取得できなかったため、絞り込み・並べ替えできません", err=True)
+                    codes = select(result)
+                    click.echo(f"[{ranking_type}] 絞り込み・並べ替え: {len(result.codes)}件 → {len(codes)}件")
+
+                # TradingView形式で出力（サイトの更新日を使用）
+                filepath = exporter.export(codes, ranking_type, date_to_use)
+                click.echo(f"[{ranking_type}] 出力: {filepath}")
+                fetched[ranking_type] = codes
+
+            except Exception as e:
+                click.echo(f"[{ranking_type}] エラー: {e}", err=True)
+
+        if fusion:
+            export_fusion(exporter, fetched, count, shared_update_date)
 
-            # TradingView形式で出力（サイトの更新日を使用）
-            filepath = exporter.export(codes, ranking_type, date_to_use)
-            click.echo(f"[{ranking_type}] 出力: {filepath}")
+    if combined and written:
+        click.echo(f"まとめ出力: {written[-1]}")
 
-        except Exception as e:
-            click.echo(f"[{ranking_type}] エラー: {e}", err=True)
+    report_metrics(profile, metrics_out)
+    click.echo("\n完了しました")
+
+
+def export_fusion(exporter: TradingViewExporter, fetched: Dict[str, List[str]], count: int, update_date: str) -> None:
+    """取得済みのランキングを統合して出力（--fusion、追加の取得はしない）"""
+    # NumPyは統合するときだけ読み込む
+    from .fusion import fuse_rankings
+
+    composites = fuse_rankings(fetched, top=count)
+    if not composites:
+        click.echo("[fusion] 統合対象のランキングが2つ以上取得できなかったため省略しました")
+        return
+    for name, codes in composites.items():
+        filepath = exporter.export(codes, name, update_date)
+        click.echo(f"[fusion] {len(codes)}件: {filepath}")
+
+
+def build_selector(filter_exprs: Tuple[str, ...], sort_expr: Optional[str]) -> Optional[Callable[[RankingResult], List[str]]]:
+    """
+    --filter/--sortの指定から、取得結果 → 出力する銘柄コード の関数を作る（指定がなければNone）
+
+    指定がある場合は、ページの抽出時に行データ（株価・騰落率・出来高）も取り出すように切り替える
+    """
+    if not filter_exprs and not sort_expr:
+        return None
+    # NumPyは絞り込むときだけ読み込む
+    from .filters import parse_filter, parse_sort, select_codes
+
+    try:
+        filters = [parse_filter(expr) for expr in filter_exprs]
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--filter")
+    try:
+        sort = parse_sort(sort_expr) if sort_expr else None
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--sort")
+
+    configure_columns(True)
+    return lambda result: select_codes(result.codes, result.columns, filters, sort)
+
+
+# --stream の出力が複数ランキングのスレッドで混ざらないようにする
+_echo_lock = threading.Lock()
+
+
+def echo_code(ranking_type: str, rank: int, code: str) -> None:
+    """確定した銘柄コードを1行ずつ出力（--stream、銘柄マスターがあれば銘柄名も付ける）"""
+    master = get_symbol_master()
+    symbol = master.get(code) if master else None
+    line = f"{ranking_type}\t{rank}\t{code}\t{symbol.name}" if symbol else f"{ranking_type}\t{rank}\t{code}"
+    with _echo_lock:
+        click.echo(line)
+
+
+def has_row_values(result: RankingResult) -> bool:
+    """行データを1行でも取得できたか（JSONエンドポイントやアーカイブからの取得では行データがない）"""
+    return not result.codes or (result.columns is not None and result.columns.has_values())
+
+
+def depth_message(result: RankingResult) -> str:
+    """指定件数に届かなかった理由"""
+    if result.failed_page:
+        return f"{result.failed_page}ページ目の取得に失敗したため{len(result.codes)}件で打ち切りました"
+    if result.max_pages_reached:
+        return f"最大ページ数（config）に達したため{len(result.codes)}件で打ち切りました"
+    return f"ランキングの末尾に達しました（このランキングは{len(result.codes)}件まで）"
+
+
+def unknown_codes(codes: List[str]) -> List[str]:
+    """銘柄マスターにないコード（マスターがなければ空）"""
+    master = get_symbol_master()
+    if master is None:
+        return []
+    return [code for code in codes if code not in master]
+
+
+def report_metrics(profile: bool, metrics_out: str) -> None:
+    """計測結果を表示・出力（--profile / --metrics-out）"""
+    if profile:
+        click.echo("\n【プロファイル】")
+        click.echo(metrics.format_table())
+    if metrics_out:
+        metrics.write(metrics_out)
+        click.echo(f"計測結果: {metrics_out}")
+
+
+@main.group()
+def history():
+    """ランキング履歴の集計（--history で保存したデータを使用）"""
+
+
+@history.command("freq")
+@click.argument("code")
+@click.option("--ranking", "-r", required=True, type=click.Choice(ALL_RANKINGS, case_sensitive=False), help="ランキング種類")
+@click.option("--top", default=50, type=int, help="順位の閾値（デフォルト: 50）")
+@click.option("--last", default=20, type=int, help="対象とする直近の日数（デフォルト: 20）")
+@click.option("--db", default=HISTORY_DB_PATH, help=f"履歴データベース（デフォルト: {HISTORY_DB_PATH}）")
+def history_freq(code, ranking, top, last, db):
+    """直近LAST日のうち、CODEがTOP位以内に入った日数"""
+    store = HistoryStore(db)
+    hits, sessions = store.frequency(code.upper(), ranking, top, last)
+    click.echo(f"{code} [{RANKING_NAMES[ranking]}] 上位{top}位以内: {hits}/{sessions}日")
+
+
+@history.command("streak")
+@click.argument("code")
+@click.option("--ranking", "-r", required=True, type=click.Choice(ALL_RANKINGS, case_sensitive=False), help="ランキング種類")
+@click.option("--top", default=50, type=int, help="順位の閾値（デフォルト: 50）")
+@click.option("--db", default=HISTORY_DB_PATH, help=f"履歴データベース（デフォルト: {HISTORY_DB_PATH}）")
+def history_streak(code, ranking, top, db):
+    """最新の日からCODEが連続してTOP位以内に入っている日数"""
+    store = HistoryStore(db)
+    days = store.streak(code.upper(), ranking, top)
+    click.echo(f"{code} [{RANKING_NAMES[ranking]}] 上位{top}位以内: {days}日連続")
+
+
+@main.group()
+def symbols():
+    """銘柄マスター（JPXの上場銘柄一覧）の管理"""
+
+
+@symbols.command("build")
+@click.argument("source", type=click.Path(exists=True, dir_okay=False))
+@click.option("--out", default=SYMBOLS_INDEX_PATH, help=f"出力先（デフォルト: {SYMBOLS_INDEX_PATH}）")
+def symbols_build(source, out):
+    """JPXの上場銘柄一覧（SOURCE: data_j.xls またはCSV）から銘柄マスターを作成"""
+    try:
+        count = build_index(read_jpx_listing(source), out)
+    except (ImportError, ValueError) as e:
+        raise click.ClickException(str(e))
+    click.echo(f"{count}銘柄の銘柄マスターを作成しました: {out}")
+
+
+@symbols.command("show")
+@click.argument("codes", nargs=-1, required=True)
+@click.option("--index", default=SYMBOLS_INDEX_PATH, help=f"銘柄マスター（デフォルト: {SYMBOLS_INDEX_PATH}）")
+def symbols_show(codes, index):
+    """銘柄コードの銘柄名・市場区分・TradingViewシンボルを表示"""
+    try:
+        master = SymbolMaster(index)
+    except FileNotFoundError:
+        raise click.ClickException(f"銘柄マスターがありません。先に symbols build を実行してください: {index}")
+    for code in codes:
+        symbol = master.get(code)
+        if symbol:
+            click.echo(f"{symbol.tradingview}\t{symbol.name}\t{symbol.market}")
+        else:
+            click.echo(f"{code.upper()}\t(銘柄マスターにありません)")
+
+
+@main.group()
+def archive():
+    """取得したページのアーカイブ"""
+
+
+@archive.command("dump")
+@click.option("--ranking", "-r", required=True, type=click.Choice(ALL_RANKINGS, case_sensitive=False), help="ランキング種類")
+@click.option("--date", "date", required=True, metavar="DATE", help="取得日（YYYYMMDD）")
+@click.option("--page", default=1, type=int, help="ページ番号（デフォルト: 1）")
+@click.option("--db", default=ARCHIVE_PATH, help=f"アーカイブ（デフォルト: {ARCHIVE_PATH}）")
+def archive_dump(ranking, date, page, db):
+    """DATEの最後の取得のうち指定ページの生データを出力（パーサーの調査用）"""
+    store = PageArchive(db)
+    run_id = store.latest_run(ranking, date)
+    archived = store.load(run_id, page) if run_id else None
+    if archived is None:
+        raise click.ClickException(f"{date}の{RANKING_NAMES[ranking]}の{page}ページ目はアーカイブにありません")
+    click.echo(f"# {archived.url} ({datetime.fromtimestamp(archived.fetched_at, JST):%Y-%m-%d %H:%M:%S}, {archived.kind})", err=True)
+    click.echo(archived.content)
+
+
+@main.command("serve")
+@click.option(
+    "--ranking",
+    "-r",
+    multiple=True,
+    type=click.Choice(ALL_RANKINGS, case_sensitive=False),
+    help="配信するランキング種類（複数指定可能、省略時は全ランキング）",
+)
+@click.option("--count", "-c", default=50, type=int, help="取得する銘柄数（デフォルト: 50）")
+@click.option("--host", default=SERVE_HOST, help=f"待ち受けるアドレス（デフォルト: {SERVE_HOST}）")
+@click.option("--port", default=SERVE_PORT, type=int, help=f"待ち受けるポート（デフォルト: {SERVE_PORT}）")
+@click.option(
+    "--interval",
+    default=SERVE_REFRESH_INTERVAL,
+    type=click.FloatRange(min=1),
+    help=f"立会時間中の更新間隔（秒、デフォルト: {SERVE_REFRESH_INTERVAL}）",
+)
+def serve_command(ranking, count, host, port, interval):
+    """最新のランキングをメモリに保持し、ローカルHTTPでTradingView形式・JSONとして配信"""
+    # http.serverはサーバーを起動するときだけ読み込む
+    from .serve import serve
+
+    rankings = list(ranking) or ALL_RANKINGS
+    serve(rankings, count, SCRAPER_MAP, host, port, interval, click.echo, get_symbol_master())
+
+
+@main.command("run-jobs")
+@click.argument("manifest", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--history",
+    "record_history",
+    is_flag=True,
+    help=f"取得結果を履歴データベースに保存（{HISTORY_DB_PATH}）",
+)
+@click.option(
+    "--replay",
+    "replay_date",
+    default=None,
+    metavar="DATE",
+    help="通信せず、DATE（YYYYMMDD）の最後の取得をアーカイブから抽出し直して出力",
+)
+@click.option("--dry-run", is_flag=True, help="取得の計画（ランキングごとの件数・ページ数・使うジョブ）を表示して終了")
+def run_jobs_command(manifest, record_history, replay_date, dry_run):
+    """ジョブ定義ファイル（TOML/YAML）の全ジョブのウォッチリストを、各ランキングを1回だけ取得して生成"""
+    from .jobs import load_manifest, plan_fetches, run_jobs
+
+    try:
+        jobs = load_manifest(manifest)
+    except (ImportError, ValueError) as e:
+        raise click.ClickException(str(e))
+
+    if dry_run:
+        for ranking_type, ranking_count in plan_fetches(jobs).items():
+            scraper_class = SCRAPER_MAP[ranking_type][1]
+            pages = min(math.ceil(ranking_count / scraper_class.ROWS_PER_PAGE), scraper_class.MAX_PAGES)
+            users = ", ".join(f"{job.name}({job.count})" for job in jobs if ranking_type in job.rankings)
+            click.echo(f"{ranking_type}: {ranking_count}件（最大{pages}ページ） ← {users}")
+        return
 
+    if replay_date:
+        if not (len(replay_date) == 8 and replay_date.isdigit()):
+            raise click.BadParameter("YYYYMMDD形式で指定してください", param_hint="--replay")
+        configure_replay(replay_date)
+    warm_up()
+    history_store = HistoryStore(HISTORY_DB_PATH) if record_history else None
+    run_jobs(jobs, SCRAPER_MAP, click.echo, history_store)
     click.echo("\n完了しました")
 
 
@@ -0,0 +1,103 @@
+"""東証の立会時間・休場日の判定"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Tuple
+import os
+
+from .config import MARKET_HOLIDAYS_FILE, MARKET_SESSIONS
+
+# 日本時間（夏時間なし）
+JST = timezone(timedelta(hours=9), "JST")
+
+
+def _parse_time(value: str) -> time:
+    hour, minute = value.split(":")
+    return time(int(hour), int(minute))
+
+
+SESSIONS: List[Tuple[time, time]] = [(_parse_time(start), _parse_time(end)) for start, end in MARKET_SESSIONS]
+
+
+@lru_cache(maxsize=None)
+def load_holidays(path: str = MARKET_HOLIDAYS_FILE) -> FrozenSet[date]:
+    """
+    休場日カレンダーを読み込む
+
+    Args:
+        path: カレンダーファイルのパス（存在しない場合は空）
+
+    Returns:
+        休場日の集合
+    """
+    holidays = set()
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                value = line.split("#", 1)[0].strip()
+                if value:
+                    holidays.add(date.fromisoformat(value))
+    except FileNotFoundError:
+        pass
+    return frozenset(holidays)
+
+
+def holidays_warning(path: str = MARKET_HOLIDAYS_FILE) -> Optional[str]:
+    """休場日カレンダーがない場合の警告（あればNone）"""
+    if os.path.exists(path):
+        return None
+    return f"警告: 休場日カレンダーがありません（{path}）。祝日も立会日として扱います"
+
+
+def is_trading_day(day: date) -> bool:
+    """立会日か（土日・年末年始・カレンダーの休場日を除く）"""
+    if day.weekday() >= 5:
+        return False
+    if (day.month, day.day) in ((12, 31), (1, 1), (1, 2), (1, 3)):
+        return False
+    return day not in load_holidays()
+
+
+def now_jst() -> datetime:
+    """現在時刻（日本時間）"""
+    return datetime.now(JST)
+
+
+def is_market_open(now: Optional[datetime] = None) -> bool:
+    """
+    立会時間中か（前場・後場、昼休みは除く）
+
+    Args:
+        now: 判定する時刻（省略時は現在時刻）
+
+    Returns:
+        立会時間中ならTrue
+    """
+    now = (now or now_jst()).astimezone(JST)
+    if not is_trading_day(now.date()):
+        return False
+    current = now.time()
+    return any(start <= current < end for start, end in SESSIONS)
+
+
+def next_session_start(now: Optional[datetime] = None) -> datetime:
+    """
+    次の立会（前場または後場）の開始時刻
+
+    Args:
+        now: 基準時刻（省略時は現在時刻）
+
+    Returns:
+        開始時刻（日本時間）
+    """
+    now = (now or now_jst()).astimezone(JST)
+    day = now.date()
+    # 1年以上休場が続くことはないため、探索は366日で打ち切る
+    for _ in range(366):
+        if is_trading_day(day):
+            for start, _end in SESSIONS:
+                candidate = datetime.combine(day, start, JST)
+                if candidate > now:
+                    return candidate
+        day += timedelta(days=1)
+    raise RuntimeError("次の立会日が見つかりません")
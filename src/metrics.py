@@ -0,0 +1,198 @@
+"""処理段階ごとの計測（--profile / --metrics-out）"""
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from .fileutil import replace_file
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Prometheusのメトリクス名の接頭辞
+METRIC_PREFIX = "whatchlist"
+
+# p95の算出に残す所要時間の標本数（段階・ラベルごと、超えた分は無作為に入れ替える）
+RESERVOIR_SIZE = 1024
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    return ",".join(f"{k}={v}" for k, v in labels)
+
+
+def _prometheus_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = ",".join('{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels)
+    return "{" + escaped + "}"
+
+
+class TimingSummary(NamedTuple):
+    """段階・ラベルごとの所要時間の集計"""
+
+    count: int
+    total: float
+    max: float
+    p95: float
+
+
+class _Timing:
+    """所要時間の件数・合計・最大と、一定数の標本（reservoir sampling）"""
+
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: List[float] = []
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < RESERVOIR_SIZE:
+            self.samples.append(seconds)
+        else:
+            index = random.randrange(self.count)
+            if index < RESERVOIR_SIZE:
+                self.samples[index] = seconds
+
+
+def _summarize(count: int, total: float, longest: float, samples: List[float]) -> TimingSummary:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return TimingSummary(count, total, longest, p95)
+
+
+class Metrics:
+    """
+    段階ごとの所要時間とカウンタを集計する（スレッドセーフ）
+
+    所要時間は件数・合計・最大と一定数の標本だけを保持するため、長時間のwatch・serveでも増え続けない
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings: Dict[Tuple[str, Labels], _Timing] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+
+    def observe(self, stage: str, seconds: float, **labels: object) -> None:
+        """所要時間を記録"""
+        key = (stage, _labels(labels))
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                timing = self._timings[key] = _Timing()
+            timing.add(seconds)
+
+    @contextmanager
+    def stage(self, stage: str, **labels: object) -> Iterator[None]:
+        """
+        with文の中の処理時間を記録するコンテキストマネージャ
+
+        Args:
+            stage: 段階名（例: http_request, parse）
+            **labels: ホスト・ランキング種類・ページ番号などの内訳
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, **labels)
+
+    def count(self, name: str, value: float = 1, **labels: object) -> None:
+        """カウンタを加算（ダウンロードバイト数・HTTPステータスなど）"""
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+
+    def _snapshot(self) -> Tuple[Dict[Tuple[str, Labels], TimingSummary], Dict[Tuple[str, Labels], float]]:
+        with self._lock:
+            timings = {k: (v.count, v.total, v.max, list(v.samples)) for k, v in self._timings.items()}
+            counters = dict(self._counters)
+        # 並べ替えはロックの外で行う
+        return {k: _summarize(*v) for k, v in timings.items()}, counters
+
+    def format_table(self) -> str:
+        """集計結果を表形式の文字列で返す"""
+        timings, counters = self._snapshot()
+        lines = [f"{'stage':<16}{'labels':<44}{'count':>7}{'total s':>10}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        for (stage, labels), timing in sorted(timings.items()):
+            lines.append(
+                f"{stage:<16}{_format_labels(labels):<44}{timing.count:>7}{timing.total:>10.3f}"
+                f"{timing.total / timing.count * 1000:>10.1f}{timing.p95 * 1000:>10.1f}{timing.max * 1000:>10.1f}"
+            )
+        if counters:
+            lines.append("")
+            lines.append(f"{'counter':<28}{'labels':<44}{'value':>12}")
+            for (name, labels), value in sorted(counters.items()):
+                lines.append(f"{name:<28}{_format_labels(labels):<44}{value:>12.0f}")
+        return "\n".join(lines)
+
+    def to_json(self) -> Dict[str, List[Dict[str, object]]]:
+        """集計結果をJSONに変換できる辞書で返す"""
+        timings, counters = self._snapshot()
+        return {
+            "stages": [
+                {"stage": stage, "labels": dict(labels), "count": timing.count, "sum_seconds": timing.total,
+                 "max_seconds": timing.max}
+                for (stage, labels), timing in sorted(timings.items())
+            ],
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(counters.items())
+            ],
+        }
+
+    def to_prometheus(self) -> str:
+        """集計結果をPrometheusのテキスト形式（node exporterのtextfile collector用）で返す"""
+        timings, counters = self._snapshot()
+        name = f"{METRIC_PREFIX}_stage_seconds"
+        lines = [f"# HELP {name} Time spent in each stage of a run.", f"# TYPE {name} summary"]
+        for (stage, labels), timing in sorted(timings.items()):
+            label_str = _prometheus_labels(_labels({"stage": stage, **dict(labels)}))
+            lines.append(f"{name}_sum{label_str} {timing.total:.6f}")
+            lines.append(f"{name}_count{label_str} {timing.count}")
+
+        for counter in sorted({n for n, _ in counters}):
+            metric = f"{METRIC_PREFIX}_{counter}"
+            lines.append(f"# TYPE {metric} counter")
+            for (n, labels), value in sorted(counters.items()):
+                if n == counter:
+                    lines.append(f"{metric}{_prometheus_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """
+        集計結果をファイルに書き込む（拡張子が.jsonならJSON、それ以外はPrometheus形式）
+
+        textfile collectorが書きかけを読まないよう、一時ファイルからリネームする
+        """
+        if path.endswith(".json"):
+            content = json.dumps(self.to_json(), ensure_ascii=False, indent=2)
+        else:
+            content = self.to_prometheus()
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        replace_file(tmp_path, path)
+
+
+# プロセス全体で共有する計測結果
+metrics = Metrics()
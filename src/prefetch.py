@@ -0,0 +1,211 @@
+"""インタラクティブモードの先読み：メニューの入力待ちの間に接続・ブラウザ・よく選ぶランキングを準備する"""
+
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterator, List, Mapping, Tuple, Type
+from urllib.parse import urlsplit
+import json
+import os
+import threading
+
+from .config import (
+    HOST_RATE_LIMITS,
+    INTERACTIVE_STATS_FILE,
+    KABUTAN_URLS,
+    MATSUI_URLS,
+    PREFETCH_MIN_RATIO,
+    PREFETCH_RANKINGS,
+    STOCKWEATHER_URLS,
+)
+from .metrics import metrics
+from .runner import RankingResult, fetch_rankings
+from .scrapers.archive import get_replay_date
+
+if TYPE_CHECKING:
+    from .scrapers.base import BaseScraper
+
+
+class SelectionStats:
+    """インタラクティブモードで選ばれたランキングと件数の集計（JSONファイルに保存）"""
+
+    def __init__(self, path: str = INTERACTIVE_STATS_FILE):
+        """
+        Args:
+            path: 保存先のファイルパス
+        """
+        self.path = path
+        self.sessions = 0
+        self.rankings: Counter = Counter()
+        self.counts: Counter = Counter()
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.sessions = int(data.get("sessions", 0))
+            self.rankings.update(data.get("rankings", {}))
+            self.counts.update({int(count): n for count, n in data.get("counts", {}).items()})
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def record(self, rankings: List[str], count: int) -> None:
+        """1回分の選択を加えて保存"""
+        self.sessions += 1
+        self.rankings.update(rankings)
+        self.counts[count] += 1
+        data = {
+            "sessions": self.sessions,
+            "rankings": dict(self.rankings),
+            "counts": {str(count): n for count, n in self.counts.items()},
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def likely(self, min_ratio: float = PREFETCH_MIN_RATIO) -> List[str]:
+        """過去の起動のうちmin_ratio以上で選ばれたランキング（よく選ばれる順、履歴がなければ空）"""
+        if not self.sessions:
+            return []
+        return [name for name, n in self.rankings.most_common() if n / self.sessions >= min_ratio]
+
+    def usual_count(self, default: int = 50) -> int:
+        """最もよく指定された取得件数"""
+        return self.counts.most_common(1)[0][0] if self.counts else default
+
+
+# ランキング種類 → URL（接続の事前確立に使う）
+RANKING_URLS = {**KABUTAN_URLS, **STOCKWEATHER_URLS, **MATSUI_URLS}
+
+
+class Prefetcher:
+    """
+    ランキングの選択・件数の入力を待つ間に行う準備と、選択後の取得
+
+    - 全ホストへのHEADリクエスト（DNS解決とTCP/TLS接続を済ませ、接続プールに残す）
+    - よく選ぶランキングがブラウザを使う場合はブラウザの起動
+    - よく選ぶランキングを、よく指定する件数で先に取得
+
+    選択されなかったランキングの先読みは残りのページ取得をやめて捨てる。
+    先読みより多い件数が指定された場合は取得し直す。
+    """
+
+    def __init__(
+        self,
+        scraper_map: "Mapping[str, Tuple[str, Type[BaseScraper]]]",
+        stats: SelectionStats,
+        limit: int = PREFETCH_RANKINGS,
+    ):
+        """
+        Args:
+            scraper_map: ランキング種類 → (ソース名, スクレイパークラス) のマッピング
+            stats: 過去の選択の集計
+            limit: 先読みするランキングの最大数
+        """
+        self.scraper_map = scraper_map
+        self.likely = stats.likely()
+        self.speculative = self.likely[:limit]
+        self.count = stats.usual_count()
+        # 接続・ブラウザの準備、ランキングごとの取得で同時に使うスレッド
+        self._executor = ThreadPoolExecutor(max_workers=len(scraper_map) + 2, thread_name_prefix="prefetch")
+        self._futures: "Dict[str, Tuple[int, threading.Event, Future[RankingResult]]]" = {}
+
+    def start(self) -> None:
+        """準備と先読みをバックグラウンドで開始（--replayの場合は通信しないため接続・ブラウザの準備はしない）"""
+        if get_replay_date() is None:
+            self._executor.submit(self._warm_connections)
+            if self.likely:
+                self._executor.submit(self._warm_browser)
+        for ranking_type in self.speculative:
+            self._submit(ranking_type, self.count)
+
+    def _warm_connections(self) -> None:
+        from .scrapers.session import preconnect
+
+        hosts = {urlsplit(url).hostname for url in RANKING_URLS.values()}
+        for host in sorted(hosts & set(HOST_RATE_LIMITS)):
+            try:
+                with metrics.stage("preconnect", host=host):
+                    preconnect(f"https://{host}/")
+            except Exception:
+                # 事前接続は失敗しても取得時に接続し直すだけ
+                metrics.count("preconnect_errors_total", host=host)
+
+    def _warm_browser(self) -> None:
+        # よく選ぶランキングの取得にブラウザを使う場合だけ起動する（学習済みのエンドポイントがあれば不要）
+        if not any(self.scraper_map[name][1]().needs_browser(name) for name in self.likely):
+            return
+        from .scrapers.browser import get_browser_pool
+
+        try:
+            get_browser_pool().start()
+        except Exception:
+            metrics.count("browser_warm_errors_total")
+
+    def _submit(self, ranking_type: str, count: int) -> None:
+        cancel = threading.Event()
+        future = self._executor.submit(self._fetch, ranking_type, count, cancel)
+        self._futures[ranking_type] = (count, cancel, future)
+
+    def _fetch(self, ranking_type: str, count: int, cancel: threading.Event) -> RankingResult:
+        return next(fetch_rankings([ranking_type], count, self.scraper_map, cancel=cancel))
+
+    def select(self, rankings: List[str]) -> None:
+        """
+        ランキングの選択が決まった時点で呼ぶ
+
+        選ばれなかった先読みを中止し、先読みしていない選択済みのランキングも
+        件数の入力を待つ間に（よく指定する件数で）取得し始める
+        """
+        for ranking_type in list(self._futures):
+            if ranking_type not in rankings:
+                self._discard(ranking_type)
+        for ranking_type in rankings:
+            if ranking_type not in self._futures:
+                self._submit(ranking_type, self.count)
+
+    def _discard(self, ranking_type: str) -> None:
+        _, cancel, future = self._futures.pop(ranking_type)
+        cancel.set()
+        future.cancel()
+
+    def results(self, rankings: List[str], count: int) -> Iterator[RankingResult]:
+        """
+        選択されたランキングを取得し、指定順に結果を返す
+
+        先読み済み（または取得中）で件数が足りるものはその結果を使い、
+        件数が足りない・先読みが失敗したものは取得し直す
+
+        Args:
+            rankings: ランキング種類のリスト
+            count: 取得する銘柄数
+
+        Yields:
+            RankingResult（rankingsの順序で返す）
+        """
+        for ranking_type in list(self._futures):
+            if ranking_type not in rankings or self._futures[ranking_type][0] < count:
+                self._discard(ranking_type)
+        # 入力待ちの間に取得を始めていたランキング
+        prefetched = set(self._futures)
+        for ranking_type in rankings:
+            if ranking_type not in self._futures:
+                self._submit(ranking_type, count)
+
+        for ranking_type in rankings:
+            result = self._futures[ranking_type][2].result()
+            if ranking_type in prefetched:
+                if result.error:
+                    # 先読みの失敗は入力待ちの間の一時的なものかもしれないため、1回だけ取得し直す
+                    metrics.count("prefetch_retries_total", ranking=ranking_type)
+                    self._submit(ranking_type, count)
+                    result = self._futures[ranking_type][2].result()
+                else:
+                    metrics.count("prefetch_hits_total", ranking=ranking_type)
+            columns = result.columns.head(count) if result.columns is not None else None
+            yield result._replace(codes=result.codes[:count], columns=columns)
+
+    def close(self) -> None:
+        """残っている先読みを中止"""
+        for ranking_type in list(self._futures):
+            self._discard(ranking_type)
+        self._executor.shutdown(wait=False, cancel_futures=True)
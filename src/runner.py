@@ -0,0 +1,146 @@
+"""ランキング取得の実行オーケストレーター"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Type, Union
+import threading
+
+from .config import ENGINE
+from .metrics import metrics
+
+if TYPE_CHECKING:
+    from .scrapers.base import BaseScraper
+    from .scrapers.columns import RowColumns
+
+
+# 取得エンジン（"thread": ランキング・ページごとのスレッド、"async": 1つのイベントループ）
+ENGINES = ("thread", "async")
+
+_engine = ENGINE
+
+
+def configure_engine(engine: str) -> None:
+    """取得エンジンを切り替え（CLIの--engine用）"""
+    global _engine
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    _engine = engine
+
+
+class RankingResult(NamedTuple):
+    """1ランキング分の取得結果"""
+
+    ranking_type: str
+    codes: List[str]
+    update_date: Optional[str]
+    error: Optional[Exception]
+    # ランキングの末尾に達して件数に届かなかったか（max_pages_reachedは設定の最大ページ数で打ち切った場合）
+    exhausted: bool = False
+    max_pages_reached: bool = False
+    # codesの順の行データ（株価・騰落率など、行データの抽出を有効にした場合のみ）
+    columns: "Optional[RowColumns]" = None
+    # 途中のページの取得に失敗して打ち切った場合、そのページ番号（exhaustedもTrueになる）
+    failed_page: Optional[int] = None
+
+
+def fetch_rankings(
+    rankings: List[str],
+    count: Union[int, Mapping[str, int]],
+    scraper_map: "Mapping[str, Tuple[str, Type[BaseScraper]]]",
+    scrapers: "Optional[Dict[str, BaseScraper]]" = None,
+    on_code: Optional[Callable[[str, int, str], None]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Iterator[RankingResult]:
+    """
+    選択されたランキングを同時に取得し、指定順に結果を返す
+
+    流量制御はホスト単位のトークンバケット（config.HOST_RATE_LIMITS）が行うため、
+    ここでは全ランキングを一斉に投入する。全体の所要時間は最も遅いソース程度になる。
+
+    Args:
+        rankings: ランキング種類のリスト
+        count: 取得する銘柄数（ランキング種類 → 銘柄数 の辞書でランキングごとにも指定できる）
+        scraper_map: ランキング種類 → (ソース名, スクレイパークラス) のマッピング
+        scrapers: 指定した場合、ランキング種類ごとのスクレイパーをこの辞書に保持して再利用する
+        on_code: 指定した場合、銘柄コードが順位順に確定するたびに (ランキング種類, 順位, 銘柄コード) で呼ぶ
+            （ランキングごとのワーカースレッドから呼ばれる）
+        cancel: 指定した場合、セットされた時点で残りのページ取得をやめる（結果は途中までの銘柄になる）
+
+    Yields:
+        RankingResult（rankingsの順序で返す）
+    """
+    if not rankings:
+        return
+
+    if scrapers is None:
+        scrapers = {}
+    for ranking_type in rankings:
+        ranking_count = count[ranking_type] if isinstance(count, Mapping) else count
+        if ranking_type not in scrapers or scrapers[ranking_type].count != ranking_count:
+            _, scraper_class = scraper_map[ranking_type]
+            scrapers[ranking_type] = scraper_class(count=ranking_count)
+
+    def run(ranking_type: str) -> RankingResult:
+        with metrics.stage("ranking", ranking=ranking_type):
+            stream = scrapers[ranking_type].iter_ranking(ranking_type)
+            codes = []
+            for rank, code in stream:
+                if cancel is not None and cancel.is_set():
+                    stream.close()
+                    break
+                codes.append(code)
+                if on_code:
+                    on_code(ranking_type, rank, code)
+            return _result(ranking_type, codes, stream)
+
+    if _engine == "async":
+        # 全ランキングを1つのイベントループで並行に取得（asyncio版は使うときだけ読み込む）
+        from .scrapers.aio import async_scraper_for, get_async_engine
+
+        engine = get_async_engine()
+
+        async def run_async(ranking_type: str) -> RankingResult:
+            with metrics.stage("ranking", ranking=ranking_type):
+                stream = async_scraper_for(scrapers[ranking_type], engine).iter_ranking(ranking_type)
+                codes = []
+                async for rank, code in stream:
+                    if cancel is not None and cancel.is_set():
+                        await stream.aclose()
+                        break
+                    codes.append(code)
+                    if on_code:
+                        on_code(ranking_type, rank, code)
+                return _result(ranking_type, codes, stream)
+
+        futures = [(r, engine.submit(run_async(r))) for r in rankings]
+        yield from _results(futures)
+        return
+
+    with ThreadPoolExecutor(max_workers=len(rankings)) as executor:
+        futures = [(r, executor.submit(run, r)) for r in rankings]
+        yield from _results(futures)
+
+
+def _result(ranking_type: str, codes: List[str], stream: Any) -> RankingResult:
+    # 途中でやめた場合は行データが返したコードより1行多いことがあるため揃える
+    columns = stream.columns.head(len(codes)) if stream.columns is not None else None
+    return RankingResult(
+        ranking_type,
+        codes,
+        stream.update_date,
+        None,
+        stream.exhausted,
+        stream.max_pages_reached,
+        columns,
+        stream.failed_page,
+    )
+
+
+def _results(futures: "List[Tuple[str, Future[RankingResult]]]") -> Iterator[RankingResult]:
+    """ランキングごとのFutureを指定順に待つ（失敗したランキングはerrorに例外を入れる）"""
+    for ranking_type, future in futures:
+        try:
+            result = future.result()
+        except Exception as e:
+            yield RankingResult(ranking_type, [], None, e)
+        else:
+            yield result
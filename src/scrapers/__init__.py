@@ -0,0 +1,57 @@
+"""
+スクレイパーのレジストリ
+
+スクレイパーのモジュール（と requests・lxml・Playwright などの重い依存）は、
+そのランキングが実際に要求されたときに初めてimportする
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Dict, Iterator, Mapping, Tuple, Type
+
+if TYPE_CHECKING:
+    from .base import BaseScraper
+
+
+# ランキング種類 → (ソース名, スクレイパークラス名)、ソース名はモジュール名と同じ
+SCRAPER_REGISTRY: Dict[str, Tuple[str, str]] = {
+    # カブタン
+    "up": ("kabutan", "KabutanScraper"),
+    "down": ("kabutan", "KabutanScraper"),
+    "volume": ("kabutan", "KabutanScraper"),
+    "trading_value": ("kabutan", "KabutanScraper"),
+    "active": ("kabutan", "KabutanScraper"),
+    # ストックウェザー
+    "up_from_open": ("stockweather", "StockWeatherScraper"),
+    "down_from_open": ("stockweather", "StockWeatherScraper"),
+    # 松井証券
+    "tick": ("matsui", "MatsuiScraper"),
+}
+
+
+def get_scraper_class(ranking_type: str) -> "Type[BaseScraper]":
+    """
+    ランキング種類に対応するスクレイパークラスを取得（初回呼び出し時にモジュールをimport）
+
+    Args:
+        ranking_type: ランキング種類
+
+    Returns:
+        スクレイパークラス
+    """
+    source, class_name = SCRAPER_REGISTRY[ranking_type]
+    module = import_module(f".{source}", __name__)
+    return getattr(module, class_name)
+
+
+class LazyScraperMap(Mapping):
+    """ランキング種類 → (ソース名, スクレイパークラス) の遅延読み込みマッピング"""
+
+    def __getitem__(self, ranking_type: str) -> "Tuple[str, Type[BaseScraper]]":
+        source, _ = SCRAPER_REGISTRY[ranking_type]
+        return source, get_scraper_class(ranking_type)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(SCRAPER_REGISTRY)
+
+    def __len__(self) -> int:
+        return len(SCRAPER_REGISTRY)
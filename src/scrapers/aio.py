@@ -0,0 +1,453 @@
+"""
+asyncioによる取得エンジン（--engine async）
+
+1つのイベントループを専用スレッドで動かし、全ランキング・全ページのHTTPリクエストと
+ブラウザ操作をそのループ上で並行に実行する。サイトごとの知識（URL・ページ送り・抽出）は
+同期版のスクレイパーをそのまま使い、通信部分だけを非同期にする。
+SQLite（HTTPキャッシュ・アーカイブ）やエンドポイントのファイルの読み書き、スレッドでの抽出は
+asyncio.to_threadでワーカースレッドに渡し、イベントループを止めない。
+"""
+
+from concurrent.futures import Future
+from typing import AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+import asyncio
+import atexit
+import threading
+
+import charset_normalizer
+import httpx
+from playwright.async_api import Browser, BrowserContext, Page, Playwright, Response, Route, async_playwright
+
+from .archive import PageContext, archive_page, current_page, get_replay_date
+from .base import BaseScraper, PageExtract, PagePlan
+from .browser import CONTEXT_OPTIONS, LAUNCH_ARGS, STEALTH_SCRIPT, is_blocked_request, is_captured_response
+from .cache import CachedRequest
+from .columns import RowColumns, extracts_columns
+from .endpoint import READ_ERRORS, CapturedResponse, LearnedEndpoint, endpoint_candidates, matches_ranking
+from .matsui import endpoint_codes
+from .parse_pool import submit_extract, uses_process_pool
+from .resilience import get_resilience
+from .throttle import get_async_throttle
+from ..config import (
+    HOST_RATE_LIMITS,
+    HTTP_TIMEOUT,
+    MATSUI_FAST_PATH,
+    MATSUI_HEADLESS,
+    MATSUI_PAGE_TIMEOUT,
+    MATSUI_WAIT_SELECTOR,
+    USER_AGENT,
+)
+from ..metrics import metrics
+
+T = TypeVar("T")
+
+# 再試行するタイムアウト・接続エラー
+_TRANSIENT_ERRORS = (httpx.TimeoutException, httpx.TransportError)
+
+
+class AsyncBrowserPool:
+    """BrowserPoolのasyncio版（PlaywrightのAsync APIで、起動済みのChromiumとコンテキストを使い回す）"""
+
+    def __init__(self, headless: bool = MATSUI_HEADLESS):
+        """
+        Args:
+            headless: ヘッドレスモードで起動するか
+        """
+        self.headless = headless
+        self._lock = asyncio.Lock()
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._context: Optional[BrowserContext] = None
+        self._idle_pages: List[Page] = []
+
+    async def _route(self, route: Route) -> None:
+        if is_blocked_request(route.request.url, route.request.resource_type):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _ensure_context(self) -> BrowserContext:
+        async with self._lock:
+            if self._browser is not None and not self._browser.is_connected():
+                # ブラウザが落ちていた場合は作り直す
+                self._browser = self._context = None
+                self._idle_pages = []
+
+            if self._context is None:
+                with metrics.stage("browser_launch"):
+                    if self._playwright is None:
+                        self._playwright = await async_playwright().start()
+                    self._browser = await self._playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+                    self._context = await self._browser.new_context(**CONTEXT_OPTIONS)
+                await self._context.add_init_script(STEALTH_SCRIPT)
+                await self._context.route("**/*", self._route)
+
+            return self._context
+
+    async def start(self) -> None:
+        """ブラウザを事前に起動しておく（ウォームアップ）"""
+        await self._ensure_context()
+
+    async def render_capturing(
+        self, url: str, wait_selector: str, timeout: int = 60000
+    ) -> Tuple[str, List[CapturedResponse]]:
+        """
+        ページを開き、指定セレクタの要素が現れた時点のHTMLと、ページが読み込んだJSONレスポンスを取得
+
+        Args:
+            url: 取得するURL
+            wait_selector: 描画完了の目印にするセレクタ
+            timeout: タイムアウト（ミリ秒）
+
+        Returns:
+            タプル（HTMLコンテンツ, JSONレスポンスのリスト）
+        """
+        context = await self._ensure_context()
+        page = self._idle_pages.pop() if self._idle_pages else await context.new_page()
+
+        responses: List[Response] = []
+
+        def on_response(response: Response) -> None:
+            if is_captured_response(response.request.resource_type, response.headers.get("content-type", "")):
+                responses.append(response)
+
+        page.on("response", on_response)
+        try:
+            with metrics.stage("browser_render", host=urlsplit(url).hostname or ""):
+                await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+                await page.locator(wait_selector).wait_for(state="attached", timeout=timeout)
+                html = await page.content()
+
+            captured = []
+            for response in responses:
+                try:
+                    body = await response.text()
+                except Exception:
+                    continue
+                request = response.request
+                captured.append(CapturedResponse(response.url, request.method, await request.all_headers(), body))
+        except BaseException:
+            await page.close()
+            raise
+        page.remove_listener("response", on_response)
+        self._idle_pages.append(page)
+        return html, captured
+
+    async def render(self, url: str, wait_selector: str, timeout: int = 60000) -> str:
+        """render_capturingと同様にHTMLだけを取得"""
+        html, _ = await self.render_capturing(url, wait_selector, timeout)
+        return html
+
+    async def close(self) -> None:
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._playwright = self._browser = self._context = None
+        self._idle_pages = []
+
+
+class AsyncEngine:
+    """
+    専用スレッドで動く1つのイベントループと、その上で共有するHTTPクライアント・ブラウザ
+
+    呼び出し元のスレッドはsubmit()でコルーチンを投入し、concurrent.futures.Futureで結果を待つ
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="async-engine", daemon=True)
+        self._thread.start()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._browser: Optional[AsyncBrowserPool] = None
+
+    def submit(self, coro: Awaitable[T]) -> "Future[T]":
+        """コルーチンをイベントループに投入"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[T]) -> T:
+        """コルーチンをイベントループで実行し、結果を待つ"""
+        return self.submit(coro).result()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """共有のHTTPクライアント（イベントループ内から使う）"""
+        if self._client is None:
+            # ホストごとの同時リクエスト数はAsyncHostThrottleで制限するため、接続数は合計に合わせる
+            connections = sum(limits["concurrency"] for limits in HOST_RATE_LIMITS.values())
+            self._client = httpx.AsyncClient(
+                headers={"User-Agent": USER_AGENT},
+                timeout=httpx.Timeout(HTTP_TIMEOUT[1], connect=HTTP_TIMEOUT[0]),
+                limits=httpx.Limits(max_connections=None, max_keepalive_connections=connections),
+                follow_redirects=True,
+            )
+        return self._client
+
+    @property
+    def browser(self) -> AsyncBrowserPool:
+        """共有のブラウザプール（イベントループ内から使う）"""
+        if self._browser is None:
+            self._browser = AsyncBrowserPool()
+        return self._browser
+
+    async def _aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        if self._browser is not None:
+            await self._browser.close()
+        self._client = self._browser = None
+
+    def close(self) -> None:
+        """HTTPクライアントとブラウザを閉じ、イベントループを停止"""
+        if not self.loop.is_running():
+            return
+        self.run(self._aclose())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class AsyncRankingStream:
+    """
+    AsyncScraper.iter_ranking()が返す逐次取得のストリーム（RankingStreamのasyncio版）
+
+    async forで (順位, 銘柄コード) を順位順に返す。途中でやめる場合はaclose()を呼ぶ。
+    """
+
+    def __init__(self, produce: Callable[["AsyncRankingStream"], AsyncGenerator[Tuple[int, str], None]]):
+        self.update_date: Optional[str] = None
+        self.exhausted = False
+        self.max_pages_reached = False
+        self.failed_page: Optional[int] = None
+        self.columns: Optional[RowColumns] = None
+        self._iterator = produce(self)
+
+    def __aiter__(self) -> AsyncGenerator[Tuple[int, str], None]:
+        return self._iterator
+
+    async def __anext__(self) -> Tuple[int, str]:
+        return await self._iterator.__anext__()
+
+    async def aclose(self) -> None:
+        """残りのページ取得をキャンセル"""
+        await self._iterator.aclose()
+
+
+class AsyncScraper:
+    """同期版のスクレイパーを包み、通信をイベントループ上で行うBaseScraperのasyncio版"""
+
+    def __init__(self, scraper: BaseScraper, engine: AsyncEngine):
+        """
+        Args:
+            scraper: URL・ページ送り・抽出に使う同期版のスクレイパー
+            engine: HTTPクライアントとブラウザを持つエンジン
+        """
+        self.scraper = scraper
+        self.engine = engine
+
+    async def http_get(self, url: str, detect_encoding: bool = False, headers: Optional[Dict[str, str]] = None) -> str:
+        """
+        BaseScraper.http_getのasyncio版（キャッシュ・レート制限・リトライの設定は同期版と共有）
+
+        Args:
+            url: 取得するURL
+            detect_encoding: Trueの場合、本文から文字コードを推定してデコード
+            headers: 追加するリクエストヘッダー
+
+        Returns:
+            HTMLコンテンツ
+        """
+        request = await asyncio.to_thread(CachedRequest, url, headers)
+        text = request.fresh_text()
+        if text is not None:
+            return text
+        host = request.host
+
+        async def send() -> httpx.Response:
+            with metrics.stage("http_request", host=host):
+                response = await self.engine.client.get(url, headers=request.headers)
+            metrics.count("http_responses_total", host=host, status=response.status_code)
+            metrics.count("http_bytes_total", response.num_bytes_downloaded, host=host)
+            return response
+
+        response = await get_resilience(host).request_async(get_async_throttle(url), send, _TRANSIENT_ERRORS)
+
+        text = await asyncio.to_thread(request.not_modified, response.status_code)
+        if text is not None:
+            return text
+
+        response.raise_for_status()
+        if detect_encoding:
+            best = charset_normalizer.from_bytes(response.content).best()
+            if best is not None:
+                response.encoding = best.encoding
+        text = response.text
+        await asyncio.to_thread(request.store, response.content, response.encoding, response.headers)
+        return text
+
+    async def fetch(self, url: str) -> str:
+        """ページを取得"""
+        return await self.http_get(url, detect_encoding=self.scraper.DETECT_ENCODING)
+
+    async def load_page(self, url: str) -> PageExtract:
+        """ページを取得して抽出"""
+        html = await self.fetch(url)
+        await asyncio.to_thread(archive_page, url, html)
+        return await self.extract_page(html)
+
+    async def extract_page(self, html: str) -> PageExtract:
+        """設定された実行先（config.PARSE_EXECUTOR）でextract()を実行（どちらの場合もループを止めずに待つ）"""
+        with_columns = extracts_columns()
+        with metrics.stage("parse", scraper=type(self.scraper).__name__):
+            if uses_process_pool():
+                return await asyncio.wrap_future(submit_extract(type(self.scraper), html, with_columns))
+            return await asyncio.to_thread(self.scraper.extract, html, with_columns)
+
+    async def _load_ranking_page(self, ranking_type: str, url: str, page_num: int, run_id: str) -> PageExtract:
+        with metrics.stage("page", ranking=ranking_type, page=page_num):
+            if get_replay_date() is not None:
+                return await asyncio.to_thread(self.scraper._replay_page, run_id, page_num)
+            # タスクごとにコンテキストがコピーされるため、他のページの取得には影響しない
+            current_page.set(PageContext(run_id, ranking_type, page_num))
+            return await self.load_page(self.scraper.page_url(url, page_num))
+
+    def iter_ranking(self, ranking_type: str, count: Optional[int] = None) -> AsyncRankingStream:
+        """
+        BaseScraper.iter_rankingのasyncio版
+
+        Args:
+            ranking_type: ランキング種類
+            count: 取得する銘柄数（省略時はスクレイパーのcount）
+
+        Returns:
+            AsyncRankingStream
+        """
+        url = self.scraper.get_url(ranking_type)
+        if not url:
+            raise ValueError(f"Unknown ranking type: {ranking_type}")
+        count = count or self.scraper.count
+        return AsyncRankingStream(lambda stream: self._iter_codes(ranking_type, url, count, stream))
+
+    async def _iter_codes(
+        self, ranking_type: str, url: str, count: int, stream: AsyncRankingStream
+    ) -> AsyncGenerator[Tuple[int, str], None]:
+        run_id = await asyncio.to_thread(self.scraper.start_run, ranking_type)
+        plan = PagePlan(self.scraper, ranking_type, count, stream)
+        pending: Dict["asyncio.Task[PageExtract]", int] = {}
+
+        def submit_pages() -> None:
+            # ページ数の上限はホストごとのレート制限に任せ、必要なページを一度に投入する
+            for page_num in plan.next_pages():
+                task = asyncio.ensure_future(self._load_ranking_page(ranking_type, url, page_num, run_id))
+                pending[task] = page_num
+
+        try:
+            submit_pages()
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page_num = pending.pop(task)
+                    try:
+                        page = task.result()
+                    except Exception as e:
+                        plan.add_failure(page_num, e)
+                    else:
+                        plan.add(page_num, page)
+
+                for item in plan.merge():
+                    yield item
+                if plan.finished:
+                    return
+
+                if not pending:
+                    submit_pages()
+
+            plan.finish()
+        finally:
+            # 件数が揃った後（または打ち切られた後）の取得中のページはキャンセル
+            for task in pending:
+                task.cancel()
+
+    async def get_ranking(self, ranking_type: str) -> Tuple[List[str], Optional[str]]:
+        """
+        ランキングを取得
+
+        Returns:
+            タプル（銘柄コードのリスト, サイトの更新日）
+        """
+        stream = self.iter_ranking(ranking_type)
+        codes = [code async for _, code in stream]
+        return codes, stream.update_date
+
+
+class AsyncMatsuiScraper(AsyncScraper):
+    """MatsuiScraperのasyncio版（学習済みJSONエンドポイント → 常駐ブラウザの順に試す）"""
+
+    async def fetch(self, url: str) -> str:
+        async with get_async_throttle(url).slot():
+            return await self.engine.browser.render(url, MATSUI_WAIT_SELECTOR, MATSUI_PAGE_TIMEOUT)
+
+    async def load_page(self, url: str) -> PageExtract:
+        if not MATSUI_FAST_PATH:
+            return await super().load_page(url)
+
+        endpoints = self.scraper._endpoints
+        endpoint = await asyncio.to_thread(self.scraper.learned_endpoint, url)
+        if endpoint:
+            codes = await self._fetch_endpoint(endpoint, archive=True)
+            if codes:
+                return PageExtract(codes, None, len(codes))
+            await asyncio.to_thread(endpoints.discard, url)
+
+        async with get_async_throttle(url).slot():
+            html, responses = await self.engine.browser.render_capturing(url, MATSUI_WAIT_SELECTOR, MATSUI_PAGE_TIMEOUT)
+        await asyncio.to_thread(archive_page, url, html)
+        page = await self.extract_page(html)
+        await self._learn_endpoint(url, page.codes, responses)
+        return page
+
+    async def _fetch_endpoint(self, endpoint: LearnedEndpoint, archive: bool = False) -> Optional[List[str]]:
+        try:
+            body = await self.http_get(endpoint.url, headers=endpoint.headers)
+            return await asyncio.to_thread(endpoint_codes, endpoint, body, archive)
+        except (httpx.HTTPError,) + READ_ERRORS:
+            return None
+
+    async def _learn_endpoint(self, url: str, expected_codes: List[str], responses: List[CapturedResponse]) -> None:
+        for endpoint in endpoint_candidates(expected_codes, responses):
+            codes = await self._fetch_endpoint(endpoint)
+            if codes and matches_ranking(codes, expected_codes):
+                await asyncio.to_thread(self.scraper._endpoints.put, url, endpoint)
+                return
+
+
+# 同期版のスクレイパークラス名 → asyncio版（ここにないものは通信だけを置き換えるAsyncScraper）
+_ASYNC_SCRAPERS = {
+    "MatsuiScraper": AsyncMatsuiScraper,
+}
+
+
+def async_scraper_for(scraper: BaseScraper, engine: Optional[AsyncEngine] = None) -> AsyncScraper:
+    """同期版のスクレイパーに対応するasyncio版を作る"""
+    async_class = _ASYNC_SCRAPERS.get(type(scraper).__name__, AsyncScraper)
+    return async_class(scraper, engine or get_async_engine())
+
+
+_engine: Optional[AsyncEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    プロセス全体で共有する取得エンジンを取得（終了時にクライアント・ブラウザを閉じる）
+
+    Returns:
+        AsyncEngine
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AsyncEngine()
+            atexit.register(_engine.close)
+        return _engine
@@ -0,0 +1,250 @@
+"""取得したページの生データのアーカイブ（内容ハッシュで重複除去、SQLite、本文はzlib圧縮）"""
+
+from contextvars import ContextVar
+from typing import Any, Dict, NamedTuple, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import uuid
+import zlib
+
+from ..config import ARCHIVE_ENABLED, ARCHIVE_MAX_BYTES, ARCHIVE_PATH
+from ..market import now_jst
+
+
+class PageContext(NamedTuple):
+    """取得中のページがどのランキングの何ページ目か（アーカイブの索引に使う）"""
+
+    run_id: str
+    ranking_type: str
+    page: int
+
+
+# BaseScraperがページを取得するワーカースレッド内で設定する
+current_page: ContextVar[Optional[PageContext]] = ContextVar("current_page", default=None)
+
+
+class ArchivedPage(NamedTuple):
+    """アーカイブから読み出した1ページ"""
+
+    url: str
+    page: int
+    fetched_at: float
+    kind: str  # "html"、または松井証券のJSONエンドポイントなど"json"
+    meta: Dict[str, Any]  # kindごとの抽出に必要な情報
+    content: str
+
+
+class PageArchive:
+    """
+    取得したページを内容ハッシュ単位で保存し、URL・ランキング・取得日時で索引する
+
+    同じ内容のページは本文を1つだけ保存する。
+    圧縮後の合計サイズが上限を超えた場合は取得日時が古いページから削除する。
+    """
+
+    def __init__(self, path: str, max_bytes: int = ARCHIVE_MAX_BYTES):
+        """
+        Args:
+            path: SQLiteファイルのパス
+            max_bytes: 圧縮後の本文の合計サイズの上限
+        """
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY,
+                run_id TEXT NOT NULL,
+                ranking_type TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                date TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                kind TEXT NOT NULL,
+                meta TEXT NOT NULL,
+                hash TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_ranking_date ON pages (ranking_type, date, fetched_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_url ON pages (url, fetched_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_run ON pages (run_id, page)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_hash ON pages (hash)")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @staticmethod
+    def new_run_id() -> str:
+        """1回のランキング取得（全ページ）を表すID"""
+        return uuid.uuid4().hex
+
+    def store(
+        self, context: PageContext, url: str, content: str, kind: str = "html", meta: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        ページを保存し、上限を超えた分を削除
+
+        Args:
+            context: ランキング種類・ページ番号
+            url: 取得したURL
+            content: 本文（HTML、JSONなど）
+            kind: 本文の種類
+            meta: 本文からの抽出に必要な情報（JSONのキーなど）
+        """
+        body = content.encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()
+        now = now_jst()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                exists = self._conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone()
+                if not exists:
+                    compressed = zlib.compress(body)
+                    self._conn.execute("INSERT INTO blobs VALUES (?, ?, ?)", (digest, compressed, len(compressed)))
+                self._conn.execute(
+                    "INSERT INTO pages (run_id, ranking_type, page, url, date, fetched_at, kind, meta, hash)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        context.run_id,
+                        context.ranking_type,
+                        context.page,
+                        url,
+                        now.strftime("%Y%m%d"),
+                        now.timestamp(),
+                        kind,
+                        json.dumps(meta or {}, ensure_ascii=False),
+                        digest,
+                    ),
+                )
+                if not exists:
+                    self._evict()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        while total > self.max_bytes:
+            # 古い取得から1回分ずつ削除し、どのページからも参照されなくなった本文を消す
+            oldest = self._conn.execute("SELECT run_id FROM pages ORDER BY fetched_at LIMIT 1").fetchone()
+            if oldest is None:
+                break
+            self._conn.execute("DELETE FROM pages WHERE run_id = ?", oldest)
+            self._conn.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT hash FROM pages)")
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def latest_run(self, ranking_type: str, date: str) -> Optional[str]:
+        """
+        指定日の最後の取得のIDを返す
+
+        Args:
+            ranking_type: ランキング種類
+            date: 取得日（YYYYMMDD形式、日本時間）
+
+        Returns:
+            run_id、その日の取得がなければNone
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id FROM pages WHERE ranking_type = ? AND date = ? ORDER BY fetched_at DESC LIMIT 1",
+                (ranking_type, date),
+            ).fetchone()
+        return row[0] if row else None
+
+    def load(self, run_id: str, page: int) -> Optional[ArchivedPage]:
+        """
+        取得1回分のうち指定ページを読み出す
+
+        Args:
+            run_id: latest_run()で得たID
+            page: ページ番号
+
+        Returns:
+            ArchivedPage、そのページを取得していなければNone
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT pages.url, pages.page, pages.fetched_at, pages.kind, pages.meta, blobs.body"
+                " FROM pages JOIN blobs ON blobs.hash = pages.hash"
+                " WHERE pages.run_id = ? AND pages.page = ? ORDER BY pages.fetched_at DESC LIMIT 1",
+                (run_id, page),
+            ).fetchone()
+        if row is None:
+            return None
+        url, page, fetched_at, kind, meta, body = row
+        return ArchivedPage(url, page, fetched_at, kind, json.loads(meta), zlib.decompress(body).decode("utf-8"))
+
+
+_archive: Optional[PageArchive] = None
+_archive_enabled = ARCHIVE_ENABLED
+_archive_lock = threading.Lock()
+
+# 再実行する取得日（--replay指定時、通信せずアーカイブから読み出す）
+_replay_date: Optional[str] = None
+
+
+def configure_archive(enabled: bool) -> None:
+    """アーカイブの有効/無効を切り替え（CLIの--archive用）"""
+    global _archive_enabled
+    _archive_enabled = enabled
+
+
+def configure_replay(date: Optional[str]) -> None:
+    """アーカイブからの再実行に切り替え（CLIの--replay用）"""
+    global _replay_date
+    _replay_date = date
+
+
+def get_replay_date() -> Optional[str]:
+    return _replay_date
+
+
+def get_archive(path: str = ARCHIVE_PATH) -> Optional[PageArchive]:
+    """
+    プロセス全体で共有するアーカイブを取得
+
+    Returns:
+        PageArchive、無効化されている場合はNone（再実行時は常に返す）
+    """
+    global _archive
+    if not _archive_enabled and _replay_date is None:
+        return None
+    with _archive_lock:
+        if _archive is None:
+            _archive = PageArchive(path)
+        return _archive
+
+
+def archive_page(url: str, content: str, kind: str = "html", meta: Optional[Dict[str, Any]] = None) -> None:
+    """
+    取得したページをアーカイブに保存（ランキングの取得中でなければ何もしない）
+
+    Args:
+        url: 取得したURL
+        content: 本文
+        kind: 本文の種類
+        meta: 本文からの抽出に必要な情報
+    """
+    context = current_page.get()
+    if context is None or _replay_date is not None:
+        return
+    archive = get_archive()
+    if archive is not None:
+        archive.store(context, url, content, kind, meta)
@@ -1,19 +1,467 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple
-import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Callable, ContextManager, Dict, Generator, Iterator, List, NamedTuple, Optional, Pattern, Set, Tuple
+import math
+import re
+
+import requests
+from lxml import etree
+
+from .archive import ArchivedPage, PageArchive, PageContext, archive_page, current_page, get_archive, get_replay_date
+from .cache import CachedRequest
+from .columns import HeaderColumns, RowColumns, columns_from_header, extracts_columns, parse_row
+from .parse_pool import submit_extract, uses_process_pool
+from .resilience import get_resilience
+from .session import get_session
+from .throttle import get_throttle
+from ..config import HTTP_TIMEOUT
+from ..metrics import metrics
+
+
+class PageExtract(NamedTuple):
+    """1ページ分の抽出結果"""
+
+    codes: List[str]  # 銘柄コード（順位順、重複除去済み）
+    update_date: Optional[str]  # サイトの更新日（YYYYMMDD形式）
+    rows: int  # ページ内で見つかった行数（重複除去前）
+    columns: Optional[RowColumns] = None  # codesの順の行データ（抽出を指定した場合のみ）
+
+
+def parse_datetime_date(value: str) -> Optional[str]:
+    """
+    datetime属性（例: "2026-01-09T15:30+09:00"）をYYYYMMDD形式に変換
+
+    Args:
+        value: datetime属性の値
+
+    Returns:
+        更新日（YYYYMMDD形式）、変換できない場合はNone
+    """
+    try:
+        return datetime.fromisoformat(value).strftime("%Y%m%d")
+    except ValueError:
+        # フォールバック: 日付部分だけ抽出を試みる
+        match = re.search(r"(\d{4})-(\d{2})-(\d{2})", value)
+        if match:
+            return f"{match.group(1)}{match.group(2)}{match.group(3)}"
+    return None
+
+
+class _ExtractTarget:
+    """
+    lxmlのパーサーターゲット（ツリーを構築せずに1パスで抽出する）
+
+    start/end/dataイベントを受け取り、銘柄コードと更新日を同時に集める
+    """
+
+    def __init__(self, min_length: int, columns: Optional[Dict[str, int]] = None):
+        self.min_length = min_length
+        self.codes: Dict[str, None] = {}  # 挿入順を保持する集合として使用（O(1)の重複判定）
+        self.rows = 0
+        self.update_date: Optional[str] = None
+        self.stack: List[str] = []
+        # 行データを取り出す場合の列名 → セルの番号（Noneなら行のセルは集めない）
+        # 見出し行から列が分かった場合はそちらを使い、columnsは見出しがないページ用
+        self.columns = columns
+        self.header: Optional[HeaderColumns] = None
+        self.row_values: Dict[str, Tuple[float, ...]] = {}
+        self.cells: Optional[List[List[str]]] = None  # 現在の行のセルごとのテキスト断片
+        self.spans: List[int] = []  # 現在の行のセルごとのcolspan
+        self.row_code: Optional[str] = None  # 現在の行で見つかった銘柄コード
+
+    def add_code(self, code: str) -> None:
+        # 3桁以下は除外（正規のコードは4桁以上）
+        if len(code) >= self.min_length:
+            self.rows += 1
+            if code not in self.codes:
+                self.codes[code] = None
+                if self.cells is not None:
+                    self.row_code = code
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        self.stack.append(tag)
+        # 最初の<time datetime="...">を更新日とする
+        if tag == "time" and self.update_date is None and attrib.get("datetime"):
+            self.update_date = parse_datetime_date(attrib["datetime"])
+        if self.columns is not None:
+            if tag == "tr":
+                self.cells = []
+                self.spans = []
+                self.row_code = None
+            elif tag in ("td", "th") and self.cells is not None:
+                self.cells.append([])
+                span = attrib.get("colspan", "1")
+                self.spans.append(int(span) if span.isdigit() and int(span) > 0 else 1)
+
+    def end(self, tag: str) -> None:
+        if tag == "tr" and self.cells is not None:
+            texts = ["".join(cell) for cell in self.cells]
+            if self.row_code is not None:
+                if self.header:
+                    self.row_values[self.row_code] = parse_row(texts, self.header.columns, self.header.scales)
+                else:
+                    self.row_values[self.row_code] = parse_row(texts, self.columns)
+            else:
+                # 銘柄のない行は見出し行かもしれない（ランキングごとに列の並びが違うため見出しから位置を決める）
+                self.header = columns_from_header(texts, self.spans) or self.header
+            self.cells = None
+        # 閉じ忘れのタグを考慮して、対応する開始タグまで戻す
+        while self.stack:
+            if self.stack.pop() == tag:
+                break
+
+    def data(self, text: str) -> None:
+        if self.cells:
+            self.cells[-1].append(text)
+
+    def close(self) -> PageExtract:
+        codes = list(self.codes)
+        columns = RowColumns.from_rows(codes, self.row_values) if self.columns is not None else None
+        return PageExtract(codes, self.update_date, self.rows, columns)
+
+
+class _LinkCodeTarget(_ExtractTarget):
+    """<a href="...">のURLから銘柄コードを抽出するターゲット"""
+
+    def __init__(
+        self, href_pattern: Pattern, parent_tag: Optional[str], min_length: int, columns: Optional[Dict[str, int]]
+    ):
+        super().__init__(min_length, columns)
+        self.href_pattern = href_pattern
+        self.parent_tag = parent_tag
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        if tag == "a" and (self.parent_tag is None or (self.stack and self.stack[-1] == self.parent_tag)):
+            match = self.href_pattern.search(attrib.get("href", ""))
+            if match:
+                self.add_code(match.group(1))
+        super().start(tag, attrib)
+
+
+class _TableCellCodeTarget(_ExtractTarget):
+    """n番目の<table>の指定列のテキストから銘柄コードを抽出するターゲット"""
+
+    def __init__(
+        self, table_index: int, column: int, code_pattern: Pattern, min_length: int, columns: Optional[Dict[str, int]]
+    ):
+        super().__init__(min_length, columns)
+        self.table_index = table_index
+        self.column = column
+        self.code_pattern = code_pattern
+        self.tables_seen = 0
+        self.table_depth = 0  # 対象テーブル内のネスト深さ（0は対象外）
+        self.row_index = -1
+        self.cell_index = -1
+        self.texts: List[str] = []  # 対象セルのテキスト断片
+        self.in_target_cell = False
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        if tag == "table":
+            if self.table_depth:
+                self.table_depth += 1
+            elif self.tables_seen == self.table_index:
+                self.table_depth = 1
+            self.tables_seen += 1
+        elif self.table_depth:
+            if tag == "tr":
+                self.row_index += 1
+                self.cell_index = -1
+            elif tag == "td":
+                self.cell_index += 1
+                # ヘッダー行をスキップ
+                if self.row_index >= 1 and self.cell_index == self.column:
+                    self.in_target_cell = True
+                    self.texts = []
+        super().start(tag, attrib)
+
+    def end(self, tag: str) -> None:
+        if self.table_depth:
+            if tag == "td" and self.in_target_cell:
+                self.in_target_cell = False
+                match = self.code_pattern.search("".join(t.strip() for t in self.texts))
+                if match:
+                    self.add_code(match.group(1))
+            elif tag == "table":
+                self.table_depth -= 1
+        super().end(tag)
+
+    def data(self, text: str) -> None:
+        if self.in_target_cell:
+            self.texts.append(text)
+        super().data(text)
+
+
+def _run_target(html: str, target: _ExtractTarget) -> PageExtract:
+    if not html:
+        return PageExtract([], None, 0)
+    parser = etree.HTMLParser(target=target)
+    parser.feed(html)
+    return parser.close()
+
+
+def extract_link_codes(
+    html: str,
+    href_pattern: Pattern,
+    parent_tag: Optional[str] = None,
+    min_length: int = 0,
+    columns: Optional[Dict[str, int]] = None,
+) -> PageExtract:
+    """
+    リンクのURLから銘柄コードと更新日を1パスで抽出
+
+    Args:
+        html: HTMLコンテンツ
+        href_pattern: href属性に適用する正規表現（グループ1が銘柄コード）
+        parent_tag: 指定した場合、親要素がこのタグのリンクのみ対象
+        min_length: 銘柄コードの最小桁数
+        columns: 指定した場合、リンクのある行から列名 → セルの番号 の値も取り出す
+
+    Returns:
+        PageExtract
+    """
+    return _run_target(html, _LinkCodeTarget(href_pattern, parent_tag, min_length, columns))
+
+
+def extract_table_codes(
+    html: str,
+    table_index: int,
+    column: int,
+    code_pattern: Pattern,
+    min_length: int = 0,
+    columns: Optional[Dict[str, int]] = None,
+) -> PageExtract:
+    """
+    n番目のテーブルの指定列から銘柄コードと更新日を1パスで抽出（1行目はヘッダーとして除外）
+
+    Args:
+        html: HTMLコンテンツ
+        table_index: 対象テーブルの番号（文書内の出現順、0始まり）
+        column: 対象列の番号（0始まり）
+        code_pattern: セルのテキストに適用する正規表現（グループ1が銘柄コード）
+        min_length: 銘柄コードの最小桁数
+        columns: 指定した場合、銘柄コードのある行から列名 → セルの番号 の値も取り出す
+
+    Returns:
+        PageExtract
+    """
+    return _run_target(html, _TableCellCodeTarget(table_index, column, code_pattern, min_length, columns))
+
+
+class RankingStream:
+    """
+    BaseScraper.iter_ranking()が返す逐次取得のストリーム
+
+    (順位, 銘柄コード) を順位順に返す。update_dateは最初のコードを返す前に設定される。
+    途中で読むのをやめる場合はclose()を呼ぶと残りのページ取得をキャンセルする。
+    """
+
+    def __init__(self, produce: Callable[["RankingStream"], Generator[Tuple[int, str], None, None]]):
+        """
+        Args:
+            produce: このストリームを受け取り、(順位, 銘柄コード) を返すジェネレーターを作る関数
+        """
+        self.update_date: Optional[str] = None
+        # ランキングの末尾（または最大ページ数）に達して件数に届かなかったか
+        self.exhausted = False
+        # 件数に届かなかった原因が設定の最大ページ数（MAX_PAGES）か
+        self.max_pages_reached = False
+        # 件数に届かなかった原因が途中のページの取得失敗の場合、そのページ番号
+        self.failed_page: Optional[int] = None
+        # 返した銘柄コードの順の行データ（行データの抽出を有効にした場合のみ）
+        self.columns: Optional[RowColumns] = None
+        self._iterator = produce(self)
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        return self._iterator
+
+    def __next__(self) -> Tuple[int, str]:
+        return next(self._iterator)
+
+    def close(self) -> None:
+        """残りのページ取得をキャンセル"""
+        self._iterator.close()
+
+
+class PagePlan:
+    """
+    ランキングのページ取得の計画と、取得したページの順位順の結合
+
+    取得件数と1ページあたりの行数から必要なページ数を見積もり、見積もりより行数が
+    少なかった場合は追加のページを投入する。ページの取得方法（スレッド・asyncio）には依存しない。
+    """
+
+    def __init__(self, scraper: "BaseScraper", ranking_type: str, count: int, stream: Any):
+        """
+        Args:
+            scraper: 取得するスクレイパー（MAX_PAGES・ROWS_PER_PAGEを使用）
+            ranking_type: ランキング種類
+            count: 取得する銘柄数
+            stream: update_date・exhausted・max_pages_reached・failed_pageを設定するストリーム
+        """
+        self.scraper = scraper
+        self.ranking_type = ranking_type
+        self.count = count
+        self.stream = stream
+        self.rows_per_page = scraper._rows_per_page.get(ranking_type, scraper.ROWS_PER_PAGE)
+        self.rank = 0
+        # 件数に達したか、ランキングの末尾（または取得に失敗したページ）に到達した
+        self.finished = False
+        self._next_page = 1  # 次に投入するページ番号
+        self._next_merge = 1  # 次に結合するページ番号
+        # ページ番号順に結合するまで結果を保持（失敗したページはNone）
+        self._results: Dict[int, Optional[PageExtract]] = {}
+        self._seen: Set[str] = set()
+        # 最後に結合したページが行数いっぱいだったか（次のページがあり得るか）
+        self._last_page_full = False
+        if extracts_columns():
+            stream.columns = RowColumns()
+
+    def next_pages(self) -> List[int]:
+        """残りの件数に必要なページ番号（最大ページ数まで）"""
+        pages = math.ceil((self.count - self.rank) / self.rows_per_page)
+        last_page = min(self._next_page + pages - 1, self.scraper.MAX_PAGES)
+        page_nums = list(range(self._next_page, last_page + 1))
+        self._next_page = max(self._next_page, last_page + 1)
+        return page_nums
+
+    def add(self, page_num: int, page: PageExtract) -> None:
+        """取得したページを追加"""
+        self._results[page_num] = page
+        if page_num == 1:
+            self.stream.update_date = page.update_date
+            if page.rows:
+                self.rows_per_page = self.scraper._rows_per_page[self.ranking_type] = page.rows
+
+    def add_failure(self, page_num: int, error: Exception) -> None:
+        """
+        取得に失敗したページを記録
+
+        1ページ目が取れない場合はランキング自体が取得できないためerrorを送出し直す。
+        途中のページが失敗した場合は、その手前までの順位を結果とする。
+        """
+        if page_num == 1:
+            raise error
+        metrics.count("page_errors_total", ranking=self.ranking_type)
+        self._results[page_num] = None
+
+    def merge(self) -> Iterator[Tuple[int, str]]:
+        """先頭から連続しているページを順位順に返す（返したページは保持しない）"""
+        while not self.finished and self._next_merge in self._results:
+            page = self._results.pop(self._next_merge)
+            if page is None:
+                # 取得に失敗したページ以降は打ち切る（ランキングの末尾とは区別する）
+                self.stream.exhausted = True
+                self.stream.failed_page = self._next_merge
+                self.finished = True
+                return
+            # ページ内の位置 → 銘柄コード（前のページまでに出たコードとページ内の重複を除く）
+            new_codes: Dict[int, str] = {}
+            for index, code in enumerate(page.codes):
+                if code not in self._seen:
+                    self._seen.add(code)
+                    new_codes[index] = code
+            if not new_codes:
+                # 空ページ（または前ページの繰り返し）はランキングの末尾
+                self.stream.exhausted = True
+                self.finished = True
+                return
+            columns = self.stream.columns
+            for index, code in new_codes.items():
+                self.rank += 1
+                if columns is not None:
+                    if page.columns is not None:
+                        columns.append(page.columns.row(index))
+                    else:
+                        columns.append_missing()
+                yield self.rank, code
+                if self.rank >= self.count:
+                    self.finished = True
+                    return
+            # 1ページ目は設定の行数と比べる（rows_per_pageは1ページ目の行数に置き換わっているため）
+            full_rows = self.scraper.ROWS_PER_PAGE if self._next_merge == 1 else self.rows_per_page
+            self._last_page_full = page.rows >= full_rows
+            self._next_merge += 1
+
+    def finish(self) -> None:
+        """
+        投入したページをすべて結合し終えた（最終ページまで取得しても件数に届かなかったか）
+
+        最後のページが行数に満たない場合はランキングの末尾とし、最大ページ数で打ち切ったとはしない
+        """
+        self.stream.exhausted = self._next_page > self.scraper.MAX_PAGES
+        self.stream.max_pages_reached = self.stream.exhausted and self._last_page_full
 
 
 class BaseScraper(ABC):
     """株式ランキングスクレイパーの抽象基底クラス"""
 
-    def __init__(self, count: int = 50, rate_limit: float = 1.0):
+    def __init__(self, count: int = 50):
         """
         Args:
             count: 取得する銘柄数（デフォルト50件）
-            rate_limit: リクエスト間隔（秒）
+
+        リクエスト間隔はconfig.HOST_RATE_LIMITSのホスト単位の設定で制御する
         """
         self.count = count
-        self.rate_limit = rate_limit
+
+    def throttle(self, url: str) -> ContextManager[None]:
+        """
+        URLのホストに対するリクエスト枠を確保（レート制限）
+
+        Args:
+            url: リクエスト先URL
+
+        Returns:
+            with文で使うコンテキストマネージャ
+        """
+        return get_throttle(url).slot()
+
+    @property
+    def session(self) -> requests.Session:
+        """プロセス全体で共有するHTTPセッション（Keep-Alive・圧縮転送）"""
+        return get_session()
+
+    def http_get(self, url: str, detect_encoding: bool = False, headers: Optional[Dict[str, str]] = None) -> str:
+        """
+        共有セッションでページを取得（レート制限込み）
+
+        Args:
+            url: 取得するURL
+            detect_encoding: Trueの場合、本文から文字コードを推定してデコード
+            headers: 追加するリクエストヘッダー
+
+        Returns:
+            HTMLコンテンツ
+        """
+        # TTL以内のキャッシュはそのまま使用し、それ以外は条件付きリクエストで再検証
+        request = CachedRequest(url, headers)
+        text = request.fresh_text()
+        if text is not None:
+            return text
+        host = request.host
+
+        def send() -> requests.Response:
+            with metrics.stage("http_request", host=host):
+                response = self.session.get(url, headers=request.headers, timeout=HTTP_TIMEOUT)
+            # 圧縮転送時は展開前のバイト数（実際に受信した量）を記録
+            metrics.count("http_responses_total", host=host, status=response.status_code)
+            metrics.count("http_bytes_total", response.raw.tell() if response.raw else len(response.content), host=host)
+            return response
+
+        # リトライ・ヘッジ・サーキットブレーカーを適用（レート制限もここで行う）
+        response = get_resilience(host).request(get_throttle(url), send)
+
+        text = request.not_modified(response.status_code)
+        if text is not None:
+            return text
+
+        response.raise_for_status()
+        if detect_encoding:
+            response.encoding = response.apparent_encoding
+        text = response.text
+        request.store(response.content, response.encoding or response.apparent_encoding, response.headers)
+        return text
 
     @abstractmethod
     def fetch(self, url: str) -> str:
@@ -41,6 +489,25 @@ class BaseScraper(ABC):
         """
         pass
 
+    # 本文から文字コードを推定してデコードするか（文字コードの宣言が誤っているサイト用）
+    DETECT_ENCODING = False
+
+    # ページ送りの設定（複数ページに分かれたランキングはサブクラスで上書き）
+    # PAGE_PARAMを設定すると、2ページ目以降はそのクエリパラメータにページ番号を付けて取得する
+    MAX_PAGES = 1
+    ROWS_PER_PAGE = 50
+    PAGE_PARAM: Optional[str] = None
+
+    # ランキング種類ごとに観測した1ページあたりの行数（ページ数の見積もりに使用）
+    _rows_per_page: Dict[str, int] = {}
+
+    def page_url(self, url: str, page_num: int) -> str:
+        """ページ番号に対応するURLを生成（PAGE_PARAMで表せない形式はサブクラスでオーバーライド）"""
+        if page_num == 1 or not self.PAGE_PARAM:
+            return url
+        separator = "&" if "?" in url else "?"
+        return f"{url}{separator}{self.PAGE_PARAM}={page_num}"
+
     def get_ranking(self, ranking_type: str) -> Tuple[List[str], Optional[str]]:
         """
         ランキングを取得するメインメソッド
@@ -51,19 +518,168 @@ class BaseScraper(ABC):
         Returns:
             タプル（銘柄コードのリスト, サイトの更新日）
         """
+        stream = self.iter_ranking(ranking_type)
+        codes = [code for _, code in stream]
+        return codes, stream.update_date
+
+    def iter_ranking(self, ranking_type: str, count: Optional[int] = None) -> "RankingStream":
+        """
+        ランキングを順位順に逐次取得
+
+        先頭から連続したページが揃った時点で (順位, 銘柄コード) を返し、
+        件数に達するか途中で打ち切られた時点で残りのページ取得をキャンセルする。
+
+        Args:
+            ranking_type: ランキング種類
+            count: 取得する銘柄数（省略時はself.count）
+
+        Returns:
+            RankingStream
+        """
         url = self.get_url(ranking_type)
         if not url:
             raise ValueError(f"Unknown ranking type: {ranking_type}")
 
-        # レート制限
-        time.sleep(self.rate_limit)
+        count = count or self.count
+        return RankingStream(lambda stream: self._iter_codes(ranking_type, url, count, stream))
+
+    def _load_ranking_page(self, ranking_type: str, url: str, page_num: int, run_id: str) -> PageExtract:
+        """ランキングの1ページを取得して抽出（再実行時はアーカイブから読み出す）"""
+        with metrics.stage("page", ranking=ranking_type, page=page_num):
+            if get_replay_date() is not None:
+                return self._replay_page(run_id, page_num)
+            token = current_page.set(PageContext(run_id, ranking_type, page_num))
+            try:
+                return self.load_page(self.page_url(url, page_num))
+            finally:
+                current_page.reset(token)
 
+    def _replay_page(self, run_id: str, page_num: int) -> PageExtract:
+        """アーカイブしたページを抽出（そのページを取得していなければ空のページとしてランキングの末尾扱い）"""
+        page = get_archive().load(run_id, page_num)
+        if page is None:
+            return PageExtract([], None, 0)
+        if page.kind == "html":
+            return self.extract_page(page.content)
+        return self.extract_archived(page)
+
+    def extract_archived(self, page: ArchivedPage) -> PageExtract:
+        """
+        HTML以外でアーカイブしたページを抽出（JSONなどを保存するサブクラスでオーバーライド）
+
+        Args:
+            page: アーカイブから読み出したページ
+
+        Returns:
+            PageExtract
+        """
+        raise ValueError(f"Unsupported archived page kind: {page.kind}")
+
+    def start_run(self, ranking_type: str) -> str:
+        """
+        ランキング1回分の取得IDを決める
+
+        再実行時は指定日の最後の取得を読み出し、通常時は今回の取得としてアーカイブする
+        """
+        replay_date = get_replay_date()
+        if replay_date is None:
+            return PageArchive.new_run_id()
+        run_id = get_archive().latest_run(ranking_type, replay_date)
+        if run_id is None:
+            raise LookupError(f"No archived pages for {ranking_type} on {replay_date}")
+        return run_id
+
+    def _iter_codes(
+        self, ranking_type: str, url: str, count: int, stream: RankingStream
+    ) -> Generator[Tuple[int, str], None, None]:
+        """必要なページだけを並列取得し、順位順に銘柄コードを返す"""
+        run_id = self.start_run(ranking_type)
+        plan = PagePlan(self, ranking_type, count, stream)
+
+        executor = ThreadPoolExecutor(max_workers=min(get_throttle(url).concurrency, self.MAX_PAGES))
+        pending = {}
+
+        def submit_pages() -> None:
+            for page_num in plan.next_pages():
+                pending[executor.submit(self._load_ranking_page, ranking_type, url, page_num, run_id)] = page_num
+
+        try:
+            submit_pages()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page_num = pending.pop(future)
+                    try:
+                        page = future.result()
+                    except Exception as e:
+                        plan.add_failure(page_num, e)
+                    else:
+                        plan.add(page_num, page)
+
+                yield from plan.merge()
+                if plan.finished:
+                    return
+
+                # 見積もりより行数が少ない場合は不足分のページを追加投入
+                if not pending:
+                    submit_pages()
+
+            plan.finish()
+        finally:
+            # 件数が揃った後（または打ち切られた後）の未着手ページは取得しない
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def load_page(self, url: str) -> PageExtract:
+        """
+        ページを取得して抽出（取得方法を切り替える場合はサブクラスでオーバーライド）
+
+        Args:
+            url: 取得するURL
+
+        Returns:
+            PageExtract
+        """
         html = self.fetch(url)
-        codes = self.parse(html)
-        update_date = self.parse_update_date(html)
+        archive_page(url, html)
+        return self.extract_page(html)
 
-        # 指定件数まで絞る
-        return codes[:self.count], update_date
+    def extract_page(self, html: str) -> PageExtract:
+        """
+        設定された実行先（config.PARSE_EXECUTOR）でextract()を実行
+
+        "process"の場合はHTMLを常駐プロセスプールに送り、このスレッドは結果を待つだけになる
+
+        Args:
+            html: HTMLコンテンツ
+
+        Returns:
+            PageExtract
+        """
+        with_columns = extracts_columns()
+        with metrics.stage("parse", scraper=type(self).__name__):
+            if uses_process_pool():
+                return submit_extract(type(self), html, with_columns).result()
+            return self.extract(html, with_columns)
+
+    # 行データの列名 → ランキングテーブルの行内のセルの番号（td・thの出現順、0始まり）
+    # 見出し行（株価・前日比・出来高・売買代金など）がある場合は見出しから求めた位置を優先する
+    # 空の場合、このソースからは行データを取り出さない（値はNaNになる）
+    ROW_COLUMNS: Dict[str, int] = {}
+
+    def extract(self, html: str, with_columns: bool = False) -> PageExtract:
+        """
+        HTMLから銘柄コードと更新日をまとめて抽出（サブクラスで1パスの実装にオーバーライド可能）
+
+        Args:
+            html: HTMLコンテンツ
+            with_columns: Trueの場合、行データ（ROW_COLUMNSの列）も取り出す
+
+        Returns:
+            PageExtract
+        """
+        codes = self.parse(html)
+        columns = RowColumns.from_rows(codes, {}) if with_columns else None
+        return PageExtract(codes, self.parse_update_date(html), len(codes), columns)
 
     def parse_update_date(self, html: str) -> Optional[str]:
         """
@@ -77,6 +693,10 @@ class BaseScraper(ABC):
         """
         return None
 
+    def needs_browser(self, ranking_type: str) -> bool:
+        """取得にブラウザを使うか（ブラウザを使うスクレイパーでオーバーライド、事前起動の判断に使う）"""
+        return False
+
     @abstractmethod
     def get_url(self, ranking_type: str) -> Optional[str]:
         """
@@ -0,0 +1,224 @@
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+import atexit
+import queue
+import threading
+
+from playwright.sync_api import Browser, BrowserContext, Page, Playwright, Response, Route, sync_playwright
+
+from .endpoint import CapturedResponse
+from ..metrics import metrics
+from ..config import (
+    BROWSER_BLOCKED_RESOURCE_TYPES,
+    BROWSER_BLOCKED_URL_PATTERNS,
+    MATSUI_HEADLESS,
+    USER_AGENT,
+)
+
+T = TypeVar("T")
+
+# webdriver検出を回避
+STEALTH_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+"""
+
+# ボット対策のためより現実的な設定（asyncio版のブラウザプールと共有）
+LAUNCH_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+]
+CONTEXT_OPTIONS = {
+    "user_agent": USER_AGENT,
+    "viewport": {'width': 1920, 'height': 1080},
+    "locale": 'ja-JP',
+}
+
+
+def is_blocked_request(url: str, resource_type: str) -> bool:
+    """描画に不要な読み込み（画像・フォント・CSS・アクセス解析など）か"""
+    return resource_type in BROWSER_BLOCKED_RESOURCE_TYPES or any(
+        pattern in url for pattern in BROWSER_BLOCKED_URL_PATTERNS
+    )
+
+
+def is_captured_response(resource_type: str, content_type: str) -> bool:
+    """エンドポイントの学習に使うレスポンス（XHR/fetchで読み込んだJSON）か"""
+    return resource_type in ("xhr", "fetch") and "json" in content_type
+
+
+class BrowserPool:
+    """
+    起動済みのChromiumとコンテキストを使い回すブラウザプール
+
+    PlaywrightのSync APIは作成したスレッドからしか操作できないため、
+    ブラウザの操作はすべて専用スレッドで実行する（呼び出し元のスレッドは問わない）
+    """
+
+    def __init__(self, headless: bool = MATSUI_HEADLESS):
+        """
+        Args:
+            headless: ヘッドレスモードで起動するか
+        """
+        self.headless = headless
+        self._tasks: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._context: Optional[BrowserContext] = None
+        self._idle_pages: List[Page] = []
+
+    def _worker(self) -> None:
+        while True:
+            fn, future = self._tasks.get()
+            if fn is None:
+                break
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+
+    def _call(self, fn: Callable[[], T]) -> T:
+        """ブラウザ専用スレッドで関数を実行し、結果を待つ"""
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="browser-pool", daemon=True)
+                self._thread.start()
+        future: Future = Future()
+        self._tasks.put((fn, future))
+        return future.result()
+
+    def _route(self, route: Route) -> None:
+        """画像・フォント・CSS・アクセス解析などの読み込みを遮断"""
+        if is_blocked_request(route.request.url, route.request.resource_type):
+            route.abort()
+        else:
+            route.continue_()
+
+    def _ensure_context(self) -> BrowserContext:
+        if self._browser is not None and not self._browser.is_connected():
+            # ブラウザが落ちていた場合は作り直す
+            self._browser = self._context = None
+            self._idle_pages = []
+
+        if self._context is None:
+            with metrics.stage("browser_launch"):
+                if self._playwright is None:
+                    self._playwright = sync_playwright().start()
+                self._browser = self._playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+                self._context = self._browser.new_context(**CONTEXT_OPTIONS)
+            self._context.add_init_script(STEALTH_SCRIPT)
+            self._context.route("**/*", self._route)
+
+        return self._context
+
+    def _render(self, url: str, wait_selector: str, timeout: int, capture: bool) -> Tuple[str, List[CapturedResponse]]:
+        context = self._ensure_context()
+        page = self._idle_pages.pop() if self._idle_pages else context.new_page()
+
+        # ページが読み込むJSONレスポンスを記録（XHR/fetch）
+        responses: List[Response] = []
+
+        def on_response(response: Response) -> None:
+            if is_captured_response(response.request.resource_type, response.headers.get("content-type", "")):
+                responses.append(response)
+
+        if capture:
+            page.on("response", on_response)
+        try:
+            with metrics.stage("browser_render", host=urlsplit(url).hostname or ""):
+                page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+                page.locator(wait_selector).wait_for(state="attached", timeout=timeout)
+                html = page.content()
+
+            captured = []
+            for response in responses:
+                try:
+                    body = response.text()
+                except Exception:
+                    continue
+                request = response.request
+                captured.append(CapturedResponse(response.url, request.method, request.all_headers(), body))
+        except Exception:
+            page.close()
+            raise
+        if capture:
+            page.remove_listener("response", on_response)
+        self._idle_pages.append(page)
+        return html, captured
+
+    def start(self) -> None:
+        """ブラウザを事前に起動しておく（ウォームアップ）"""
+        self._call(self._ensure_context)
+
+    def render(self, url: str, wait_selector: str, timeout: int = 60000) -> str:
+        """
+        ページを開き、指定セレクタの要素が現れた時点のHTMLを取得
+
+        Args:
+            url: 取得するURL
+            wait_selector: 描画完了の目印にするセレクタ
+            timeout: タイムアウト（ミリ秒）
+
+        Returns:
+            HTMLコンテンツ
+        """
+        return self._call(lambda: self._render(url, wait_selector, timeout, capture=False))[0]
+
+    def render_capturing(
+        self, url: str, wait_selector: str, timeout: int = 60000
+    ) -> Tuple[str, List[CapturedResponse]]:
+        """
+        renderと同様にHTMLを取得し、ページが読み込んだJSONレスポンスも返す
+
+        Args:
+            url: 取得するURL
+            wait_selector: 描画完了の目印にするセレクタ
+            timeout: タイムアウト（ミリ秒）
+
+        Returns:
+            タプル（HTMLコンテンツ, JSONレスポンスのリスト）
+        """
+        return self._call(lambda: self._render(url, wait_selector, timeout, capture=True))
+
+    def _shutdown(self) -> None:
+        if self._browser is not None:
+            self._browser.close()
+        if self._playwright is not None:
+            self._playwright.stop()
+        self._playwright = self._browser = self._context = None
+        self._idle_pages = []
+
+    def close(self) -> None:
+        """ブラウザを終了し、専用スレッドを停止"""
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        future: Future = Future()
+        self._tasks.put((self._shutdown, future))
+        self._tasks.put((None, None))
+        thread.join()
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """
+    プロセス全体で共有するブラウザプールを取得（終了時に自動でブラウザを閉じる）
+
+    Returns:
+        BrowserPool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
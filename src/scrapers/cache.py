@@ -0,0 +1,212 @@
+from typing import Dict, Mapping, NamedTuple, Optional
+from urllib.parse import urlsplit
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from ..config import HTTP_CACHE_ENABLED, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_PATH, HTTP_CACHE_TTL
+from ..metrics import metrics
+
+
+class CacheEntry(NamedTuple):
+    """キャッシュされたレスポンス"""
+
+    body: bytes
+    encoding: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding or "utf-8", errors="replace")
+
+    def is_fresh(self, ttl: float) -> bool:
+        """TTL以内で再検証が不要か"""
+        return time.time() - self.stored_at < ttl
+
+    def validators(self) -> Dict[str, str]:
+        """条件付きリクエスト用のヘッダー"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    URL単位のHTTPレスポンスキャッシュ（SQLite、本文はzlib圧縮）
+
+    合計サイズが上限を超えた場合は最終利用が古いものから削除する（LRU）
+    """
+
+    def __init__(self, path: str, ttl: float = HTTP_CACHE_TTL, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        """
+        Args:
+            path: SQLiteファイルのパス
+            ttl: 再検証せずに使用する秒数
+            max_bytes: 圧縮後の合計サイズの上限
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """
+        キャッシュを取得（最終利用時刻を更新）
+
+        Args:
+            url: ページネーションのパラメータを含む完全なURL
+
+        Returns:
+            CacheEntry、キャッシュがない場合はNone
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, encoding, etag, last_modified, stored_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        body, encoding, etag, last_modified, stored_at = row
+        return CacheEntry(zlib.decompress(body), encoding, etag, last_modified, stored_at)
+
+    def store(
+        self, url: str, body: bytes, encoding: Optional[str], etag: Optional[str], last_modified: Optional[str]
+    ) -> None:
+        """レスポンスを保存し、上限を超えた分を削除"""
+        compressed = zlib.compress(body)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, compressed, len(compressed), encoding, etag, last_modified, now, now),
+            )
+            self._evict()
+
+    def touch(self, url: str) -> None:
+        """304 Not Modifiedを受けたキャッシュの保存時刻を更新（TTLを延長）"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+class CachedRequest:
+    """
+    1回のGETリクエストに対するキャッシュの確認と更新（同期版・asyncio版のhttp_getで共有）
+
+    通信はそれぞれのHTTPクライアントで行い、headersをリクエストヘッダーとして送る。
+    生成時とnot_modified()・store()はSQLiteを読み書きする
+    """
+
+    def __init__(self, url: str, headers: Optional[Mapping[str, str]] = None):
+        """
+        Args:
+            url: 取得するURL
+            headers: 追加するリクエストヘッダー
+        """
+        self.url = url
+        self.host = urlsplit(url).hostname or ""
+        self.cache = get_http_cache()
+        self.entry = self.cache.lookup(url) if self.cache else None
+        # TTLを過ぎたキャッシュは条件付きリクエストで再検証
+        self.headers = dict(headers or {})
+        if self.entry:
+            self.headers.update(self.entry.validators())
+
+    def fresh_text(self) -> Optional[str]:
+        """TTL以内のキャッシュの本文（再検証が必要、またはキャッシュがない場合はNone）"""
+        if self.entry and self.entry.is_fresh(self.cache.ttl):
+            metrics.count("http_cache_total", host=self.host, result="hit")
+            return self.entry.text
+        return None
+
+    def not_modified(self, status_code: int) -> Optional[str]:
+        """304 Not Modifiedの場合はキャッシュのTTLを延長して本文を返す（それ以外はNone）"""
+        if self.entry and status_code == 304:
+            metrics.count("http_cache_total", host=self.host, result="revalidated")
+            self.cache.touch(self.url)
+            return self.entry.text
+        if self.cache:
+            metrics.count("http_cache_total", host=self.host, result="miss")
+        return None
+
+    def store(self, body: bytes, encoding: Optional[str], headers: Mapping[str, str]) -> None:
+        """受信したレスポンスを保存"""
+        if self.cache:
+            self.cache.store(self.url, body, encoding, headers.get("ETag"), headers.get("Last-Modified"))
+
+
+_cache: Optional[HttpCache] = None
+_cache_enabled = HTTP_CACHE_ENABLED
+_cache_ttl: float = HTTP_CACHE_TTL
+_cache_lock = threading.Lock()
+
+
+def configure_http_cache(enabled: bool) -> None:
+    """HTTPキャッシュの有効/無効を切り替え（CLIの--no-cache用）"""
+    global _cache_enabled
+    _cache_enabled = enabled
+
+
+def limit_http_cache_ttl(interval: float) -> None:
+    """
+    一定間隔で取得し直す場合（ウォッチモード・serve）に、キャッシュをそのまま使う時間を間隔未満にする
+
+    TTLが更新間隔以上だと、前回の取得結果が再検証されずに返り続けるため、
+    間隔がTTL以下なら毎回条件付きリクエストで再検証する（変化がなければ304で本文は受信しない）
+    """
+    global _cache_ttl
+    if interval <= HTTP_CACHE_TTL:
+        with _cache_lock:
+            _cache_ttl = 0.0
+            if _cache is not None:
+                _cache.ttl = _cache_ttl
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """
+    プロセス全体で共有するHTTPキャッシュを取得
+
+    Returns:
+        HttpCache、無効化されている場合はNone
+    """
+    global _cache
+    if not _cache_enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache(HTTP_CACHE_PATH, ttl=_cache_ttl)
+        return _cache
@@ -0,0 +1,153 @@
+"""ランキング行の数値データ（株価・騰落率・出来高・売買代金）を列ごとの型付き配列で保持する"""
+
+from array import array
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+import math
+import re
+
+# 列名（取得できない列はNaN）
+#   price: 株価（円）、change_pct: 騰落率（%）、volume: 出来高（株）、trading_value: 売買代金（円）
+FIELDS = ("price", "change_pct", "volume", "trading_value")
+
+_MISSING = (math.nan,) * len(FIELDS)
+
+# 「80,747」「+28.55%」「−1.2」などから数値部分を取り出す
+_NUMBER_PATTERN = re.compile(r"[-+]?\d[\d,]*(?:\.\d+)?")
+
+_extract_columns = False
+
+
+def configure_columns(enabled: bool) -> None:
+    """ページの抽出時に行の数値データも取り出すか（CLIの--filter/--sort用）"""
+    global _extract_columns
+    _extract_columns = enabled
+
+
+def extracts_columns() -> bool:
+    return _extract_columns
+
+
+def parse_number(text: str) -> float:
+    """セルのテキストを数値に変換（数値がなければNaN）"""
+    match = _NUMBER_PATTERN.search(text.replace("−", "-").replace("▲", "-"))
+    return float(match.group().replace(",", "")) if match else math.nan
+
+
+# 見出しの文字列 → 列名（ランキングごとに列の並びが違っても見出しから位置を決める）
+HEADER_KEYWORDS = (
+    ("change_pct", ("騰落率", "比(%)", "比（%）", "比(％)", "比（％）")),
+    ("trading_value", ("売買代金",)),
+    ("volume", ("出来高",)),
+    ("price", ("株価", "現在値", "終値")),
+)
+
+# 比率の見出し（「出来高変化率」などを出来高の列とみなさない）
+_RATIO_MARKS = ("率", "%", "％", "倍")
+
+# 見出しに書かれた単位 → 倍率（例: 売買代金(百万円)）
+HEADER_UNITS = (("百万", 1e6), ("千", 1e3), ("万", 1e4), ("億", 1e8))
+
+
+class HeaderColumns(NamedTuple):
+    """見出し行から求めた列の位置と単位"""
+
+    columns: Dict[str, int]  # 列名 → セルの番号
+    scales: Dict[str, float]  # 列名 → 値に掛ける倍率
+
+
+def columns_from_header(cells: Sequence[str], spans: Sequence[int]) -> Optional[HeaderColumns]:
+    """
+    見出し行のセルから列の位置を求める（見出しと分かる列がなければNone）
+
+    「前日比」のように複数列にまたがる見出し（colspan）は、最後の列を騰落率（%）とみなす
+
+    Args:
+        cells: 見出し行のセル（td・th）のテキスト
+        spans: 各セルのcolspan
+    """
+    columns: Dict[str, int] = {}
+    scales: Dict[str, float] = {}
+    index = 0
+    for text, span in zip(cells, spans):
+        for field, keywords in HEADER_KEYWORDS:
+            if field in columns:
+                continue
+            if field != "change_pct" and any(mark in text for mark in _RATIO_MARKS):
+                continue
+            if any(keyword in text for keyword in keywords):
+                columns[field] = index
+            elif field == "change_pct" and "前日比" in text and span > 1:
+                columns[field] = index + span - 1
+            else:
+                continue
+            scales[field] = next((scale for unit, scale in HEADER_UNITS if unit in text), 1.0)
+            break
+        index += span
+    return HeaderColumns(columns, scales) if columns else None
+
+
+def parse_row(
+    cells: Sequence[str], columns: Mapping[str, int], scales: Optional[Mapping[str, float]] = None
+) -> Tuple[float, ...]:
+    """
+    1行分のセルのテキストから列の値を取り出す
+
+    Args:
+        cells: 行内のセル（td・th）のテキスト
+        columns: 列名 → セルの番号（0始まり、td・thの出現順）
+        scales: 列名 → 値に掛ける倍率（見出しの単位）
+
+    Returns:
+        FIELDSの順の値のタプル
+    """
+    values = []
+    for field in FIELDS:
+        index = columns.get(field)
+        value = parse_number(cells[index]) if index is not None and index < len(cells) else math.nan
+        if scales and field in scales:
+            value *= scales[field]
+        values.append(value)
+    return tuple(values)
+
+
+class RowColumns:
+    """
+    銘柄コードの順に並んだ行データ（列ごとのdouble配列）
+
+    配列はarray.arrayのため、プロセスプールからも小さいまま受け渡せ、
+    NumPyではコピーせずに配列として扱える（numpy.frombuffer）。
+    """
+
+    def __init__(self, columns: Optional[Dict[str, array]] = None):
+        self.columns = columns if columns is not None else {field: array("d") for field in FIELDS}
+
+    @classmethod
+    def from_rows(cls, codes: Iterable[str], rows: Mapping[str, Tuple[float, ...]]) -> "RowColumns":
+        """銘柄コード → 行の値 から、codesの順の列を作る（行がないコードはNaN）"""
+        result = cls()
+        for code in codes:
+            result.append(rows.get(code, _MISSING))
+        return result
+
+    def __len__(self) -> int:
+        return len(self.columns[FIELDS[0]])
+
+    def append(self, values: Sequence[float]) -> None:
+        """FIELDSの順の値を1行追加"""
+        for field, value in zip(FIELDS, values):
+            self.columns[field].append(value)
+
+    def append_missing(self) -> None:
+        """値のない行を追加（JSONエンドポイントなど行データのないページの銘柄）"""
+        self.append(_MISSING)
+
+    def has_values(self) -> bool:
+        """値のある行が1つでもあるか"""
+        return any(not math.isnan(value) for values in self.columns.values() for value in values)
+
+    def row(self, index: int) -> Tuple[float, ...]:
+        return tuple(self.columns[field][index] for field in FIELDS)
+
+    def head(self, n: int) -> "RowColumns":
+        """先頭n行"""
+        return RowColumns({field: values[:n] for field, values in self.columns.items()})
@@ -0,0 +1,238 @@
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+import json
+import os
+import re
+import threading
+
+
+# JSON内の値を銘柄コードとみなすパターン（4桁の数字、または3-4桁の数字+1文字のアルファベット）
+_CODE_VALUE_PATTERN = re.compile(r"^\d{3,4}[A-Z]?$")
+
+# 直接呼び出しで最初に試すヘッダー
+_MINIMAL_HEADERS = {"accept", "accept-language", "content-type", "referer", "x-requested-with"}
+
+# 再送しないヘッダー（HTTPクライアントが自動で付与する、または再送すると不整合になるもの）
+_EXCLUDED_HEADERS = {"host", "content-length", "connection", "accept-encoding", "user-agent"}
+
+# 学習・保存しないヘッダー（ブラウザのセッションに依存する資格情報）
+_SECRET_HEADERS = {"cookie", "authorization", "proxy-authorization"}
+_SECRET_HEADER_PATTERN = re.compile(r"csrf|xsrf|token|session|auth", re.IGNORECASE)
+
+# ランキングとみなすのに必要な、HTMLの銘柄数に対する割合
+MIN_COVERAGE = 0.8
+
+# 学習済みエンドポイントの応答からランキングを読み出せない場合の例外
+READ_ERRORS = (ValueError, KeyError, IndexError, TypeError, AttributeError)
+
+JsonPath = List[Union[str, int]]
+
+
+class CapturedResponse(NamedTuple):
+    """ブラウザが受信したJSONレスポンス"""
+
+    url: str
+    method: str
+    request_headers: Dict[str, str]
+    body: str
+
+
+class LearnedEndpoint(NamedTuple):
+    """学習したデータエンドポイント"""
+
+    url: str
+    headers: Dict[str, str]  # 直接呼び出しに必要なリクエストヘッダー
+    path: JsonPath  # JSON内のランキング配列までのキー
+    field: str  # 配列の各要素で銘柄コードを持つキー
+
+
+def _normalize_code(value: Any) -> Optional[str]:
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        return None
+    code = str(value).strip()
+    # 3桁以下は除外（正規のコードは4桁以上）
+    if len(code) >= 4 and _CODE_VALUE_PATTERN.match(code):
+        return code
+    return None
+
+
+def _iter_record_lists(data: Any, path: JsonPath) -> Iterator[Tuple[JsonPath, List[Dict[str, Any]]]]:
+    """JSON内のオブジェクト配列を探索"""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from _iter_record_lists(value, path + [key])
+    elif isinstance(data, list):
+        if data and all(isinstance(item, dict) for item in data):
+            yield path, data
+        for i, item in enumerate(data):
+            yield from _iter_record_lists(item, path + [i])
+
+
+def codes_from_json(data: Any, path: JsonPath, field: str) -> List[str]:
+    """
+    JSONから銘柄コードを順位順に取り出す
+
+    Args:
+        data: デコード済みのJSON
+        path: ランキング配列までのキー
+        field: 銘柄コードを持つキー
+
+    Returns:
+        銘柄コードのリスト（重複除去済み）
+    """
+    for key in path:
+        data = data[key]
+    codes: Dict[str, None] = {}
+    for record in data:
+        code = _normalize_code(record.get(field))
+        if code:
+            codes.setdefault(code, None)
+    return list(codes)
+
+
+def matches_ranking(codes: List[str], expected_codes: List[str]) -> bool:
+    """
+    直接呼び出しで得た銘柄コードがHTMLのランキングと同じか
+
+    先頭の一部だけが一致する短い配列（1件だけなど）は採用しない
+    """
+    if not codes or len(codes) < MIN_COVERAGE * len(expected_codes):
+        return False
+    return codes[:len(expected_codes)] == expected_codes[:len(codes)]
+
+
+def find_ranking_in_json(data: Any, expected_codes: List[str]) -> Optional[Tuple[JsonPath, str]]:
+    """
+    JSONの中からHTMLのランキングと一致する配列とキーを探す
+
+    Args:
+        data: デコード済みのJSON
+        expected_codes: HTMLから抽出した銘柄コード（順位順）
+
+    Returns:
+        (配列までのキー, 銘柄コードのキー)、見つからない場合はNone
+    """
+    if not expected_codes:
+        return None
+
+    best = None
+    best_score = 0.0
+    for path, records in _iter_record_lists(data, []):
+        for field in records[0].keys():
+            codes = codes_from_json(data, path, field)
+            # HTMLのランキングの大半を含まない配列（先頭の数件だけなど）は対象外
+            if len(codes) < MIN_COVERAGE * len(expected_codes):
+                continue
+            # HTMLの全順位に対する一致率で評価
+            score = sum(1 for a, b in zip(codes, expected_codes) if a == b) / len(expected_codes)
+            if score > best_score:
+                best, best_score = (path, field), score
+
+    # 大半の順位が一致する場合のみ採用
+    return best if best_score >= MIN_COVERAGE else None
+
+
+def request_header_candidates(headers: Dict[str, str]) -> List[Dict[str, str]]:
+    """
+    直接呼び出しで試すヘッダーの候補（最小限 → ブラウザが送ったもの全て の順）
+
+    Cookie・認証・セッションのヘッダーは含めない（ファイルに平文で保存しないため、
+    それらがないと呼び出せないエンドポイントは学習せずブラウザで取得し続ける）
+
+    Args:
+        headers: ブラウザが送ったリクエストヘッダー
+
+    Returns:
+        ヘッダーの候補リスト
+    """
+    full = _public_headers(headers)
+    minimal = {k: v for k, v in full.items() if k.lower() in _MINIMAL_HEADERS or k.lower().startswith("x-")}
+    return [minimal, full] if minimal != full else [full]
+
+
+def endpoint_candidates(
+    expected_codes: List[str], responses: List[CapturedResponse]
+) -> Iterator[LearnedEndpoint]:
+    """
+    ブラウザが読み込んだJSONのうちHTMLのランキングを含むものから、直接呼び出しを試すエンドポイントを作る
+
+    呼び出し側は順に直接呼び出し、matches_rankingで同じ結果が得られた最初のものを採用する
+
+    Args:
+        expected_codes: HTMLから抽出した銘柄コード（順位順）
+        responses: ブラウザが受信したJSONレスポンス
+
+    Yields:
+        LearnedEndpoint（ヘッダーの少ないものから）
+    """
+    for response in responses:
+        if response.method != "GET":
+            continue
+        try:
+            found = find_ranking_in_json(json.loads(response.body), expected_codes)
+        except ValueError:
+            continue
+        if not found:
+            continue
+
+        path, field = found
+        for headers in request_header_candidates(response.request_headers):
+            yield LearnedEndpoint(response.url, headers, path, field)
+
+
+def _is_replayable(name: str) -> bool:
+    lower = name.lower()
+    if name.startswith(":") or lower in _EXCLUDED_HEADERS or lower in _SECRET_HEADERS:
+        return False
+    return not _SECRET_HEADER_PATTERN.search(lower)
+
+
+def _public_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    return {k: v for k, v in headers.items() if _is_replayable(k)}
+
+
+class EndpointStore:
+    """学習したエンドポイントをJSONファイルに保存（ファイルは最初の使用時に1回だけ読み込む）"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 保存先のファイルパス
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Any]] = None
+
+    def _load_all(self) -> Dict[str, Any]:
+        """ページURL → エンドポイント（呼び出し側でロックを持つ）"""
+        if self._entries is None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save_all(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, page_url: str) -> Optional[LearnedEndpoint]:
+        """ページURLに対応するエンドポイントを取得"""
+        with self._lock:
+            entry = self._load_all().get(page_url)
+        return LearnedEndpoint(**entry) if entry else None
+
+    def put(self, page_url: str, endpoint: LearnedEndpoint) -> None:
+        """ページURLに対応するエンドポイントを保存"""
+        with self._lock:
+            self._load_all()[page_url] = endpoint._replace(headers=_public_headers(endpoint.headers))._asdict()
+            self._save_all()
+
+    def discard(self, page_url: str) -> None:
+        """使えなくなったエンドポイントを削除"""
+        with self._lock:
+            if self._load_all().pop(page_url, None) is not None:
+                self._save_all()
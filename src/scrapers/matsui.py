@@ -1,72 +1,153 @@
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
-from typing import List, Optional, Tuple
+from typing import List, Optional
+import json
 import re
 
-from .base import BaseScraper
-from ..config import MATSUI_URLS
+import requests
+
+from .archive import ArchivedPage, archive_page
+from .base import BaseScraper, PageExtract, extract_table_codes
+from .browser import get_browser_pool
+from .columns import extracts_columns
+from .endpoint import (
+    READ_ERRORS,
+    CapturedResponse,
+    EndpointStore,
+    LearnedEndpoint,
+    codes_from_json,
+    endpoint_candidates,
+    matches_ranking,
+)
+from ..config import (
+    MATSUI_URLS,
+    MATSUI_WAIT_SELECTOR,
+    MATSUI_PAGE_TIMEOUT,
+    MATSUI_FAST_PATH,
+    MATSUI_ENDPOINT_FILE,
+    MATSUI_PAGE_PARAM,
+    MATSUI_ROWS_PER_PAGE,
+    MATSUI_MAX_PAGES,
+)
+
+
+def endpoint_codes(endpoint: LearnedEndpoint, body: str, archive: bool = False) -> Optional[List[str]]:
+    """
+    学習済みエンドポイントの応答から銘柄コードを取り出す（同期版・asyncio版で共有）
+
+    archive=Trueの場合、JSONを抽出に必要なキーとともにアーカイブする
+
+    Returns:
+        銘柄コードのリスト、1件もない場合はNone
+    """
+    if archive:
+        archive_page(endpoint.url, body, kind="json", meta={"path": endpoint.path, "field": endpoint.field})
+    return codes_from_json(json.loads(body), endpoint.path, endpoint.field) or None
 
 
 class MatsuiScraper(BaseScraper):
     """松井証券のスクレイパー（Playwright使用）"""
 
+    # 学習したエンドポイントの保存先（プロセス全体で共有、ページごとのURLで学習する）
+    _endpoints = EndpointStore(MATSUI_ENDPOINT_FILE)
+
+    # 2ページ目以降は ?page=N
+    PAGE_PARAM = MATSUI_PAGE_PARAM
+    ROWS_PER_PAGE = MATSUI_ROWS_PER_PAGE
+    MAX_PAGES = MATSUI_MAX_PAGES
+
     def fetch(self, url: str) -> str:
-        """Playwrightでページを取得"""
-        with sync_playwright() as p:
-            # ボット対策のためより現実的な設定
-            browser = p.chromium.launch(
-                headless=False,  # ヘッドレスモードを無効化
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-dev-shm-usage',
-                    '--no-sandbox',
-                ]
-            )
-            context = browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                viewport={'width': 1920, 'height': 1080},
-                locale='ja-JP',
-            )
-
-            page = context.new_page()
-
-            # webdriver検出を回避
-            page.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-            """)
-
-            page.goto(url, wait_until="networkidle", timeout=60000)
-            html = page.content()
-            browser.close()
-            return html
+        """常駐ブラウザでページを取得（ランキングテーブルの描画まで待機）"""
+        with self.throttle(url):
+            return get_browser_pool().render(url, MATSUI_WAIT_SELECTOR, MATSUI_PAGE_TIMEOUT)
+
+    def load_page(self, url: str) -> PageExtract:
+        """
+        ページを取得して抽出
+
+        学習済みのJSONエンドポイントがあればブラウザを使わずに直接取得し、
+        失敗・拒否された場合のみブラウザで描画して再学習する
+        """
+        if not MATSUI_FAST_PATH:
+            return super().load_page(url)
+
+        endpoint = self.learned_endpoint(url)
+        if endpoint:
+            codes = self._fetch_endpoint(endpoint, archive=True)
+            if codes:
+                return PageExtract(codes, None, len(codes))
+            self._endpoints.discard(url)
+
+        with self.throttle(url):
+            html, responses = get_browser_pool().render_capturing(url, MATSUI_WAIT_SELECTOR, MATSUI_PAGE_TIMEOUT)
+        archive_page(url, html)
+        page = self.extract_page(html)
+        self._learn_endpoint(url, page.codes, responses)
+        return page
+
+    def needs_browser(self, ranking_type: str) -> bool:
+        """エンドポイントを学習済みならブラウザは使わない"""
+        url = self.get_url(ranking_type)
+        return not (MATSUI_FAST_PATH and url and self.learned_endpoint(url))
+
+    def learned_endpoint(self, url: str) -> Optional[LearnedEndpoint]:
+        """
+        直接呼び出す学習済みエンドポイント（なければNone）
+
+        JSONからは銘柄コードしか取り出せないため、行データ（--filter/--sort）が必要な場合は使わない
+        """
+        if extracts_columns():
+            return None
+        return self._endpoints.get(url)
+
+    def _fetch_endpoint(self, endpoint: LearnedEndpoint, archive: bool = False) -> Optional[List[str]]:
+        """
+        学習済みエンドポイントを直接呼び出して銘柄コードを取得（失敗時はNone）
+
+        archive=Trueの場合、取得したJSONを抽出に必要なキーとともにアーカイブする
+        """
+        try:
+            return endpoint_codes(endpoint, self.http_get(endpoint.url, headers=endpoint.headers), archive)
+        except (requests.RequestException,) + READ_ERRORS:
+            return None
+
+    def _learn_endpoint(self, url: str, expected_codes: List[str], responses: List[CapturedResponse]) -> None:
+        """ブラウザが読み込んだJSONからランキングのエンドポイントを学習"""
+        # 直接呼び出しで実際に同じ結果が得られるヘッダーの組み合わせを採用
+        for endpoint in endpoint_candidates(expected_codes, responses):
+            codes = self._fetch_endpoint(endpoint)
+            if codes and matches_ranking(codes, expected_codes):
+                self._endpoints.put(url, endpoint)
+                return
+
+    # ティック回数ランキングテーブルから銘柄コードを抽出
+    # 松井証券の場合、2つ目のテーブルの2列目（銘柄名・コード列）がランキングデータ
+    # 4桁の数字、または3-4桁の数字+1文字のアルファベット（例: 285A）を抽出
+    CODE_TEXT_PATTERN = re.compile(r"(\d{3,4}[A-Z]?)(?:\s|東)")
+
+    # 行: 順位 / 銘柄名・コード / ティック回数 / 株価
+    ROW_COLUMNS = {"price": 3}
+
+    def extract(self, html: str, with_columns: bool = False) -> PageExtract:
+        """HTMLから銘柄コードを1パスで抽出"""
+        # 3桁以下は除外（正規のコードは4桁以上）
+        return extract_table_codes(
+            html,
+            table_index=1,
+            column=1,
+            code_pattern=self.CODE_TEXT_PATTERN,
+            min_length=4,
+            columns=self.ROW_COLUMNS if with_columns else None,
+        )
+
+    def extract_archived(self, page: ArchivedPage) -> PageExtract:
+        """JSONエンドポイントからアーカイブしたページを抽出"""
+        if page.kind != "json":
+            return super().extract_archived(page)
+        codes = codes_from_json(json.loads(page.content), page.meta["path"], page.meta["field"])
+        return PageExtract(codes, None, len(codes))
 
     def parse(self, html: str) -> List[str]:
         """HTMLから銘柄コードを抽出"""
-        soup = BeautifulSoup(html, "lxml")
-        codes = []
-
-        # ティック回数ランキングテーブルから銘柄コードを抽出
-        # 松井証券の場合、2つ目のテーブルがランキングデータ
-        tables = soup.find_all("table")
-        if len(tables) >= 2:
-            table = tables[1]  # 2つ目のテーブルを使用
-            rows = table.find_all("tr")
-            for row in rows[1:]:  # ヘッダー行をスキップ
-                cells = row.find_all("td")
-                if len(cells) >= 2:
-                    # 2列目（銘柄名・コード列）から抽出
-                    text = cells[1].get_text(strip=True)
-                    # 4桁の数字、または3-4桁の数字+1文字のアルファベット（例: 285A）を抽出
-                    match = re.search(r"(\d{3,4}[A-Z]?)(?:\s|東)", text)
-                    if match:
-                        code = match.group(1)
-                        # 3桁以下は除外（正規のコードは4桁以上）
-                        if len(code) >= 4 and code not in codes:
-                            codes.append(code)
-
-        return codes
+        return self.extract(html).codes
 
     def get_url(self, ranking_type: str) -> Optional[str]:
         """ランキング種類に対応するURLを取得"""
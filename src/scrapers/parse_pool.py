@@ -0,0 +1,105 @@
+"""HTML抽出の実行先（ワーカースレッド内、または常駐プロセスプール）"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from importlib import import_module
+from typing import TYPE_CHECKING, Dict, Optional, Type
+import atexit
+import multiprocessing
+import os
+import threading
+
+from ..config import PARSE_EXECUTOR, PARSE_PROCESSES
+
+if TYPE_CHECKING:
+    from .base import BaseScraper, PageExtract
+
+# 抽出の実行先（"thread": 取得したワーカースレッドでそのまま抽出、"process": プロセスプールに送る）
+PARSE_EXECUTORS = ("thread", "process")
+
+_mode = PARSE_EXECUTOR
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# ワーカープロセス内で使い回すスクレイパー（クラスの参照 → インスタンス）
+_worker_scrapers: Dict[str, "BaseScraper"] = {}
+
+
+def configure_parse_executor(mode: str) -> None:
+    """抽出の実行先を切り替え（CLIの--parse-executor用）"""
+    global _mode
+    if mode not in PARSE_EXECUTORS:
+        raise ValueError(f"Unknown parse executor: {mode}")
+    _mode = mode
+
+
+def uses_process_pool() -> bool:
+    return _mode == "process"
+
+
+def pool_size() -> int:
+    """プロセスプールのワーカー数"""
+    return PARSE_PROCESSES or os.cpu_count() or 1
+
+
+def _init_worker() -> None:
+    # スクレイパーのモジュールを先に読み込んでおき、最初のページから待たせない
+    from . import SCRAPER_REGISTRY
+
+    for module_name, _ in set(SCRAPER_REGISTRY.values()):
+        import_module(f".{module_name}", __package__)
+
+
+def _extract_in_worker(scraper_ref: str, html: bytes, with_columns: bool) -> "PageExtract":
+    scraper = _worker_scrapers.get(scraper_ref)
+    if scraper is None:
+        module_name, class_name = scraper_ref.rsplit(":", 1)
+        scraper = _worker_scrapers[scraper_ref] = getattr(import_module(module_name), class_name)()
+    return scraper.extract(html.decode("utf-8"), with_columns)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # スレッドを持つ親プロセスをforkしないようspawnで起動（Windowsと同じ挙動）
+            _pool = ProcessPoolExecutor(
+                max_workers=pool_size(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _pool
+
+
+@atexit.register
+def shutdown() -> None:
+    """プロセスプールを停止（次に使うときに作り直す）"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def warm_up() -> None:
+    """プロセスプールを使う設定なら、取得を始める前にワーカーを起動しておく（通信と並行して起動が進む）"""
+    if not uses_process_pool():
+        return
+    pool = _get_pool()
+    for _ in range(pool_size()):
+        pool.submit(os.getpid)
+
+
+def submit_extract(scraper_class: "Type[BaseScraper]", html: str, with_columns: bool = False) -> "Future[PageExtract]":
+    """
+    HTMLをプロセスプールに送り、抽出結果（銘柄コードなどの小さなデータ）だけを受け取る
+
+    Args:
+        scraper_class: 抽出に使うスクレイパークラス（ワーカー内で引数なしで生成する）
+        html: HTMLコンテンツ
+        with_columns: Trueの場合、行データも取り出す
+
+    Returns:
+        PageExtractのFuture
+    """
+    scraper_ref = f"{scraper_class.__module__}:{scraper_class.__qualname__}"
+    return _get_pool().submit(_extract_in_worker, scraper_ref, html.encode("utf-8"), with_columns)
@@ -0,0 +1,307 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, Type, TypeVar
+import asyncio
+import random
+import threading
+import time
+
+import requests
+
+from .throttle import AsyncHostThrottle, HostThrottle
+from ..config import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT,
+    HEDGE_ENABLED,
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    HOST_RATE_LIMITS,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+    RETRY_MAX_ATTEMPTS,
+)
+from ..metrics import metrics
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """サーキットブレーカーが開いているため、リクエストを送らずに失敗した"""
+
+
+def _is_retryable_status(status_code: int) -> bool:
+    return status_code >= 500 or status_code == 429
+
+
+def _backoff(attempt: int) -> float:
+    """attempt回目の失敗後に待つ秒数（指数バックオフ、ジッターあり）"""
+    return min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+
+def _timed(send: Callable[[], T]) -> Tuple[T, float]:
+    """send()を呼び、結果と所要秒数を返す（レイテンシの観測はレート制限の待ち時間を含めない）"""
+    started = time.monotonic()
+    return send(), time.monotonic() - started
+
+
+async def _timed_async(send: Callable[[], Awaitable[T]]) -> Tuple[T, float]:
+    """_timedのasyncio版"""
+    started = time.monotonic()
+    return await send(), time.monotonic() - started
+
+
+def _send_holding(slot: ExitStack, send: Callable[[], T]) -> Tuple[T, float]:
+    """_timedと同様に送信し、終わった時点で本リクエストの枠を解放する"""
+    with slot:
+        return _timed(send)
+
+
+# ヘッジを使う場合の送信用のスレッド（全ホストで共有）
+# 本リクエストとヘッジはそれぞれ枠を持つため、同時に使うのは最大で全ホストの同時実行数の合計
+_send_executor = ThreadPoolExecutor(
+    max_workers=sum(limits["concurrency"] for limits in HOST_RATE_LIMITS.values()) + 8, thread_name_prefix="send"
+)
+
+
+class HostResilience:
+    """
+    ホスト単位のリトライ・ヘッジリクエスト・サーキットブレーカー
+
+    - 5xx・429・タイムアウト・接続エラーは指数バックオフ（ジッターあり）で再試行
+    - 観測したp95レイテンシを超えても応答がなければ、同じリクエストをもう1本送り先着を採用
+    - 連続して失敗したホストは一定時間リクエストを送らずに即座に失敗させる
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=200)
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    def hedge_delay(self) -> Optional[float]:
+        """ヘッジを送るまでの待機秒数（観測数が足りない場合はNone）"""
+        with self._lock:
+            if not HEDGE_ENABLED or len(self._latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return max(HEDGE_MIN_DELAY, ordered[int(0.95 * (len(ordered) - 1))])
+
+    def _before_request(self) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < BREAKER_RESET_TIMEOUT or self._probing:
+                metrics.count("circuit_rejected_total", host=self.host)
+                raise CircuitOpenError(f"{self.host}: 連続して失敗しているため一時的にリクエストを停止しています")
+            # 一定時間経過後は1本だけ試行（half-open）
+            self._probing = True
+
+    def _record_success(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def _end_probe(self) -> None:
+        """結果を記録せずにhalf-openの試行を終える（想定外の例外で終わった場合、次のリクエストで再び試行する）"""
+        with self._lock:
+            self._probing = False
+
+    def _record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= BREAKER_FAILURE_THRESHOLD:
+                if self._opened_at is None or self._probing:
+                    metrics.count("circuit_opened_total", host=self.host)
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def _send(
+        self, throttle: HostThrottle, send: Callable[[], requests.Response]
+    ) -> Tuple[requests.Response, float]:
+        """
+        1回分の送信（遅い場合はヘッジリクエストを追加し、先着を採用）
+
+        枠の確保（レート制限の待機）は呼び出し元のスレッドで行い、ヘッジを送り得る場合のみ
+        本リクエストとヘッジを送信用のスレッドで並行に待つ。ヘッジまでの待機は送信開始から数える。
+        先着しなかったほうは完了まで送信を続け（中断できないため）、結果は捨てる。
+
+        Returns:
+            タプル（レスポンス, send()の所要秒数）
+        """
+        with ExitStack() as stack:
+            stack.enter_context(throttle.slot())
+            delay = self.hedge_delay()
+            if delay is None:
+                return _timed(send)
+            # 本リクエストの枠は、先にヘッジが返った場合も送信が終わるまで保持する
+            slot = stack.pop_all()
+
+        try:
+            futures = {_send_executor.submit(_send_holding, slot, send)}
+        except BaseException:
+            slot.close()
+            raise
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            futures.add(_send_executor.submit(self._hedge, throttle, send))
+
+        # 先に成功したほうを採用（失敗・見送りの場合は残りを待つ）
+        error: Optional[BaseException] = None
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                if result is not None:
+                    return result
+        raise error
+
+    def _hedge(
+        self, throttle: HostThrottle, send: Callable[[], requests.Response]
+    ) -> Optional[Tuple[requests.Response, float]]:
+        """ヘッジを送る（枠に空きがなく送らなかった場合はNone）"""
+        # サイトへの負荷を増やさないよう、枠に空きがある場合だけ送る
+        with throttle.try_slot() as acquired:
+            if not acquired:
+                return None
+            metrics.count("hedged_requests_total", host=self.host)
+            return _timed(send)
+
+    def request(self, throttle: HostThrottle, send: Callable[[], requests.Response]) -> requests.Response:
+        """
+        リトライ・ヘッジ・サーキットブレーカーを適用してリクエストを送る
+
+        Args:
+            throttle: ホストのレート制限
+            send: リクエストを1回送る関数（レート制限は呼び出し側で不要）
+
+        Returns:
+            レスポンス（リトライ上限まで5xxが続いた場合は最後の5xxレスポンス）
+        """
+        for attempt in range(1, RETRY_MAX_ATTEMPTS + 1):
+            self._before_request()
+            try:
+                response, latency = self._send(throttle, send)
+            except (requests.Timeout, requests.ConnectionError):
+                self._record_failure()
+                if attempt == RETRY_MAX_ATTEMPTS:
+                    raise
+            except BaseException:
+                self._end_probe()
+                raise
+            else:
+                if not _is_retryable_status(response.status_code):
+                    self._record_success(latency)
+                    return response
+                self._record_failure()
+                if attempt == RETRY_MAX_ATTEMPTS:
+                    return response
+
+            metrics.count("http_retries_total", host=self.host)
+            time.sleep(_backoff(attempt))
+
+    async def _send_async(self, throttle: AsyncHostThrottle, send: Callable[[], Awaitable[Any]]) -> Tuple[Any, float]:
+        """_sendのasyncio版（遅い場合はヘッジリクエストを追加し、先着しなかったほうはキャンセル）"""
+        async with throttle.slot():
+            delay = self.hedge_delay()
+            if delay is None:
+                return await _timed_async(send)
+
+            async def hedge() -> Optional[Tuple[Any, float]]:
+                async with throttle.try_slot() as acquired:
+                    if not acquired:
+                        return None
+                    metrics.count("hedged_requests_total", host=self.host)
+                    return await _timed_async(send)
+
+            tasks = {asyncio.ensure_future(_timed_async(send))}
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                tasks.add(asyncio.ensure_future(hedge()))
+
+            # 先に成功したほうを採用（失敗・見送りの場合は残りを待つ）
+            error: Optional[BaseException] = None
+            try:
+                while tasks:
+                    done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        try:
+                            result = task.result()
+                        except Exception as e:
+                            error = error or e
+                            continue
+                        if result is not None:
+                            return result
+                raise error
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    async def request_async(
+        self,
+        throttle: AsyncHostThrottle,
+        send: Callable[[], Awaitable[Any]],
+        transient_errors: Tuple[Type[BaseException], ...],
+    ) -> Any:
+        """
+        requestのasyncio版（ブレーカーの状態・レイテンシの観測は同期版と共有）
+
+        Args:
+            throttle: ホストのレート制限
+            send: リクエストを1回送るコルーチン関数（status_codeを持つレスポンスを返す）
+            transient_errors: 再試行するタイムアウト・接続エラーの例外クラス
+
+        Returns:
+            レスポンス（リトライ上限まで5xxが続いた場合は最後の5xxレスポンス）
+        """
+        for attempt in range(1, RETRY_MAX_ATTEMPTS + 1):
+            self._before_request()
+            try:
+                response, latency = await self._send_async(throttle, send)
+            except transient_errors:
+                self._record_failure()
+                if attempt == RETRY_MAX_ATTEMPTS:
+                    raise
+            except BaseException:
+                # キャンセルを含む
+                self._end_probe()
+                raise
+            else:
+                if not _is_retryable_status(response.status_code):
+                    self._record_success(latency)
+                    return response
+                self._record_failure()
+                if attempt == RETRY_MAX_ATTEMPTS:
+                    return response
+
+            metrics.count("http_retries_total", host=self.host)
+            await asyncio.sleep(_backoff(attempt))
+
+
+_resilience: Dict[str, HostResilience] = {}
+_resilience_lock = threading.Lock()
+
+
+def get_resilience(host: str) -> HostResilience:
+    """
+    ホストに対応するHostResilienceを取得（プロセス全体で共有）
+
+    Args:
+        host: ホスト名
+
+    Returns:
+        HostResilience
+    """
+    with _resilience_lock:
+        resilience = _resilience.get(host)
+        if resilience is None:
+            resilience = _resilience[host] = HostResilience(host)
+        return resilience
@@ -0,0 +1,60 @@
+from typing import Optional
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+from ..config import HOST_RATE_LIMITS, HTTP_TIMEOUT, USER_AGENT
+from .throttle import get_throttle
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    """Keep-Alive・圧縮転送を有効にしたセッションを生成"""
+    session = requests.Session()
+
+    # User-Agentと対応する圧縮形式（gzip/deflate、brotliが入っていればbrも）を一度だけ設定
+    session.headers.update(make_headers(accept_encoding=True))
+    session.headers["User-Agent"] = USER_AGENT
+
+    # ホストごとの接続プールを同時リクエスト数の上限に合わせる
+    for host, limits in HOST_RATE_LIMITS.items():
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=limits["concurrency"])
+        session.mount(f"https://{host}/", adapter)
+        session.mount(f"http://{host}/", adapter)
+
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    プロセス全体で共有するHTTPセッションを取得
+
+    同じホストへのリクエストはTCP/TLS接続を再利用する
+
+    Returns:
+        requests.Session
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
+def preconnect(url: str) -> None:
+    """
+    URLのホストにHEADリクエストを1回送り、DNS解決とTCP/TLS接続を済ませた接続をセッションの接続プールに入れておく
+
+    本文は受信しない。以降の同じホストへのリクエストはこの接続を再利用する。
+    ホストのレート制限の枠を1つ使う。
+
+    Args:
+        url: 接続するホストのURL
+    """
+    with get_throttle(url).slot():
+        get_session().head(url, timeout=HTTP_TIMEOUT, allow_redirects=False).close()
@@ -1,42 +1,39 @@
-import requests
-from bs4 import BeautifulSoup
-from typing import List, Optional, Tuple
+from typing import List, Optional
 import re
 
-from .base import BaseScraper
-from ..config import STOCKWEATHER_URLS, USER_AGENT
+from .base import BaseScraper, PageExtract, extract_link_codes
+from ..config import STOCKWEATHER_MAX_PAGES, STOCKWEATHER_PAGE_PARAM, STOCKWEATHER_ROWS_PER_PAGE, STOCKWEATHER_URLS
 
 
 class StockWeatherScraper(BaseScraper):
     """ストックウェザーのスクレイパー"""
 
+    DETECT_ENCODING = True
+
+    # 2ページ目以降は &page=N
+    PAGE_PARAM = STOCKWEATHER_PAGE_PARAM
+    ROWS_PER_PAGE = STOCKWEATHER_ROWS_PER_PAGE
+    MAX_PAGES = STOCKWEATHER_MAX_PAGES
+
     def fetch(self, url: str) -> str:
         """ページを取得"""
-        headers = {"User-Agent": USER_AGENT}
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        response.encoding = response.apparent_encoding
-        return response.text
+        return self.http_get(url, detect_encoding=self.DETECT_ENCODING)
+
+    # ランキングテーブルから銘柄コードを抽出
+    # stockdetail.aspx?cntcode=JP&skubun=1&stkcode=[銘柄コード] の形式
+    # 銘柄コードは4桁の数字、または3-4桁の数字+1文字のアルファベット（例: 485A）
+    CODE_HREF_PATTERN = re.compile(r"stockdetail\.aspx.*stkcode=(\d{3,4}[A-Z]?)")
+
+    # 行: 順位 / 銘柄名・コード / 株価 / 騰落率(寄付比) / 出来高
+    ROW_COLUMNS = {"price": 2, "change_pct": 3, "volume": 4}
+
+    def extract(self, html: str, with_columns: bool = False) -> PageExtract:
+        """HTMLから銘柄コードを1パスで抽出"""
+        return extract_link_codes(html, self.CODE_HREF_PATTERN, columns=self.ROW_COLUMNS if with_columns else None)
 
     def parse(self, html: str) -> List[str]:
         """HTMLから銘柄コードを抽出"""
-        soup = BeautifulSoup(html, "lxml")
-        codes = []
-
-        # ランキングテーブルから銘柄コードを抽出
-        # stockdetail.aspx?cntcode=JP&skubun=1&stkcode=[銘柄コード] の形式
-        # 銘柄コードは4桁の数字、または3-4桁の数字+1文字のアルファベット（例: 485A）
-        links = soup.find_all("a", href=re.compile(r"stockdetail\.aspx.*stkcode="))
-
-        for link in links:
-            # 4桁の数字、または3-4桁の数字+1文字のアルファベットを抽出
-            match = re.search(r"stkcode=(\d{3,4}[A-Z]?)", link["href"])
-            if match:
-                code = match.group(1)
-                if code not in codes:  # 重複を除外
-                    codes.append(code)
-
-        return codes
+        return self.extract(html).codes
 
     def get_url(self, ranking_type: str) -> Optional[str]:
         """ランキング種類に対応するURLを取得"""
@@ -0,0 +1,181 @@
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator
+from urllib.parse import urlsplit
+import asyncio
+import threading
+import time
+
+from ..config import HOST_RATE_LIMITS, DEFAULT_HOST_RATE_LIMIT
+from ..metrics import metrics
+
+
+class TokenBucket:
+    """スレッドセーフなトークンバケット"""
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Args:
+            rate: 1秒あたりに補充されるトークン数
+            burst: バケット容量（連続で発行できるリクエスト数）
+        """
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """トークンがあれば1つ取得（待機しない）"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def wait_time(self) -> float:
+        """次のトークンが補充されるまでの秒数（今あれば0）"""
+        with self._lock:
+            self._refill()
+            return max(0.0, (1 - self._tokens) / self.rate)
+
+    def acquire(self) -> float:
+        """
+        トークンを1つ取得（足りない場合は補充されるまで待機）
+
+        Returns:
+            待機した秒数
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class HostThrottle:
+    """ホスト単位の流量制御（トークンバケット＋同時実行数の上限）"""
+
+    def __init__(self, host: str, rate: float, burst: int, concurrency: int):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = max(1, concurrency)
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """リクエスト1回分の枠を確保するコンテキストマネージャ"""
+        started = time.perf_counter()
+        with self._slots:
+            self.bucket.acquire()
+            metrics.observe("throttle_wait", time.perf_counter() - started, host=self.host)
+            yield
+
+    @contextmanager
+    def try_slot(self) -> Iterator[bool]:
+        """
+        空きがあればリクエスト1回分の枠を確保（待機しない、ヘッジリクエスト用）
+
+        Yields:
+            枠を確保できた場合True
+        """
+        if not self._slots.acquire(blocking=False):
+            yield False
+            return
+        try:
+            yield self.bucket.try_acquire()
+        finally:
+            self._slots.release()
+
+
+class AsyncHostThrottle:
+    """
+    HostThrottleのasyncio版（イベントループ内で使う）
+
+    トークンバケットは同じホストのHostThrottleと共有し、同時実行数はasyncio.Semaphoreで制限する
+    """
+
+    def __init__(self, throttle: HostThrottle):
+        self.host = throttle.host
+        self.bucket = throttle.bucket
+        self.concurrency = throttle.concurrency
+        self._slots = asyncio.Semaphore(self.concurrency)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """リクエスト1回分の枠を確保するコンテキストマネージャ"""
+        started = time.perf_counter()
+        async with self._slots:
+            while not self.bucket.try_acquire():
+                await asyncio.sleep(self.bucket.wait_time())
+            metrics.observe("throttle_wait", time.perf_counter() - started, host=self.host)
+            yield
+
+    @asynccontextmanager
+    async def try_slot(self) -> AsyncIterator[bool]:
+        """
+        空きがあればリクエスト1回分の枠を確保（待機しない、ヘッジリクエスト用）
+
+        Yields:
+            枠を確保できた場合True
+        """
+        if self._slots.locked():
+            yield False
+            return
+        async with self._slots:
+            yield self.bucket.try_acquire()
+
+
+_throttles: Dict[str, HostThrottle] = {}
+_throttles_lock = threading.Lock()
+
+
+def get_throttle(url: str) -> HostThrottle:
+    """
+    URLのホストに対応するHostThrottleを取得（プロセス全体で共有）
+
+    Args:
+        url: リクエスト先URL
+
+    Returns:
+        HostThrottle
+    """
+    host = urlsplit(url).hostname or ""
+    with _throttles_lock:
+        throttle = _throttles.get(host)
+        if throttle is None:
+            limits = HOST_RATE_LIMITS.get(host, DEFAULT_HOST_RATE_LIMIT)
+            throttle = HostThrottle(host, limits["rate"], limits["burst"], limits["concurrency"])
+            _throttles[host] = throttle
+        return throttle
+
+
+# イベントループは取得エンジンの1つだけなので、ホスト単位に1つ持つ
+_async_throttles: Dict[str, AsyncHostThrottle] = {}
+
+
+def get_async_throttle(url: str) -> AsyncHostThrottle:
+    """
+    URLのホストに対応するAsyncHostThrottleを取得（イベントループ内から呼ぶ）
+
+    Args:
+        url: リクエスト先URL
+
+    Returns:
+        AsyncHostThrottle
+    """
+    host = urlsplit(url).hostname or ""
+    throttle = _async_throttles.get(host)
+    if throttle is None:
+        throttle = _async_throttles[host] = AsyncHostThrottle(get_throttle(url))
+    return throttle
@@ -0,0 +1,370 @@
+"""ローカルHTTPサーバー：最新のランキングをメモリに保持し、バックグラウンドで更新しながら配信する"""
+
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple, Type
+from urllib.parse import urlsplit
+import hashlib
+import json
+import threading
+import time
+
+from .config import SERVE_READY_TIMEOUT
+from .exporters.tradingview import format_section, tradingview_symbols
+from .market import JST, holidays_warning, is_market_open, next_session_start, now_jst
+from .metrics import metrics
+from .runner import fetch_rankings
+from .scrapers.cache import limit_http_cache_ttl
+
+if TYPE_CHECKING:
+    from .scrapers.base import BaseScraper
+    from .symbols import SymbolMaster
+
+
+class Body(NamedTuple):
+    """エンコード済みのレスポンス本文（リクエストごとに変換しない）"""
+
+    data: bytes
+    content_type: str
+    etag: str
+
+
+def make_body(content: str, content_type: str) -> Body:
+    data = content.encode("utf-8")
+    return Body(data, content_type, '"' + hashlib.sha256(data).hexdigest()[:32] + '"')
+
+
+def make_json_body(value: object) -> Body:
+    return make_body(json.dumps(value, ensure_ascii=False), "application/json; charset=utf-8")
+
+
+class Snapshot(NamedTuple):
+    """1ランキング分の最新の取得結果"""
+
+    ranking_type: str
+    codes: List[str]
+    symbols: List[str]  # TradingViewのシンボル（銘柄マスターで検証済み）
+    update_date: Optional[str]
+    fetched_at: float  # 取得できた時刻（UNIX時間）
+    error: Optional[str]  # 直近の更新が失敗した場合のエラー（codesは前回の結果のまま）
+    text: Body
+    json: Body
+
+
+class RankingCache:
+    """
+    ランキングごとの最新の取得結果を保持し、バックグラウンドのスレッドで更新する
+
+    更新は1スレッドだけが行うため、クライアント数によらずサイトへの取得は1回の更新につき1回になる。
+    読み出しはロックを取らない（更新時に辞書ごと差し替える）。
+    立会時間中はinterval秒ごと、引け後は1回だけ更新し、次の立会開始まで待機する。
+    古くなった結果を読まれた場合は、その結果を返しつつ更新を前倒しする（stale-while-revalidate）。
+    """
+
+    def __init__(
+        self,
+        rankings: List[str],
+        count: int,
+        scraper_map: "Mapping[str, Tuple[str, Type[BaseScraper]]]",
+        interval: float,
+        echo: Callable[..., None],
+        symbols: "Optional[SymbolMaster]" = None,
+    ):
+        """
+        Args:
+            rankings: 配信するランキング種類のリスト
+            count: 取得する銘柄数
+            scraper_map: ランキング種類 → (ソース名, スクレイパークラス) のマッピング
+            interval: 立会時間中の更新間隔（秒）
+            echo: ログ出力関数（click.echo互換）
+            symbols: 銘柄マスター
+        """
+        self.rankings = rankings
+        self.count = count
+        self.scraper_map = scraper_map
+        self.interval = interval
+        self.echo = echo
+        self.symbols = symbols
+
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._combined: Optional[Body] = None
+        self._index = make_json_body({"rankings": []})
+        self._scrapers: "Dict[str, BaseScraper]" = {}
+
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._refreshing = False
+        self._last_refresh = 0.0  # 直近の更新の開始時刻（time.monotonic()）
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """バックグラウンドの更新を開始（最初の取得はすぐに行う）"""
+        self._thread = threading.Thread(target=self._run, name="serve-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """更新を停止（取得中の場合はその取得の終了後に止まる）"""
+        self._stop.set()
+        self._wake.set()
+
+    def wait_ready(self, timeout: float = SERVE_READY_TIMEOUT) -> bool:
+        """最初の更新が終わるまで待つ（終わっていればTrue）"""
+        return self._ready.wait(timeout)
+
+    def get(self, ranking_type: str) -> Optional[Snapshot]:
+        snapshot = self._snapshots.get(ranking_type)
+        if snapshot is not None and self.is_stale(snapshot):
+            self.request_refresh()
+        return snapshot
+
+    def combined(self) -> Optional[Body]:
+        """全ランキングを###セクションでまとめたウォッチリスト"""
+        return self._combined
+
+    def index(self) -> Body:
+        """配信中のランキングの一覧"""
+        return self._index
+
+    def is_stale(self, snapshot: Snapshot) -> bool:
+        """立会時間中に更新間隔より古くなっているか（引け後は更新されないため古くならない）"""
+        return time.time() - snapshot.fetched_at > self.interval and is_market_open()
+
+    def request_refresh(self) -> None:
+        """次の更新を前倒しする（更新中、または前回の更新からinterval秒経っていなければ何もしない）"""
+        # 取得に失敗し続けているランキングが読まれるたびにサイトへ取りに行かないようにする
+        if not self._refreshing and time.monotonic() - self._last_refresh >= self.interval:
+            self._wake.set()
+
+    def _run(self) -> None:
+        refresh_after_close = False
+        while not self._stop.is_set():
+            now = now_jst()
+            market_open = is_market_open(now)
+            if market_open or refresh_after_close or not self._ready.is_set():
+                started = time.monotonic()
+                self.refresh()
+                # 立会中に更新した場合は、引けの確定値を取るため立会終了後にもう1回だけ更新する
+                refresh_after_close = market_open
+                wait = self.interval - (time.monotonic() - started)
+            else:
+                resume_at = next_session_start(now)
+                self.echo(f"[{now:%H:%M:%S}] 立会時間外のため {resume_at:%Y/%m/%d %H:%M} まで更新を停止します")
+                wait = (resume_at - now_jst()).total_seconds()
+            self._wake.wait(max(0.0, wait))
+            self._wake.clear()
+
+    def refresh(self) -> None:
+        """全ランキングを取得し直して差し替える（失敗したランキングは前回の結果を残す）"""
+        self._refreshing = True
+        self._last_refresh = time.monotonic()
+        try:
+            with metrics.stage("serve_refresh"):
+                self._refresh()
+        except Exception as e:
+            self.echo(f"[{now_jst():%H:%M:%S}] 更新エラー: {e}", err=True)
+        finally:
+            self._refreshing = False
+            self._ready.set()
+
+    def _refresh(self) -> None:
+        snapshots = dict(self._snapshots)
+        shared_update_date = None
+        for result in fetch_rankings(self.rankings, self.count, self.scraper_map, self._scrapers):
+            ranking_type = result.ranking_type
+            stamp = f"{now_jst():%H:%M:%S}"
+            previous = snapshots.get(ranking_type)
+
+            if result.error or not result.codes:
+                error = str(result.error) if result.error else "銘柄が取得できませんでした"
+                self.echo(f"[{stamp}][{ranking_type}] エラー: {error}", err=True)
+                if previous is not None:
+                    snapshots[ranking_type] = self._snapshot(
+                        ranking_type, previous.codes, previous.update_date, previous.fetched_at, error
+                    )
+                continue
+
+            if result.update_date and not shared_update_date:
+                shared_update_date = result.update_date
+            update_date = result.update_date or shared_update_date
+            snapshots[ranking_type] = self._snapshot(ranking_type, result.codes, update_date, time.time(), None)
+            self.echo(f"[{stamp}][{ranking_type}] {len(result.codes)}件")
+
+        self._publish(snapshots)
+
+    def _snapshot(
+        self, ranking_type: str, codes: List[str], update_date: Optional[str], fetched_at: float, error: Optional[str]
+    ) -> Snapshot:
+        symbols = tradingview_symbols(codes, self.symbols)
+        text = make_body(",".join(symbols), "text/plain; charset=utf-8")
+        body = make_json_body(
+            {
+                "ranking": ranking_type,
+                "update_date": update_date,
+                "fetched_at": _isoformat(fetched_at),
+                "count": len(codes),
+                "codes": codes,
+                "symbols": symbols,
+                "error": error,
+            }
+        )
+        return Snapshot(ranking_type, codes, symbols, update_date, fetched_at, error, text, body)
+
+    def _publish(self, snapshots: Dict[str, Snapshot]) -> None:
+        ordered = [snapshots[name] for name in self.rankings if name in snapshots]
+        sections = [format_section(snapshot.ranking_type, snapshot.symbols) for snapshot in ordered]
+        combined = make_body(",".join(sections), "text/plain; charset=utf-8") if ordered else None
+        index = make_json_body(
+            {
+                "rankings": [
+                    {
+                        "ranking": snapshot.ranking_type,
+                        "update_date": snapshot.update_date,
+                        "fetched_at": _isoformat(snapshot.fetched_at),
+                        "count": len(snapshot.codes),
+                        "error": snapshot.error,
+                        "text": f"/{snapshot.ranking_type}.txt",
+                        "json": f"/{snapshot.ranking_type}.json",
+                    }
+                    for snapshot in ordered
+                ],
+                "combined": "/combined.txt" if ordered else None,
+            }
+        )
+        # 参照の代入で差し替える（読み出し側は古い辞書か新しい辞書のどちらかを見る）
+        self._snapshots = snapshots
+        self._combined = combined
+        self._index = index
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, JST).isoformat(timespec="seconds")
+
+
+class RankingRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /                  配信中のランキングの一覧（JSON）
+    GET /<ranking>.txt     TradingViewのウォッチリスト（エクスポーターの出力と同じ形式）
+    GET /<ranking>.json    銘柄コード・シンボル・更新日など
+    GET /combined.txt      全ランキングを###セクションでまとめたウォッチリスト
+    """
+
+    # キープアライブで同じ接続から繰り返し読めるようにする
+    protocol_version = "HTTP/1.1"
+    # ヘッダーと本文を別々に送るため、Nagleアルゴリズムで遅延しないようにする
+    disable_nagle_algorithm = True
+    server_version = "RankingServer"
+    cache: RankingCache
+
+    def do_HEAD(self) -> None:
+        self._handle(send_body=False)
+
+    def do_GET(self) -> None:
+        self._handle(send_body=True)
+
+    def _handle(self, send_body: bool) -> None:
+        path = urlsplit(self.path).path.rstrip("/")
+        body, stale = self._resolve(path, send_body)
+        if body is None:
+            return
+        headers = {"ETag": body.etag, "Cache-Control": "no-cache"}
+        if stale:
+            headers["Warning"] = '110 - "Response is Stale"'
+        if self.headers.get("If-None-Match") == body.etag:
+            self._send(304, None, headers, send_body)
+        else:
+            self._send(200, body, headers, send_body)
+
+    def _resolve(self, path: str, send_body: bool) -> Tuple[Optional[Body], bool]:
+        if not self.cache.wait_ready():
+            self._error(send_body, 503, "ランキングを取得中です")
+            return None, False
+        if path == "":
+            return self.cache.index(), False
+        name, _, extension = path.lstrip("/").rpartition(".")
+        if not name:
+            name, extension = extension, "txt"
+        if extension not in ("txt", "json"):
+            self._error(send_body, 404, "not found")
+            return None, False
+
+        if name == "combined" and extension == "txt":
+            combined = self.cache.combined()
+            if combined is None:
+                self._error(send_body, 503, "ランキングを取得できていません")
+            return combined, False
+
+        if name not in self.cache.rankings:
+            self._error(send_body, 404, f"unknown ranking: {name}")
+            return None, False
+        snapshot = self.cache.get(name)
+        if snapshot is None:
+            self._error(send_body, 503, "ランキングを取得できていません")
+            return None, False
+        return (snapshot.text if extension == "txt" else snapshot.json), self.cache.is_stale(snapshot)
+
+    def _error(self, send_body: bool, status: int, message: str) -> None:
+        """エラーをJSONで返す（HEADの場合はヘッダーのみ）"""
+        headers = {"Retry-After": str(int(self.cache.interval))} if status == 503 else {}
+        self._send(status, make_json_body({"error": message}), headers, send_body)
+
+    def _send(self, status: int, body: Optional[Body], headers: Dict[str, str], send_body: bool) -> None:
+        metrics.count("serve_requests_total", status=status)
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        if body is not None:
+            self.send_header("Content-Type", body.content_type)
+            self.send_header("Content-Length", str(len(body.data)))
+        else:
+            self.send_header("Content-Length", "0")
+        self.end_headers()
+        if body is not None and send_body:
+            self.wfile.write(body.data)
+
+    def log_message(self, format: str, *args) -> None:
+        # リクエストごとのログは出さない（多数のクライアントが読みに来るため）
+        pass
+
+
+def serve(
+    rankings: List[str],
+    count: int,
+    scraper_map: "Mapping[str, Tuple[str, Type[BaseScraper]]]",
+    host: str,
+    port: int,
+    interval: float,
+    echo: Callable[..., None],
+    symbols: "Optional[SymbolMaster]" = None,
+) -> None:
+    """
+    ランキングをバックグラウンドで更新しながらHTTPで配信する（Ctrl+Cで終了）
+
+    Args:
+        rankings: 配信するランキング種類のリスト
+        count: 取得する銘柄数
+        scraper_map: ランキング種類 → (ソース名, スクレイパークラス) のマッピング
+        host: 待ち受けるアドレス
+        port: 待ち受けるポート
+        interval: 立会時間中の更新間隔（秒）
+        echo: ログ出力関数（click.echo互換）
+        symbols: 銘柄マスター
+    """
+    limit_http_cache_ttl(interval)
+    warning = holidays_warning()
+    if warning:
+        echo(warning, err=True)
+    cache = RankingCache(rankings, count, scraper_map, interval, echo, symbols)
+    handler = type("Handler", (RankingRequestHandler,), {"cache": cache})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+
+    cache.start()
+    echo(f"http://{host}:{server.server_address[1]}/ で配信します（Ctrl+Cで終了）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        echo("\nサーバーを終了します")
+    finally:
+        server.server_close()
+        cache.stop()
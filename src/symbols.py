@@ -0,0 +1,227 @@
+"""JPX上場銘柄一覧から作る銘柄マスター（メモリマップした二分探索インデックス）"""
+
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import csv
+import mmap
+import os
+import struct
+import tempfile
+
+from .config import SYMBOL_DEFAULT_PREFIX, SYMBOL_PREFIXES, SYMBOLS_INDEX_PATH
+from .fileutil import replace_file
+
+# インデックスファイルの形式
+#   ヘッダー: マジック(8バイト), 銘柄数(uint32)
+#   レコード: コード昇順の固定長（コード5バイト, 銘柄名の位置・長さ, 市場区分の位置・長さ）
+#   文字列領域: UTF-8の銘柄名・市場区分（市場区分は重複を除いて1回だけ格納）
+_MAGIC = b"WLSYM\x00\x01\x00"
+_HEADER = struct.Struct("<8sI")
+_RECORD = struct.Struct("<5sIHIH")
+_CODE_LENGTH = 5
+
+# JPXの上場銘柄一覧（data_j.xls）の列名
+_CODE_COLUMN = "コード"
+_NAME_COLUMN = "銘柄名"
+_MARKET_COLUMN = "市場・商品区分"
+
+
+class Symbol(NamedTuple):
+    """銘柄マスターの1銘柄"""
+
+    code: str
+    name: str
+    market: str
+    prefix: str
+
+    @property
+    def tradingview(self) -> str:
+        """TradingViewのシンボル（例: TSE:7203）"""
+        return f"{self.prefix}:{self.code}"
+
+
+def resolve_prefix(market: str) -> str:
+    """市場区分からTradingViewの取引所プレフィックスを決める"""
+    for keyword, prefix in SYMBOL_PREFIXES.items():
+        if keyword in market:
+            return prefix
+    return SYMBOL_DEFAULT_PREFIX
+
+
+def normalize_code(value: object) -> str:
+    """Excel由来の数値（1301.0）なども含めて銘柄コードを文字列に揃える"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip().upper()
+
+
+def read_jpx_listing(path: str) -> Iterator[Tuple[str, str, str]]:
+    """
+    JPXの上場銘柄一覧を読み込む
+
+    CSV（UTF-8またはShift_JIS）と、xlrdがインストールされていればJPX配布のxlsに対応。
+
+    Yields:
+        タプル（銘柄コード, 銘柄名, 市場・商品区分）
+    """
+    if path.lower().endswith(".xls"):
+        rows = _read_xls(path)
+    else:
+        rows = _read_csv(path)
+
+    header = next(rows)
+    try:
+        code_col, name_col, market_col = (header.index(c) for c in (_CODE_COLUMN, _NAME_COLUMN, _MARKET_COLUMN))
+    except ValueError:
+        raise ValueError(f"JPXの上場銘柄一覧の形式ではありません（{_CODE_COLUMN}/{_NAME_COLUMN}/{_MARKET_COLUMN}列が必要）: {path}")
+
+    for row in rows:
+        if len(row) <= max(code_col, name_col, market_col):
+            continue
+        code = normalize_code(row[code_col])
+        if code:
+            yield code, str(row[name_col]).strip(), str(row[market_col]).strip()
+
+
+def _read_csv(path: str) -> Iterator[List[str]]:
+    for encoding in ("utf-8-sig", "cp932"):
+        try:
+            with open(path, encoding=encoding, newline="") as f:
+                rows = list(csv.reader(f))
+        except UnicodeDecodeError:
+            continue
+        return iter(rows)
+    raise ValueError(f"文字コードを判別できません（UTF-8またはShift_JISのCSVを指定してください）: {path}")
+
+
+def _read_xls(path: str) -> Iterator[List[object]]:
+    try:
+        import xlrd
+    except ImportError:
+        raise ImportError("xlsの読み込みにはxlrdが必要です（pip install xlrd）。CSVに変換して指定することもできます")
+    sheet = xlrd.open_workbook(path).sheet_by_index(0)
+    return (sheet.row_values(i) for i in range(sheet.nrows))
+
+
+def build_index(entries: Iterable[Tuple[str, str, str]], path: str = SYMBOLS_INDEX_PATH) -> int:
+    """
+    銘柄一覧からインデックスファイルを作る（アトミックに置き換え）
+
+    Args:
+        entries: (銘柄コード, 銘柄名, 市場・商品区分) のイテラブル
+        path: 出力先
+
+    Returns:
+        格納した銘柄数
+    """
+    # 同じコードが複数あれば後のものを採用
+    by_code: Dict[bytes, Tuple[str, str]] = {}
+    for code, name, market in entries:
+        key = code.encode("ascii")
+        if len(key) > _CODE_LENGTH:
+            continue
+        by_code[key.ljust(_CODE_LENGTH, b"\x00")] = (name, market)
+
+    blob = bytearray()
+    market_offsets: Dict[str, Tuple[int, int]] = {}
+
+    def put(text: str) -> Tuple[int, int]:
+        data = text.encode("utf-8")
+        offset = len(blob)
+        blob.extend(data)
+        return offset, len(data)
+
+    records = bytearray()
+    for key in sorted(by_code):
+        name, market = by_code[key]
+        if market not in market_offsets:
+            market_offsets[market] = put(market)
+        records.extend(_RECORD.pack(key, *put(name), *market_offsets[market]))
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(by_code)))
+            f.write(records)
+            f.write(blob)
+        replace_file(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return len(by_code)
+
+
+class SymbolMaster:
+    """
+    インデックスファイルをメモリマップして銘柄コードを二分探索する
+
+    読み込み時にファイル全体をパースしないため、銘柄数によらず数ミリ秒で使える
+    """
+
+    def __init__(self, path: str = SYMBOLS_INDEX_PATH):
+        """
+        Args:
+            path: build_index()で作ったインデックスファイル
+        """
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            self._mm.close()
+            raise ValueError(f"銘柄マスターの形式ではありません: {path}")
+        self._blob_offset = _HEADER.size + self._count * _RECORD.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def _record(self, index: int) -> Tuple[bytes, int, int, int, int]:
+        return _RECORD.unpack_from(self._mm, _HEADER.size + index * _RECORD.size)
+
+    def _text(self, offset: int, length: int) -> str:
+        start = self._blob_offset + offset
+        return self._mm[start:start + length].decode("utf-8")
+
+    def get(self, code: str) -> Optional[Symbol]:
+        """
+        銘柄コードを検索
+
+        Args:
+            code: 銘柄コード（例: '7203', '285A'）
+
+        Returns:
+            Symbol（一覧にない場合はNone）
+        """
+        key = code.upper().encode("ascii", "ignore").ljust(_CODE_LENGTH, b"\x00")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self._record(mid)
+            if record[0] < key:
+                lo = mid + 1
+            elif record[0] > key:
+                hi = mid
+            else:
+                market = self._text(record[3], record[4])
+                return Symbol(code.upper(), self._text(record[1], record[2]), market, resolve_prefix(market))
+        return None
+
+    def __contains__(self, code: str) -> bool:
+        return self.get(code) is not None
+
+
+_master: Optional[SymbolMaster] = None
+_master_loaded = False
+
+
+def get_symbol_master() -> Optional[SymbolMaster]:
+    """銘柄マスターを取得（インデックスファイルがなければNone）"""
+    global _master, _master_loaded
+    if not _master_loaded:
+        _master_loaded = True
+        if os.path.exists(SYMBOLS_INDEX_PATH):
+            _master = SymbolMaster(SYMBOLS_INDEX_PATH)
+    return _master
@@ -0,0 +1,130 @@
+"""ウォッチモード：立会時間中に一定間隔でランキングを更新し続ける"""
+
+from typing import TYPE_CHECKING, Callable, Dict, List, Mapping, Optional, Tuple, Type
+import time
+
+from .exporters.tradingview import TradingViewExporter
+from .history import HistoryStore
+from .market import holidays_warning, is_market_open, next_session_start, now_jst
+from .runner import RankingResult, fetch_rankings
+from .scrapers.cache import limit_http_cache_ttl
+
+if TYPE_CHECKING:
+    from .scrapers.base import BaseScraper
+
+
+def diff_codes(previous: List[str], current: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    ランキングに新しく入った銘柄と外れた銘柄を求める
+
+    Args:
+        previous: 前回の銘柄コード
+        current: 今回の銘柄コード
+
+    Returns:
+        タプル（新規ランクイン, ランク外）
+    """
+    previous_set = set(previous)
+    current_set = set(current)
+    entered = [code for code in current if code not in previous_set]
+    left = [code for code in previous if code not in current_set]
+    return entered, left
+
+
+def watch(
+    rankings: List[str],
+    count: int,
+    scraper_map: "Mapping[str, Tuple[str, Type[BaseScraper]]]",
+    exporter: TradingViewExporter,
+    interval: float,
+    echo: Callable[..., None],
+    history: Optional[HistoryStore] = None,
+    select: Optional[Callable[[RankingResult], List[str]]] = None,
+) -> None:
+    """
+    立会時間中（前場・後場）だけ、interval秒ごとにランキングを取得して出力する
+
+    前場・後場の終了後にもう1回だけ取得し、引けのランキングを出力する。
+    スクレイパー・HTTPセッション・ブラウザはプロセス内で使い回す。
+    ウォッチリストは内容が変わった場合のみ書き換え、入れ替わった銘柄をログに出す。
+    Ctrl+Cで終了する。
+
+    Args:
+        rankings: ランキング種類のリスト
+        count: 取得する銘柄数
+        scraper_map: ランキング種類 → (ソース名, スクレイパークラス) のマッピング
+        exporter: 出力に使うエクスポーター
+        interval: 更新間隔（秒）
+        echo: ログ出力関数（click.echo互換）
+        history: 指定した場合、毎サイクルの取得結果を履歴に保存する
+        select: 指定した場合、取得結果から出力する銘柄コードを選ぶ（--filter/--sort、履歴には選ぶ前を保存）
+    """
+    scrapers: "Dict[str, BaseScraper]" = {}
+    last_codes: Dict[str, List[str]] = {}
+    last_dates: Dict[str, str] = {}
+    # キャッシュのTTL以内に取得し直しても古い結果が返らないようにする
+    limit_http_cache_ttl(interval)
+    warning = holidays_warning()
+    if warning:
+        echo(warning, err=True)
+
+    refresh_after_close = False
+    try:
+        while True:
+            now = now_jst()
+            market_open = is_market_open(now)
+            if not market_open and not refresh_after_close:
+                # 昼休み・引け後・休場日は次の立会開始まで待機
+                resume_at = next_session_start(now)
+                echo(f"[{now:%H:%M:%S}] 立会時間外のため {resume_at:%Y/%m/%d %H:%M} まで待機します")
+                time.sleep(max(0.0, (resume_at - now_jst()).total_seconds()))
+                continue
+
+            cycle_started = time.monotonic()
+            shared_update_date = None
+            # 1サイクル分の出力をまとめて書き込む
+            with exporter.batch():
+                for result in fetch_rankings(rankings, count, scraper_map, scrapers):
+                    ranking_type = result.ranking_type
+                    stamp = f"{now_jst():%H:%M:%S}"
+
+                    if result.error:
+                        echo(f"[{stamp}][{ranking_type}] エラー: {result.error}", err=True)
+                        continue
+                    if not result.codes:
+                        echo(f"[{stamp}][{ranking_type}] 銘柄が取得できませんでした")
+                        continue
+
+                    if result.update_date and not shared_update_date:
+                        shared_update_date = result.update_date
+                    date_to_use = result.update_date or shared_update_date or now_jst().strftime("%Y%m%d")
+
+                    if history:
+                        history.record(ranking_type, date_to_use, result.codes)
+
+                    codes = select(result) if select else result.codes
+                    previous = last_codes.get(ranking_type)
+                    if previous == codes and last_dates.get(ranking_type) == date_to_use:
+                        echo(f"[{stamp}][{ranking_type}] 変化なし")
+                        continue
+
+                    if previous is not None:
+                        entered, left = diff_codes(previous, codes)
+                        echo(
+                            f"[{stamp}][{ranking_type}] +{len(entered)} -{len(left)}"
+                            f" IN: {','.join(entered) or '-'} OUT: {','.join(left) or '-'}"
+                        )
+
+                    filepath = exporter.export(codes, ranking_type, date_to_use)
+                    last_codes[ranking_type] = codes
+                    last_dates[ranking_type] = date_to_use
+                    echo(f"[{stamp}][{ranking_type}] {len(codes)}件 出力: {filepath}")
+
+            # 立会中に取得した場合は、引けの確定値を取るため立会終了後にもう1回だけ取得する
+            refresh_after_close = market_open
+            if not market_open:
+                continue
+            # 前回の取得開始からinterval秒後に次の取得を行う
+            time.sleep(max(0.0, interval - (time.monotonic() - cycle_started)))
+    except KeyboardInterrupt:
+        echo("\nウォッチモードを終了します")
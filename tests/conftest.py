@@ -0,0 +1,58 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Tuple
+import threading
+
+import pytest
+
+from src.config import ARCHIVE_ENABLED, HTTP_CACHE_ENABLED
+from src.scrapers.archive import configure_archive
+from src.scrapers.cache import configure_http_cache
+
+
+@pytest.fixture(autouse=True)
+def no_disk_state() -> Iterator[None]:
+    """HTTPキャッシュ・ページアーカイブをテスト中は使わない"""
+    configure_http_cache(False)
+    configure_archive(False)
+    yield
+    configure_http_cache(HTTP_CACHE_ENABLED)
+    configure_archive(ARCHIVE_ENABLED)
+
+
+class StandIn:
+    """パス → (ステータス, Content-Type, 本文) を返すローカルのHTTPサーバー"""
+
+    def __init__(self) -> None:
+        self.routes: Dict[str, Tuple[int, str, bytes]] = {}
+        self.requests: List[Tuple[str, Dict[str, str]]] = []
+        self.url = ""
+
+    def route(self, path: str, body: str, content_type: str = "application/json", status: int = 200) -> str:
+        self.routes[path] = (status, content_type, body.encode("utf-8"))
+        return self.url + path
+
+
+@pytest.fixture
+def stand_in() -> Iterator[StandIn]:
+    site = StandIn()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            site.requests.append((self.path, dict(self.headers)))
+            status, content_type, body = site.routes.get(self.path, (404, "text/plain", b"not found"))
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    site.url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield site
+    server.shutdown()
+    server.server_close()
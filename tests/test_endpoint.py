@@ -0,0 +1,62 @@
+from src.scrapers.endpoint import EndpointStore, LearnedEndpoint, codes_from_json, find_ranking_in_json, matches_ranking
+
+CODES = [str(1301 + i) for i in range(10)]
+
+
+def records(codes):
+    return [{"rank": i, "name": "サンプル", "code": code} for i, code in enumerate(codes, 1)]
+
+
+def test_finds_nested_ranking():
+    data = {"meta": {"count": 10}, "result": {"list": records(CODES)}, "ads": [{"code": "7203"}]}
+    assert find_ranking_in_json(data, CODES) == (["result", "list"], "code")
+
+
+def test_finds_ranking_with_numeric_codes_and_alphanumeric_codes():
+    codes = CODES[:9] + ["285A"]
+    data = [{"c": int(code) if code.isdigit() else code} for code in codes]
+    assert find_ranking_in_json(data, codes) == ([], "c")
+
+
+def test_prefers_best_matching_array():
+    shuffled = CODES[5:] + CODES[:5]
+    data = {"other": records(shuffled), "ranking": records(CODES)}
+    assert find_ranking_in_json(data, CODES) == (["ranking"], "code")
+
+
+def test_rejects_short_or_mismatched_arrays():
+    # 先頭の一部だけの配列
+    assert find_ranking_in_json({"top": records(CODES[:3])}, CODES) is None
+    # 順位の大半が一致しない配列
+    assert find_ranking_in_json({"list": records(CODES[::-1])}, CODES) is None
+    assert find_ranking_in_json({"list": records(CODES)}, []) is None
+
+
+def test_codes_from_json_dedupes_and_skips_short_codes():
+    data = {"list": records(["1301", "130", "1301", "285A"])}
+    assert codes_from_json(data, ["list"], "code") == ["1301", "285A"]
+
+
+def test_matches_ranking():
+    assert matches_ranking(CODES, CODES)
+    assert matches_ranking(CODES[:8], CODES)
+    assert not matches_ranking(CODES[:1], CODES)
+    assert not matches_ranking(CODES[1:] + CODES[:1], CODES)
+    assert not matches_ranking([], CODES)
+
+
+def test_endpoint_store_saves_and_reads_once(tmp_path):
+    path = tmp_path / "endpoints.json"
+    endpoint = LearnedEndpoint("https://example.com/api", {"accept": "application/json"}, ["list"], "code")
+    store = EndpointStore(str(path))
+    store.put("https://example.com/tick", endpoint)
+
+    # 別のプロセス（新しいEndpointStore）からは保存した内容が読める
+    assert EndpointStore(str(path)).get("https://example.com/tick") == endpoint
+
+    # 読み込み後はファイルを読み直さない
+    path.write_text("{}", encoding="utf-8")
+    assert store.get("https://example.com/tick") == endpoint
+    store.discard("https://example.com/tick")
+    assert store.get("https://example.com/tick") is None
+    assert EndpointStore(str(path)).get("https://example.com/tick") is None
@@ -0,0 +1,64 @@
+import math
+
+import pytest
+
+from src.filters import RowFilter, parse_filter, parse_sort, select_codes
+from src.scrapers.columns import RowColumns
+
+NAN = math.nan
+CODES = ["1001", "1002", "1003", "1004"]
+
+
+def columns(rows):
+    """(price, change_pct, volume, trading_value) の行から RowColumns を作る"""
+    return RowColumns.from_rows(CODES, dict(zip(CODES, rows)))
+
+
+ROWS = columns([
+    (2500, 5.0, 1000, NAN),  # 売買代金なし → 株価×出来高で概算
+    (4000, 12.0, 2000, 9e6),
+    (NAN, 8.0, NAN, NAN),  # 値のない行
+    (1200, -3.0, 500, 1e9),
+])
+
+
+def test_parse_filter_units():
+    assert parse_filter("trading_value>=10億") == RowFilter("trading_value", ">=", 1e9)
+    assert parse_filter(" price < 3000 ") == RowFilter("price", "<", 3000.0)
+
+
+@pytest.mark.parametrize("expr", ["price<<3000", "price", "unknown>1"])
+def test_parse_filter_rejects(expr):
+    with pytest.raises(ValueError):
+        parse_filter(expr)
+
+
+def test_parse_sort():
+    assert parse_sort("-trading_value") == ("trading_value", True)
+    assert parse_sort("price") == ("price", False)
+    with pytest.raises(ValueError):
+        parse_sort("-unknown")
+
+
+def test_without_columns_returns_codes_unchanged():
+    assert select_codes(CODES, None, [parse_filter("price<3000")]) == CODES
+
+
+def test_filters_keep_rank_order():
+    assert select_codes(CODES, ROWS, [parse_filter("price<3000")]) == ["1001", "1004"]
+    assert select_codes(CODES, ROWS, [parse_filter("price<3000"), parse_filter("change_pct>0")]) == ["1001"]
+
+
+def test_missing_values_never_match():
+    # NaNとの比較は != だけTrueになるが、値のない行は除く
+    assert select_codes(CODES, ROWS, [parse_filter("price!=2500")]) == ["1002", "1004"]
+
+
+def test_trading_value_is_estimated_from_price_and_volume():
+    # 1001: 2500 × 1000 = 250万
+    assert select_codes(CODES, ROWS, [parse_filter("trading_value>=200万")]) == ["1001", "1002", "1004"]
+
+
+def test_sort_puts_missing_values_last():
+    assert select_codes(CODES, ROWS, sort=("price", True)) == ["1002", "1001", "1004", "1003"]
+    assert select_codes(CODES, ROWS, sort=("price", False)) == ["1004", "1001", "1002", "1003"]
@@ -0,0 +1,53 @@
+from src.fusion import (
+    FUSION_INTERSECTION,
+    FUSION_RRF,
+    FUSION_UNION,
+    FUSION_WEIGHTED,
+    build_rank_matrix,
+    fuse,
+    fuse_rankings,
+)
+
+RANKINGS = {
+    "up": ["1001", "1002", "1003"],
+    "volume": ["1003", "1001", "1004"],
+}
+
+
+def test_rank_matrix():
+    matrix = build_rank_matrix(RANKINGS)
+    assert matrix.codes.tolist() == ["1001", "1002", "1003", "1004"]
+    assert matrix.columns == ["up", "volume"]
+    assert matrix.ranks.tolist() == [[1, 2], [2, 0], [3, 1], [0, 3]]
+
+
+def test_fuse():
+    result = fuse(RANKINGS, k=60)
+    # 両方に入った銘柄（RRF: 1001 = 1/61 + 1/62 > 1003 = 1/63 + 1/61）
+    assert result[FUSION_INTERSECTION] == ["1001", "1003"]
+    # 最高順位の順（同じ順位はRRFの順）
+    assert result[FUSION_UNION] == ["1001", "1003", "1002", "1004"]
+    assert result[FUSION_RRF] == ["1001", "1003", "1002", "1004"]
+    assert result[FUSION_WEIGHTED][:2] == ["1001", "1003"]
+
+
+def test_fuse_weights_and_top():
+    result = fuse(RANKINGS, weights={"up": 0.0, "volume": 1.0}, top=2)
+    assert result[FUSION_RRF] == ["1003", "1001"]
+    assert all(len(codes) <= 2 for codes in result.values())
+
+
+def test_fuse_empty():
+    assert fuse({"up": [], "volume": []}) == {
+        FUSION_INTERSECTION: [],
+        FUSION_UNION: [],
+        FUSION_RRF: [],
+        FUSION_WEIGHTED: [],
+    }
+
+
+def test_fuse_rankings_needs_two_fusable_rankings():
+    # down・up_from_openはconfig.FUSION_WEIGHTSにないため対象外
+    assert fuse_rankings({"up": ["1001"], "down": ["1002"], "up_from_open": ["1003"]}) == {}
+    assert fuse_rankings({"up": ["1001"], "volume": []}) == {}
+    assert fuse_rankings(RANKINGS)[FUSION_INTERSECTION] == ["1001", "1003"]
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from src.scrapers.endpoint import CapturedResponse, EndpointStore
+from src.scrapers.matsui import MatsuiScraper
+
+CODES = ["7203", "6758", "9984", "285A", "8306"]
+
+
+def ranking_json(codes):
+    return json.dumps({"data": {"items": [{"rank": i, "code": code} for i, code in enumerate(codes, 1)]}})
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    monkeypatch.setattr(MatsuiScraper, "_endpoints", EndpointStore(str(tmp_path / "endpoints.json")))
+    return MatsuiScraper()
+
+
+def captured(url, headers=None):
+    return CapturedResponse(url, "GET", headers or {"accept": "application/json"}, "")
+
+
+def test_learns_endpoint_that_reproduces_ranking(scraper, stand_in):
+    api = stand_in.route("/api/tick", ranking_json(CODES))
+    page_url = stand_in.url + "/tick"
+    response = captured(api)._replace(body=ranking_json(CODES))
+
+    scraper._learn_endpoint(page_url, CODES, [response])
+
+    endpoint = scraper._endpoints.get(page_url)
+    assert endpoint.url == api
+    assert endpoint.path == ["data", "items"] and endpoint.field == "code"
+
+    # 学習後はブラウザを使わずにエンドポイントから取得する
+    page = scraper.load_page(page_url)
+    assert page.codes == CODES
+
+
+def test_does_not_learn_truncated_array(scraper, stand_in):
+    # 1位だけ一致する1件の配列は、先頭は一致していても採用しない
+    api = stand_in.route("/api/top", ranking_json(CODES[:1]))
+    response = captured(api)._replace(body=ranking_json(CODES[:1]))
+
+    scraper._learn_endpoint(stand_in.url + "/tick", CODES, [response])
+
+    assert scraper._endpoints.get(stand_in.url + "/tick") is None
+    assert stand_in.requests == []
+
+
+def test_does_not_learn_when_direct_call_returns_less(scraper, stand_in):
+    # ブラウザが受け取った内容は一致しても、直接呼び出しで先頭の数件しか返らない場合は採用しない
+    api = stand_in.route("/api/tick", ranking_json(CODES[:2]))
+    response = captured(api)._replace(body=ranking_json(CODES))
+
+    scraper._learn_endpoint(stand_in.url + "/tick", CODES, [response])
+
+    assert scraper._endpoints.get(stand_in.url + "/tick") is None
+
+
+def test_session_headers_are_neither_sent_nor_saved(scraper, stand_in, tmp_path):
+    api = stand_in.route("/api/tick", ranking_json(CODES))
+    headers = {
+        "accept": "application/json",
+        "cookie": "SESSIONID=secret",
+        "x-csrf-token": "secret",
+        "referer": stand_in.url + "/tick",
+    }
+    response = CapturedResponse(api, "GET", headers, ranking_json(CODES))
+
+    scraper._learn_endpoint(stand_in.url + "/tick", CODES, [response])
+
+    assert scraper._endpoints.get(stand_in.url + "/tick") is not None
+    assert "secret" not in (tmp_path / "endpoints.json").read_text(encoding="utf-8")
+    for _, sent in stand_in.requests:
+        assert "secret" not in json.dumps(sent)
+
+
+def test_rejected_endpoint_is_discarded(scraper, stand_in, monkeypatch):
+    api = stand_in.route("/api/tick", ranking_json(CODES))
+    page_url = stand_in.url + "/tick"
+    scraper._learn_endpoint(page_url, CODES, [captured(api)._replace(body=ranking_json(CODES))])
+
+    # エンドポイントが拒否するようになったらブラウザで取得し直す
+    stand_in.route("/api/tick", "forbidden", content_type="text/plain", status=403)
+    rendered = []
+
+    class FakePool:
+        def render_capturing(self, url, wait_selector, timeout):
+            rendered.append(url)
+            return "<html></html>", []
+
+    monkeypatch.setattr("src.scrapers.matsui.get_browser_pool", lambda: FakePool())
+    scraper.load_page(page_url)
+
+    assert rendered == [page_url]
+    assert scraper._endpoints.get(page_url) is None
+
+
+def test_renders_in_browser_when_row_columns_are_needed(scraper, stand_in, monkeypatch):
+    api = stand_in.route("/api/tick", ranking_json(CODES))
+    page_url = stand_in.url + "/tick"
+    scraper._learn_endpoint(page_url, CODES, [captured(api)._replace(body=ranking_json(CODES))])
+
+    # JSONには株価などの行データがないため、--filter/--sortではエンドポイントを使わない
+    monkeypatch.setattr("src.scrapers.matsui.extracts_columns", lambda: True)
+    assert scraper.learned_endpoint(page_url) is None
+    assert scraper._endpoints.get(page_url) is not None
@@ -0,0 +1,16 @@
+from src.metrics import RESERVOIR_SIZE, Metrics
+
+
+def test_timings_keep_bounded_samples():
+    metrics = Metrics()
+    for i in range(RESERVOIR_SIZE * 3):
+        metrics.observe("http_request", 0.001, host="example.com")
+    metrics.observe("http_request", 2.0, host="example.com")
+
+    (timing,) = metrics._timings.values()
+    assert len(timing.samples) == RESERVOIR_SIZE
+    # 件数・合計・最大は標本に関係なく正確
+    (stage,) = metrics.to_json()["stages"]
+    assert stage["count"] == RESERVOIR_SIZE * 3 + 1
+    assert stage["max_seconds"] == 2.0
+    assert abs(stage["sum_seconds"] - (RESERVOIR_SIZE * 3 * 0.001 + 2.0)) < 1e-9
@@ -0,0 +1,106 @@
+import pytest
+
+from src.scrapers.base import PageExtract, PagePlan, RankingStream
+
+
+class Source:
+    """PagePlanが使うスクレイパーの設定だけを持つ"""
+
+    MAX_PAGES = 4
+    ROWS_PER_PAGE = 3
+
+    def __init__(self):
+        self._rows_per_page = {}
+
+
+def page(*codes):
+    return PageExtract(list(codes), "20260109", len(codes))
+
+
+@pytest.fixture
+def stream():
+    return RankingStream(lambda stream: iter(()))
+
+
+def plan_for(stream, count=9):
+    return PagePlan(Source(), "up", count, stream)
+
+
+def test_next_pages_covers_count(stream):
+    plan = plan_for(stream, count=7)
+    assert plan.next_pages() == [1, 2, 3]
+    assert plan.next_pages() == [4]
+
+
+def test_merges_in_page_order(stream):
+    plan = plan_for(stream)
+    plan.next_pages()
+    plan.add(2, page("1004", "1005", "1006"))
+    # 1ページ目が揃うまでは返さない
+    assert list(plan.merge()) == []
+
+    plan.add(1, page("1001", "1002", "1003"))
+    assert list(plan.merge()) == [(1, "1001"), (2, "1002"), (3, "1003"), (4, "1004"), (5, "1005"), (6, "1006")]
+    assert stream.update_date == "20260109"
+
+
+def test_skips_codes_repeated_from_earlier_pages(stream):
+    plan = plan_for(stream, count=4)
+    plan.add(1, page("1001", "1002", "1003"))
+    plan.add(2, page("1003", "1004", "1005"))
+    assert [code for _, code in plan.merge()] == ["1001", "1002", "1003", "1004"]
+    assert plan.finished and not stream.exhausted
+
+
+def test_repeated_page_is_end_of_ranking(stream):
+    plan = plan_for(stream)
+    plan.add(1, page("1001", "1002", "1003"))
+    plan.add(2, page("1001", "1002", "1003"))
+    assert len(list(plan.merge())) == 3
+    assert plan.finished and stream.exhausted
+    assert stream.failed_page is None and not stream.max_pages_reached
+
+
+def test_failed_page_is_reported_separately(stream):
+    plan = plan_for(stream)
+    plan.add(1, page("1001", "1002", "1003"))
+    plan.add_failure(2, RuntimeError("timeout"))
+    plan.add(3, page("1007", "1008", "1009"))
+    assert len(list(plan.merge())) == 3
+    assert stream.exhausted and stream.failed_page == 2
+
+
+def test_first_page_failure_is_raised(stream):
+    error = RuntimeError("timeout")
+    with pytest.raises(RuntimeError) as raised:
+        plan_for(stream).add_failure(1, error)
+    assert raised.value is error
+
+
+def test_max_pages_reached(stream):
+    plan = plan_for(stream, count=20)
+    for page_num in plan.next_pages():
+        plan.add(page_num, page(*(f"{page_num}{i:03d}" for i in range(3))))
+    assert len(list(plan.merge())) == 12
+    plan.finish()
+    assert stream.exhausted and stream.max_pages_reached
+
+
+def test_short_last_page_is_end_of_ranking(stream):
+    plan = plan_for(stream, count=20)
+    for page_num in plan.next_pages():
+        codes = [f"{page_num}{i:03d}" for i in range(3 if page_num < 4 else 2)]
+        plan.add(page_num, page(*codes))
+    assert len(list(plan.merge())) == 11
+    plan.finish()
+    assert stream.exhausted and not stream.max_pages_reached
+
+
+def test_single_page_shorter_than_configured_rows(stream, monkeypatch):
+    # 最大1ページのソースで、1ページ目が設定の行数に満たない場合
+    monkeypatch.setattr(Source, "MAX_PAGES", 1)
+    plan = plan_for(stream)
+    plan.add(*plan.next_pages(), page("1001", "1002"))
+    assert len(list(plan.merge())) == 2
+    plan.finish()
+    assert stream.exhausted and not stream.max_pages_reached
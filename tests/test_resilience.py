@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from src.scrapers import resilience
+from src.scrapers.resilience import CircuitOpenError, HostResilience
+from src.scrapers.throttle import HostThrottle
+
+
+class Response:
+    status_code = 200
+
+    def __init__(self, name):
+        self.name = name
+
+
+def throttle():
+    return HostThrottle("example.com", rate=1000, burst=1000, concurrency=2)
+
+
+def warmed(latency=0.01):
+    """ヘッジの待機時間が決まる程度にレイテンシを観測済みのHostResilience"""
+    res = HostResilience("example.com")
+    for _ in range(resilience.HEDGE_MIN_SAMPLES):
+        res._record_success(latency)
+    return res
+
+
+def test_hedge_wins_over_slow_primary(monkeypatch):
+    monkeypatch.setattr(resilience, "HEDGE_ENABLED", True)
+    release = threading.Event()
+    calls = []
+
+    def send():
+        calls.append(None)
+        if len(calls) == 1:
+            # 本リクエストは応答が遅い
+            release.wait(5)
+            return Response("primary")
+        return Response("hedge")
+
+    started = time.monotonic()
+    try:
+        assert warmed().request(throttle(), send).name == "hedge"
+        assert time.monotonic() - started < 2
+    finally:
+        release.set()
+
+
+def test_failed_primary_waits_for_hedge(monkeypatch):
+    monkeypatch.setattr(resilience, "HEDGE_ENABLED", True)
+    calls = []
+
+    def send():
+        calls.append(None)
+        if len(calls) == 1:
+            time.sleep(0.5)
+            raise requests.ConnectionError("reset")
+        time.sleep(0.8)
+        return Response("hedge")
+
+    assert warmed().request(throttle(), send).name == "hedge"
+
+
+def test_unexpected_error_ends_half_open_probe(monkeypatch):
+    monkeypatch.setattr(resilience, "BREAKER_RESET_TIMEOUT", 0)
+    res = HostResilience("example.com")
+    for _ in range(resilience.BREAKER_FAILURE_THRESHOLD):
+        res._record_failure()
+
+    def redirect_loop():
+        raise requests.TooManyRedirects("loop")
+
+    with pytest.raises(requests.TooManyRedirects):
+        res.request(throttle(), redirect_loop)
+    # 試行中のままにならず、次のリクエストで再び試行する
+    assert res.request(throttle(), lambda: Response("ok")).name == "ok"
+
+
+def test_open_circuit_rejects_requests():
+    res = HostResilience("example.com")
+    for _ in range(resilience.BREAKER_FAILURE_THRESHOLD):
+        res._record_failure()
+    with pytest.raises(CircuitOpenError):
+        res.request(throttle(), lambda: Response("ok"))
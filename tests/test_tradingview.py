@@ -0,0 +1,79 @@
+import os
+import stat
+
+from src.exporters.tradingview import TradingViewExporter
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_batch_writes_each_ranking(tmp_path):
+    exporter = TradingViewExporter(str(tmp_path))
+    with exporter.batch() as written:
+        exporter.export(["7203", "6758"], "up", "20260109")
+        exporter.export(["9984"], "volume", "20260109")
+        # 書き込みはbatch()の終了時
+        assert not os.listdir(tmp_path)
+
+    assert [os.path.basename(path) for path in written] == ["値上がり_20260109.txt", "出来高_20260109.txt"]
+    assert read(tmp_path / "値上がり_20260109.txt") == "TSE:7203,TSE:6758"
+
+
+def test_unchanged_content_is_not_rewritten(tmp_path):
+    exporter = TradingViewExporter(str(tmp_path))
+    path = exporter.export(["7203"], "up", "20260109")
+    assert exporter.write(path, "TSE:7203") is False
+    # ディスク上で編集されていれば書き直す
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("edited")
+    assert exporter.write(path, "TSE:7203") is True
+    assert read(path) == "TSE:7203"
+
+
+def test_combined_keeps_rankings_from_earlier_batches(tmp_path):
+    exporter = TradingViewExporter(str(tmp_path), combined=True)
+    with exporter.batch():
+        exporter.export(["7203"], "up", "20260109")
+        exporter.export(["9984"], "volume", "20260109")
+    # ウォッチモードでは変化したランキングだけが出力される
+    with exporter.batch():
+        exporter.export(["6758"], "up", "20260109")
+
+    assert read(tmp_path / "ウォッチリスト_20260109.txt") == "###値上がり,TSE:6758,###出来高,TSE:9984"
+
+
+def test_combined_contains_only_the_same_date(tmp_path):
+    exporter = TradingViewExporter(str(tmp_path), combined=True)
+    with exporter.batch():
+        exporter.export(["7203"], "up", "20260109")
+    with exporter.batch():
+        exporter.export(["9984"], "volume", "20260113")
+
+    assert read(tmp_path / "ウォッチリスト_20260113.txt") == "###出来高,TSE:9984"
+
+
+def test_new_files_follow_umask(tmp_path, monkeypatch):
+    # umaskは一度だけ読み取ってキャッシュされるため、読み直させる
+    monkeypatch.setattr("src.fileutil._umask", None)
+    previous = os.umask(0o022)
+    try:
+        path = TradingViewExporter(str(tmp_path)).export(["7203"], "up", "20260109")
+    finally:
+        os.umask(previous)
+    # mkstempの0600のままにしない
+    assert mode(path) == 0o644
+
+
+def test_existing_file_keeps_its_mode(tmp_path):
+    exporter = TradingViewExporter(str(tmp_path))
+    path = exporter.export(["7203"], "up", "20260109")
+    os.chmod(path, 0o640)
+    exporter.export(["6758"], "up", "20260109")
+    assert mode(path) == 0o640
+    assert read(path) == "TSE:6758"